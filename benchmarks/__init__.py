@@ -0,0 +1,20 @@
+"""Benchmarks of the database hot paths, run manually against a disposable database."""
+
+import statistics
+import time
+
+
+async def timed(coro_factory, repeat: int) -> float:
+    """Awaits coroutines returned by `coro_factory` `repeat` times and returns median latency in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await coro_factory()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+async def fetch_all(engine, query) -> list:
+    """Returns all rows selected by `query` as dicts."""
+    async with engine.acquire() as conn:
+        return [dict(row) async for row in await conn.execute(query)]
@@ -0,0 +1,103 @@
+"""Micro-benchmark of serialization of adjustments responses.
+
+Synthetic adjustments with every kind of column value are serialized by the dedicated encoder of
+`service_api.services.serialization` and by the previous `map_response` and `json_dumps` path. The benchmark fails
+if both paths return different documents and prints median latencies of both. Sizes and latencies of columnar
+JSON and MessagePack formats are printed for comparison. Database is not needed.
+
+Usage:
+    python -m benchmarks.json_encoding --rows 10000
+
+"""
+
+import argparse
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from decimal import Decimal
+from uuid import uuid4
+
+from rfcommon_api.common.reqresp import map_response
+from sanic.response import json_dumps
+from ujson import loads
+
+from benchmarks import timed
+from service_api.services.serialization import dumps_adjustments, dumps_adjustments_columnar, packb_adjustments
+
+
+class BenchmarkRequest(dict):
+    """Minimal request with headers which both serialization paths read."""
+
+    def __init__(self, headers: dict):
+        super().__init__(headers=headers)
+        self.headers = headers
+
+
+def make_adjustments(rows: int) -> list:
+    """Returns `rows` adjustments shaped as rows selected from `adjustments` table."""
+    project_uuid = uuid4()
+    started = datetime(2019, 1, 1)
+    return [
+        {
+            "id": uuid4(),
+            "project_uuid": project_uuid,
+            "price_group_uuid": uuid4(),
+            "bu_uuid": uuid4() if n % 5 else None,
+            "product_uuid": uuid4() if n % 4 else None,
+            "adjustment_value": Decimal(n % 1000) / 4 if n % 3 else None,
+            "tier_override": None if n % 3 else {
+                "tier_id": n, "tier_name": f"Tier {n}",
+                "values": [{"earliest_date": "2000-01-01", "latest_date": None, "value": n % 10}],
+            },
+            "comment": f"Benchmark \"adjustment\" {n}",
+            "user": "benchmark",
+            "user_full_name": "Benchmark User",
+            "status": "Applied" if n % 2 else "Not Applied",
+            "updated_at": started + timedelta(seconds=n, microseconds=n % 1000),
+        }
+        for n in range(rows)
+    ]
+
+
+async def run(rows, repeat):
+    """Compares documents of both paths and prints median latencies."""
+    request = BenchmarkRequest({"x-timezone": "UTC"})
+    adjustments = make_adjustments(rows)
+
+    async def current():
+        return dumps_adjustments(request, adjustments)
+
+    async def previous():
+        return json_dumps(map_response(request, adjustments))
+
+    current_ms = await timed(current, repeat)
+    previous_ms = await timed(previous, repeat)
+    print(f"{'rows':>10} {'encoder, ms':>12} {'map_response, ms':>17} {'speedup':>8}")  # noqa T001
+    print(f"{rows:>10} {current_ms:>12.2f} {previous_ms:>17.2f} {previous_ms / current_ms:>8.2f}")  # noqa T001
+
+    print(f"{'format':>14} {'bytes':>10} {'ms':>8}")  # noqa T001
+    for name, serialize in (
+        ("json", dumps_adjustments), ("columnar json", dumps_adjustments_columnar), ("msgpack", packb_adjustments)
+    ):
+        async def encode():
+            return serialize(request, adjustments)
+
+        print(f"{name:>14} {len(await encode()):>10} {await timed(encode, repeat):>8.2f}")  # noqa T001
+
+    if loads(await current()) != loads(await previous()):
+        print("Encoder and map_response return different documents")  # noqa T001
+        sys.exit(1)
+
+
+def main():
+    """Parses command line arguments and runs benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", default=10000, type=int, help="Adjustments in one response")
+    parser.add_argument("--repeat", default=20, type=int, help="Measurements per path")
+    args = parser.parse_args()
+
+    asyncio.get_event_loop().run_until_complete(run(args.rows, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Benchmark of `get_project_adjustments` latency against the size of unrelated projects.
+
+The target project keeps the same amount of rows while the rest of the `adjustments` table grows, so the latency of
+a lookup of the requested project in `latest_adjustments` projection should stay flat. The previous window function
+based query is measured side by side for comparison.
+
+Usage:
+    python -m benchmarks.project_adjustments --host 127.0.0.1 --sizes 10000,100000,1000000,10000000
+
+"""
+
+import argparse
+import asyncio
+from uuid import uuid4
+
+from sqlalchemy.sql import select, and_, func
+
+from benchmarks import timed, fetch_all
+from service_api.app import app  # noqa F401 registers server instance used by `db_uri`
+from service_api.constants import KEYSPACE_PREFIX
+from service_api.domain.adjustment import get_project_adjustments
+from service_api.domain.latest_adjustments import rebuild_latest_adjustments
+from service_api.models import Adjustments
+from service_api.services import database
+
+SEED_QUERY = """
+INSERT INTO adjustments
+SELECT md5(random()::text)::uuid, {project}, md5((n % {keys})::text)::uuid, md5((n % 7)::text)::uuid,
+       md5((n % {keys} / 7)::text)::uuid, n % 1000, NULL, 'benchmark', 'benchmark', 'benchmark',
+       CASE WHEN n % 3 = 0 THEN 'Applied' ELSE 'Not Applied' END, now() - (n || ' seconds')::interval
+FROM generate_series(1, {rows}) AS n
+"""
+
+
+def legacy_project_adjustments_query(project_uuid):
+    """Query used by `get_project_adjustments` before the project filter was pushed into the scan."""
+    partitions_ordered_by_date = select(
+        [
+            Adjustments,
+            func.row_number().over(
+                partition_by=(
+                    Adjustments.c.price_group_uuid,
+                    Adjustments.c.bu_uuid,
+                    Adjustments.c.product_uuid,
+                    Adjustments.c.project_uuid
+                ),
+                order_by=Adjustments.c.updated_at.desc()).label('row_numb')
+        ]
+    ).alias('partitions_ordered_by_date')
+
+    return select([Adjustments]).where(
+        and_(
+            partitions_ordered_by_date.c.row_numb == 1,
+            Adjustments.c.id == partitions_ordered_by_date.c.id,
+            Adjustments.c.project_uuid == project_uuid
+        )
+    )
+
+
+async def run(host, client, sizes, keys, versions, repeat):
+    """Grows unrelated projects up to every size in `sizes` and prints median latencies in milliseconds."""
+    await database.create_db(client, host)
+    engine = await database.get_engine(client, host)
+    project_uuid = str(uuid4())
+
+    async with engine.acquire() as conn:
+        await conn.execute("TRUNCATE TABLE adjustments CASCADE")
+        await conn.execute(SEED_QUERY.format(project=f"'{project_uuid}'::uuid", keys=keys, rows=keys * versions))
+
+    unrelated_rows = 0
+    print(f"{'unrelated rows':>15} {'current, ms':>12} {'legacy, ms':>12}")  # noqa T001
+    for size in sizes:
+        async with engine.acquire() as conn:
+            await conn.execute(SEED_QUERY.format(
+                project="md5((n % 10000)::text || 'unrelated')::uuid", keys=keys, rows=size - unrelated_rows
+            ))
+        await rebuild_latest_adjustments(engine)
+        async with engine.acquire() as conn:
+            await conn.execute("ANALYZE adjustments")
+            await conn.execute("ANALYZE latest_adjustments")
+        unrelated_rows = size
+
+        current = await timed(lambda: get_project_adjustments(engine, project_uuid), repeat)
+        legacy = await timed(lambda: fetch_all(engine, legacy_project_adjustments_query(project_uuid)), repeat)
+        print(f"{size:>15} {current:>12.2f} {legacy:>12.2f}")  # noqa T001
+
+    await database.drop_db(f"{KEYSPACE_PREFIX}_{client}", host)
+
+
+def main():
+    """Parses command line arguments and runs benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", required=True, help="Postgres host")
+    parser.add_argument("--client", default="benchmark", help="Client short name of the disposable database")
+    parser.add_argument("--sizes", default="10000,100000,1000000,10000000", help="Comma separated unrelated rows")
+    parser.add_argument("--keys", default=1000, type=int, help="Distinct keys of the measured project")
+    parser.add_argument("--versions", default=3, type=int, help="Rows per key of the measured project")
+    parser.add_argument("--repeat", default=20, type=int, help="Measurements per size")
+    args = parser.parse_args()
+
+    sizes = sorted(int(size) for size in args.sizes.split(","))
+    asyncio.get_event_loop().run_until_complete(
+        run(args.host, args.client, sizes, args.keys, args.versions, args.repeat)
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Regression benchmark of the condition used by `remove_deprecated_adjustments`.
+
+The measured project gets `--rows` adjustments with NULL bu and product in some of them, so every NULL-wildcard
+combination is covered. Rows which would be deleted by the current index-friendly condition and by the previous
+correlated `EXISTS` with `OR ... IS NULL` are selected side by side: the benchmark fails if they differ and prints
+median latencies of both queries.
+
+Usage:
+    python -m benchmarks.remove_deprecated_adjustments --host 127.0.0.1 --rows 100000
+
+"""
+
+import argparse
+import asyncio
+import sys
+from uuid import uuid4
+
+from sqlalchemy.sql import select, and_, or_, exists
+
+from benchmarks import timed, fetch_all
+from service_api.app import app  # noqa F401 registers server instance used by `db_uri`
+from service_api.constants import KEYSPACE_PREFIX
+from service_api.domain.adjustment import deprecated_adjustments_filter
+from service_api.models import Adjustments
+from service_api.services import database
+from service_api.services.forms import AdjustmentStatuses
+
+SEED_QUERY = """
+INSERT INTO adjustments
+SELECT md5(random()::text)::uuid, {project}, md5((n % {price_groups})::text)::uuid,
+       CASE WHEN n % 5 = 0 THEN NULL ELSE md5((n % 11)::text)::uuid END,
+       CASE WHEN n % 4 = 0 THEN NULL ELSE md5((n % 13)::text)::uuid END,
+       n % 1000, NULL, 'benchmark', 'benchmark', 'benchmark',
+       CASE WHEN n % 3 = 0 THEN 'Not Applied' ELSE 'Applied' END, now() - (n || ' seconds')::interval
+FROM generate_series(1, {rows}) AS n
+"""
+
+
+def legacy_deprecated_adjustments_filter(project_uuid):
+    """Condition used by `remove_deprecated_adjustments` before it was split by NULL columns."""
+    adjustments1 = Adjustments.alias('adjustments1')
+    return and_(
+        Adjustments.c.project_uuid == project_uuid,
+        Adjustments.c.status == AdjustmentStatuses.applied.value,
+        exists(select([adjustments1.c.id]).where(
+            and_(
+                Adjustments.c.project_uuid == adjustments1.c.project_uuid,
+                Adjustments.c.price_group_uuid == adjustments1.c.price_group_uuid,
+                or_(
+                    Adjustments.c.bu_uuid == adjustments1.c.bu_uuid,
+                    Adjustments.c.bu_uuid.is_(None)
+                ),
+                or_(
+                    Adjustments.c.product_uuid == adjustments1.c.product_uuid,
+                    Adjustments.c.product_uuid.is_(None)
+                ),
+                adjustments1.c.status == AdjustmentStatuses.not_applied.value
+            )
+        ))
+    )
+
+
+async def run(host, client, rows, price_groups, repeat):
+    """Seeds measured and unrelated projects, compares both conditions and prints median latencies."""
+    await database.create_db(client, host)
+    engine = await database.get_engine(client, host)
+    project_uuid = str(uuid4())
+
+    async with engine.acquire() as conn:
+        await conn.execute("TRUNCATE TABLE adjustments CASCADE")
+        await conn.execute(SEED_QUERY.format(
+            project=f"'{project_uuid}'::uuid", price_groups=price_groups, rows=rows
+        ))
+        await conn.execute(SEED_QUERY.format(
+            project="md5((n % 100)::text || 'unrelated')::uuid", price_groups=price_groups, rows=rows
+        ))
+        await conn.execute("ANALYZE adjustments")
+
+    current_query = select([Adjustments.c.id]).where(deprecated_adjustments_filter(project_uuid))
+    legacy_query = select([Adjustments.c.id]).where(legacy_deprecated_adjustments_filter(project_uuid))
+    current_ids = {row["id"] for row in await fetch_all(engine, current_query)}
+    legacy_ids = {row["id"] for row in await fetch_all(engine, legacy_query)}
+
+    current = await timed(lambda: fetch_all(engine, current_query), repeat)
+    legacy = await timed(lambda: fetch_all(engine, legacy_query), repeat)
+    print(f"{'rows':>10} {'deprecated':>11} {'current, ms':>12} {'legacy, ms':>12}")  # noqa T001
+    print(f"{rows:>10} {len(current_ids):>11} {current:>12.2f} {legacy:>12.2f}")  # noqa T001
+
+    await database.drop_db(f"{KEYSPACE_PREFIX}_{client}", host)
+    if current_ids != legacy_ids:
+        print(  # noqa T001
+            f"Conditions differ: {len(current_ids - legacy_ids)} rows only in current, "
+            f"{len(legacy_ids - current_ids)} rows only in legacy"
+        )
+        sys.exit(1)
+
+
+def main():
+    """Parses command line arguments and runs benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", required=True, help="Postgres host")
+    parser.add_argument("--client", default="benchmark", help="Client short name of the disposable database")
+    parser.add_argument("--rows", default=100000, type=int, help="Rows of the measured project")
+    parser.add_argument("--price-groups", default=500, type=int, help="Distinct price groups of every project")
+    parser.add_argument("--repeat", default=5, type=int, help="Measurements per query")
+    args = parser.parse_args()
+
+    asyncio.get_event_loop().run_until_complete(
+        run(args.host, args.client, args.rows, args.price_groups, args.repeat)
+    )
+
+
+if __name__ == "__main__":
+    main()
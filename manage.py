@@ -17,7 +17,8 @@ from service_api.constants import (
     DISCOVER_RETRY_NUM,
     DISCOVER_RETRY_TIMEOUT
 )
-from service_api.services.database import drop_all_service_keyspaces, drop_db, create_db
+from service_api.domain import latest_adjustments
+from service_api.services.database import drop_all_service_keyspaces, drop_db, create_db, get_engine
 from service_api.services.discovery import discover_pg_clients_database, DataBaseNotFoundException, discover_pg_source
 from rfcommon_api.common.services.logger import logger
 
@@ -30,7 +31,7 @@ async def ensure_all_dropped():
     """
 
     for retries_left in range(DISCOVER_RETRY_NUM):
-        res = await discover_pg_clients_database(KEYSPACE_PREFIX, False)
+        res = await discover_pg_clients_database(KEYSPACE_PREFIX, False, cached=False)
         db_list = list(filter(lambda dl: dl[1].startswith(KEYSPACE_PREFIX + '_'), res))
         if not db_list:
             logger.info('All gone')
@@ -52,11 +53,11 @@ async def drop_common_db():
     """
     # find and drop common db
     try:
-        host, _ = await discover_pg_source(COMMON_DB, False)
+        host, _ = await discover_pg_source(COMMON_DB, False, cached=False)
         if host:
             await drop_db(COMMON_DB, host)
             for retries_left in range(DISCOVER_RETRY_NUM):
-                if await discover_pg_source(COMMON_DB, False):
+                if await discover_pg_source(COMMON_DB, False, cached=False):
                     logger.info('common_db still discoverable, sleeping for 61 second ...')
                     await asyncio.sleep(DISCOVER_RETRY_TIMEOUT)
             else:
@@ -172,6 +173,48 @@ def populate_fixtures(client_names, file_name):
     loop.run_until_complete(loader.load_data())
 
 
+def rebuild_latest_adjustments(client_names, host=None):
+    """This function is used for recalculating projection of the latest adjustments, e.g. for backfill.
+
+    Args:
+        client_names (list): Client short names.
+        host (str): Postgres db. Default set to None, db is discovered.
+
+    """
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    loop = asyncio.get_event_loop()
+    for client_name in client_names:
+        engine = loop.run_until_complete(get_engine(client_name, host))
+        count = loop.run_until_complete(latest_adjustments.rebuild_latest_adjustments(engine))
+        logger.info(f"Latest adjustments of '{client_name}' rebuilt, {count} keys")
+
+
+def check_latest_adjustments(client_names, host=None):
+    """This function is used for checking that projection of the latest adjustments is consistent.
+
+    Args:
+        client_names (list): Client short names.
+        host (str): Postgres db. Default set to None, db is discovered.
+
+    Raises:
+        SystemExit: Raises when projection of any client is inconsistent.
+
+    """
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    loop = asyncio.get_event_loop()
+    inconsistent = []
+    for client_name in client_names:
+        engine = loop.run_until_complete(get_engine(client_name, host))
+        inconsistencies = loop.run_until_complete(latest_adjustments.check_latest_adjustments(engine))
+        for inconsistency in inconsistencies:
+            logger.error(f"Latest adjustments of '{client_name}' are inconsistent: {inconsistency}")
+        if inconsistencies:
+            inconsistent.append(client_name)
+    if inconsistent:
+        raise SystemExit(f"Latest adjustments are inconsistent for clients: {', '.join(inconsistent)}")
+    logger.info("Latest adjustments are consistent")
+
+
 def start_celery_worker():
     """This function used to start a Celery worker instance."""
     from celery.app.base import Celery
@@ -245,6 +288,16 @@ def parse_args(args):
     sparser.add_argument(
         "-f", dest="file_name", default="dataload_sample_data.yaml", help="Fixtures file name", type=str
     )
+    sparser = subparsers.add_parser(
+        rebuild_latest_adjustments.__name__, add_help=False, help="Rebuild projection of the latest adjustments"
+    )
+    sparser.add_argument("-h", "--host", dest="host", default=None, type=str, help="DB host")
+    sparser.add_argument("--clients", dest="client_names", default=[], help="List of clients", action="append")
+    sparser = subparsers.add_parser(
+        check_latest_adjustments.__name__, add_help=False, help="Check projection of the latest adjustments"
+    )
+    sparser.add_argument("-h", "--host", dest="host", default=None, type=str, help="DB host")
+    sparser.add_argument("--clients", dest="client_names", default=[], help="List of clients", action="append")
     return parser.parse_args(args=args)
 
 
@@ -268,6 +321,10 @@ def main(args=None):
         init_keyspaces(parsed_args.host, parsed_args.client_names)
     elif parsed_args.command == populate_fixtures.__name__:
         populate_fixtures(parsed_args.client_names, parsed_args.file_name)
+    elif parsed_args.command == rebuild_latest_adjustments.__name__:
+        rebuild_latest_adjustments(parsed_args.client_names, parsed_args.host)
+    elif parsed_args.command == check_latest_adjustments.__name__:
+        check_latest_adjustments(parsed_args.client_names, parsed_args.host)
     else:
         runserver(parsed_args.host, parsed_args.port)
 
@@ -7,7 +7,7 @@ from rfcommon_api.common.domain.user import UserObject
 from service_api.constants import DEFAULT_SERVICE_NAME
 from service_api import api_v1
 from service_api.config import runtime_config
-from service_api.services import database
+from service_api.services import compression, database
 from rfcommon_api.common import cache_manager
 from rfcommon_api.common.services import logger
 from service_api.services.rest_client import RESTClientRegistry
@@ -24,10 +24,12 @@ cors = CORS(
         "Link, X-Pagination-Current-Page",
         "X-Pagination-Per-Page",
         "X-Pagination-Total-Count",
+        "X-Pagination-Count-Mode",
         "X-Client",
         "Authorization",
         "Content-Type",
         "X-Filename",
+        "ETag",
     ],
 )
 
@@ -35,11 +37,12 @@ api_v1.load_api(app)
 logger.register_server(app=app)
 setup_exception_handler(app)
 database.register_server(app=app)
+compression.register_server(app=app)
 
 
 @app.listener("before_server_start")
 async def before_server_start(app, loop):
-    """Initializing client of service and RedisCacheManager for app.
+    """Initializing client of service, RedisCacheManager and engines health monitor for app.
 
     RedisCacheManager by default saves the keys directly,
     without appending a prefix (which acts as a namespace) before server start.
@@ -51,16 +54,18 @@ async def before_server_start(app, loop):
     """
     RESTClientRegistry.init(cache_manager.RedisCacheManager)
     UserObject.init(RESTClientRegistry)
+    database.start_health_monitor()
 
 
 @app.listener("after_server_stop")
 async def after_server_stop(app, loop):
-    """Release engines and close RedisCacheManager after server stop.
+    """Stop engines health monitor, release engines and close RedisCacheManager after server stop.
 
     Args:
         app (Sanic): Sanic instance of service.
         loop (Loop): Reference to loop.
 
     """
+    await database.stop_health_monitor()
     await database.release_engines()
     await cache_manager.RedisCacheManager.close()
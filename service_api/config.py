@@ -37,6 +37,25 @@ async def dynamic_rabbit_connector(rabbit_user="guest", rabbit_password="guest")
     return [await get_rabbit_url(rabbit_user, rabbit_password)]
 
 
+def parse_replica_hosts(value: str) -> dict:
+    """Returns hosts of read replicas by database name.
+
+    Args:
+        value (str): Semicolon separated databases with comma separated hosts, e.g.
+            `rfadjustments_acme=10.0.0.1,10.0.0.2;rfadjustments_beta=10.0.1.1`.
+
+    Returns:
+        Dict with list of hosts of every database.
+
+    """
+    replica_hosts = {}
+    for item in value.split(";"):
+        db_name, _, hosts = item.partition("=")
+        if db_name.strip():
+            replica_hosts[db_name.strip()] = [host.strip() for host in hosts.split(",") if host.strip()]
+    return replica_hosts
+
+
 class Config:
     """Constants for configuration."""
 
@@ -47,6 +66,9 @@ class Config:
     DB_USER = os.environ.get("DB_USER", "camunda")
     DB_PASSWORD = os.environ.get("DB_PASSWORD", "camunda")
     DEFAULT_DB = os.environ.get("DEFAULT_DB", "postgres")
+    # hosts of read replicas of every client database, see `parse_replica_hosts`, replicas of databases which are
+    # not listed are discovered in SDA
+    DB_REPLICA_HOSTS = parse_replica_hosts(os.environ.get("DB_REPLICA_HOSTS", ""))
     DB_URI_FORMAT = "postgresql://{user}:{password}@{host}:{port}/{db}"
     RABBIT_CONNECTOR = static_rabbit_connector
     RABBIT_USER = os.environ.get("RABBIT_USER", "guest")
@@ -19,6 +19,9 @@ DISCOVER_RETRY_TIMEOUT = 61
 WORKFLOW_STEP_ANALYST_REVIEW = 'analyst_review'
 WORKFLOW_SUBSTEP_ADJUSTMENTS = 'adjustments'
 
+# Bulk operations related
+BULK_MAX_SIZE = 1000
+
 
 RF_SYSTEM_EVENTS = "rebatesandfees.rfworkflow.system_events"
 RF_ADJUSTMENTS_GROUP = "rebatesandfees.rfadjustments.group"
@@ -1,24 +1,38 @@
 """Provide all needed functionality for work with adjustments.
 
-This module contains all needed functionality for work with adjustments: create adjustment, get adjustment by id,
-update adjustment, delete not applied adjustments, apply adjustments, get adjustments, remove deprecated adjustments,
-get project adjustments.
+This module contains all needed functionality for work with adjustments: create adjustment(s), get adjustment by id,
+update adjustment(s), delete not applied adjustments, apply adjustments, get adjustments, remove deprecated adjustments,
+get project adjustments, replace project adjustments, finalize project adjustments, stream adjustments, get versions
+of adjustments for ETags.
 
 """
 
+import asyncio
+import itertools
+from datetime import datetime
+from functools import partial
+
 from aiopg.sa import Engine
-from aiopg.transaction import Transaction, IsolationLevel
 from multidict import CIMultiDict
 
-from rfcommon_api.common.exceptions import NotFoundException
+from rfcommon_api.common.exceptions import ApplicationError, NotFoundException
 from service_api.services.rest_client import RESTClientRegistry
 from rfcommon_api.common.constants import AuditLogActions
 from rfcommon_api.common.utils import asyncio_task
 from rfcommon_api.common.services.rest_client.projects import ProjectNotFound
 from rfcommon_api.common.services.audit_logger import log_audit_message, create_changelog
-from service_api.models import Adjustments
-from service_api.services.forms import AdjustmentStatuses
-from sqlalchemy.sql import select, and_, or_, exists, func
+from service_api.domain.latest_adjustments import refresh_latest_adjustments, refresh_project_latest_adjustments
+from service_api.models import Adjustments, LatestAdjustments
+from service_api.services.forms import AdjustmentStatuses, CountModes
+from service_api.services.pagination import (
+    sort_keys, order_by_keys, encode_cursor, decode_cursor, after_cursor, estimate_count, estimate_table_count
+)
+from service_api.services.database import register_write
+from service_api.services.response_cache import invalidate_projects
+from service_api.services.sql import Values
+from service_api.services.streaming import fetch_batches
+from service_api.services.unit_of_work import UnitOfWork, run_in_transaction
+from sqlalchemy.sql import select, and_, or_, exists, func, column, literal, cast
 from rfcommon_api.common.services import query_manager
 from rfcommon_api.common.domain.user import UserObject
 from rfcommon_api.common.services.kafka import KafkaProducer
@@ -40,23 +54,75 @@ async def create_adjustment(engine: Engine, user_obj: UserObject, data: dict, he
         uuid of bu, uuid of product, adjustment value, tier override, comment, user mail, full name of user,
         status and when it was updated.
 
+    """
+    data = _new_adjustment_row(data, await user_obj.get_user_data())
+
+    async def create(conn):
+        async with conn.execute(Adjustments.insert().values(**data).returning(*Adjustments.c)) as cur:
+            adjustment = await cur.fetchone()
+        await refresh_latest_adjustments(conn, [adjustment])
+        return adjustment
+
+    adjustment = await run_in_transaction(engine, create, "create_adjustment")
+    await _invalidate_cached_responses(engine, [adjustment['project_uuid']])
+
+    # Send warning
+    await _send_system_event(headers.get('X-Client'), data.get('project_uuid'), _override_event(data))
+    return dict(adjustment)
+
+
+async def create_adjustments(engine: Engine, user_obj: UserObject, items: list, headers: dict) -> list:
+    """This function creates several adjustments with one multi-row insert.
+
+    System event is sent once for every project and kind of override, not for every adjustment.
+
+    Args:
+        engine: Instance which provides a source of database connectivity and behavior.
+        user_obj: Instance which provide an information about the user.
+        items: List of dicts with the same values as `data` of `create_adjustment`.
+        headers: Store information about `X-Client`, `Authorization` and `x-timezone`.
+
+    Returns:
+        List of created adjustments in the same order as `items`.
+
     """
     user_data = await user_obj.get_user_data()
+    rows = [_new_adjustment_row(data, user_data) for data in items]
+    columns = {column for row in rows for column in row}
+    rows = [{column: row.get(column) for column in columns} for row in rows]
+
+    async def create(conn):
+        async with conn.execute(Adjustments.insert().values(rows).returning(*Adjustments.c)) as cur:
+            created = {str(row['id']): dict(row) for row in await cur.fetchall()}
+        await refresh_latest_adjustments(conn, list(created.values()))
+        return created
+
+    created = await run_in_transaction(engine, create, "create_adjustments")
+    await _invalidate_cached_responses(engine, [adjustment['project_uuid'] for adjustment in created.values()])
+
+    events = {(row['project_uuid'], _override_event(row)) for row in rows}
+    await asyncio.gather(*(
+        _send_system_event(headers.get('X-Client'), project_uuid, event) for project_uuid, event in events
+    ))
+    return [created[str(row['id'])] for row in rows]
+
+
+_REPLACED_COLUMNS = (
+    'id', 'price_group_uuid', 'bu_uuid', 'product_uuid', 'adjustment_value', 'tier_override', 'comment'
+)
+
+
+def _new_adjustment_row(data: dict, user_data: dict) -> dict:
+    """Returns values of inserted row: `data` of not applied adjustment authored by user with `user_data`."""
     data['user_full_name'] = f"{user_data['profile'].get('firstName')} {user_data['profile'].get('lastName')}"
     data['status'] = AdjustmentStatuses.not_applied.value
     data['user'] = user_data['profile'].get('login')
+    return {column: value for column, value in data.items() if column in Adjustments.c.keys()}
 
-    data = {column: value for column, value in data.items() if column in Adjustments.c.keys()}
 
-    async with engine.acquire() as conn:
-        await conn.execute(Adjustments.insert().values(**data))
-        async with conn.execute(Adjustments.select().where(Adjustments.c.id == data['id'])) as cur:
-            adjustment = await cur.fetchone()
-
-        # Send warning
-        event = SYSTEM_EVENT_AMOUNT_OVERRIDE if data.get('adjustment_value') is not None else SYSTEM_EVENT_TIER_OVERRIDE
-        await _send_system_event(headers.get('X-Client'), data.get('project_uuid'), event)
-        return dict(adjustment)
+def _override_event(data: dict) -> str:
+    """Returns name of system event about override with `data`."""
+    return SYSTEM_EVENT_AMOUNT_OVERRIDE if data.get('adjustment_value') is not None else SYSTEM_EVENT_TIER_OVERRIDE
 
 
 async def get_adjustment_by_id(engine: Engine, adjustment_id: str) -> dict:
@@ -83,44 +149,252 @@ async def get_adjustment_by_id(engine: Engine, adjustment_id: str) -> dict:
         return adjustment
 
 
+async def get_adjustment_version(engine: Engine, adjustment_id: str):
+    """Gives value which is changed by every update of adjustment without selecting the adjustment.
+
+    Args:
+        engine: Instance which provides a source of database connectivity and behavior.
+        adjustment_id: Id of adjustment.
+
+    Returns:
+        Time of the last update of adjustment or None if adjustment doesn't exist.
+
+    """
+    async with engine.acquire() as conn:
+        cur = await conn.execute(select([Adjustments.c.updated_at]).where(Adjustments.c.id == adjustment_id))
+        return await cur.scalar()
+
+
+async def get_adjustments_version(engine: Engine, params) -> tuple:
+    """Gives value which is changed by changes of adjustments which satisfy filter without selecting the rows.
+
+    Inserted and updated rows get new `updated_at` and deleted rows decrease count.
+
+    Args:
+        engine: Instance which provides a source of database connectivity and behavior.
+        params (dict): Dict which can contains parameters for filtering or sorting or logic, sorting is ignored.
+
+    Returns:
+        Tuple of count and the last update time of selected adjustments.
+
+    """
+    query = _filter_adjustments(
+        select([func.count(), func.max(Adjustments.c.updated_at)]), {**params, "sort": None}
+    )
+    async with engine.acquire() as conn:
+        async with conn.execute(query) as cur:
+            return tuple(await cur.fetchone())
+
+
+async def get_project_adjustments_version(engine: Engine, project_uuid: str) -> tuple:
+    """Same as `get_adjustments_version` for all adjustments of project.
+
+    Args:
+        engine: Instance which provides a source of database connectivity and behavior.
+        project_uuid: Project id.
+
+    Returns:
+        Tuple of count and the last update time of adjustments of project.
+
+    """
+    query = select([func.count(), func.max(Adjustments.c.updated_at)]).where(
+        Adjustments.c.project_uuid == project_uuid
+    )
+    async with engine.acquire() as conn:
+        async with conn.execute(query) as cur:
+            return tuple(await cur.fetchone())
+
+
 async def update_adjustment(engine: Engine, adjustment_id: str, data: dict, user_obj: UserObject,
-                            headers: dict) -> dict:
+                            headers: dict, validate_project=None) -> dict:
     """This function updates adjustment with id which is specified.
 
+    Updated adjustment is returned by the same statement, so no additional select is needed.
+
     Args:
         engine: Instance which provides a source of database connectivity and behavior.
         adjustment_id: Id of adjustment.
         data: dict which contains values for: Comment, adjustment value, tier override, total rebate amount.
         user_obj: Instance which provide an information about the user.
         headers: Store information about `X-Client`, `Authorization` and `x-timezone`.
+        validate_project: Coroutine function which gets uuid of adjustment project before the update, adjustment
+                          is not updated if it raises. Defaults set to None.
 
     Returns:
         Dictionary which contains such information about adjustment: id, uuid of project, uuid of price group,
         uuid of bu, uuid of product, adjustment value, tier override, comment, user mail, full name of user,
         status and when it was updated.
 
+    Raises:
+        NotFoundException: If adjustment with `adjustment_id` doesn't exist, will raise this exception.
+
     """
     user_data = await user_obj.get_user_data()
+    update_query = Adjustments.update(
+    ).where(
+        Adjustments.c.id == adjustment_id
+    ).values(
+        adjustment_value=data['adjustment_value'],
+        tier_override=data['tier_override'],
+        comment=data['comment'],
+        user=user_data['profile'].get('login'),
+        user_full_name=f"{user_data['profile'].get('firstName')} {user_data['profile'].get('lastName')}"
+    ).returning(*Adjustments.c)
+
+    if validate_project:
+        # permission is checked before transaction, so no row lock is held during requests to other services
+        project_uuid = await _adjustment_project(engine, adjustment_id)
+        await validate_project(project_uuid)
+        update_query = update_query.where(Adjustments.c.project_uuid == project_uuid)
+
+    async def update(conn):
+        async with conn.execute(update_query) as cur:
+            adjustment = await cur.fetchone()
+        if not adjustment:
+            raise NotFoundException(message="Adjustment not found.")
+        await refresh_latest_adjustments(conn, [adjustment])
+        return adjustment
+
+    adjustment = await run_in_transaction(engine, update, "update_adjustment")
+    await _invalidate_cached_responses(engine, [adjustment['project_uuid']])
+
+    # Send warning
+    event = SYSTEM_EVENT_AMOUNT_OVERRIDE if data.get('adjustment_value') else SYSTEM_EVENT_TIER_OVERRIDE
+    await _send_system_event(headers.get('X-Client'), adjustment['project_uuid'], event)
+    return dict(adjustment)
+
+
+async def update_adjustments(engine: Engine, items: list, user_obj: UserObject, headers: dict,
+                             validate_project=None, atomic: bool = False) -> tuple:
+    """This function updates several adjustments with one statement in one transaction.
+
+    Permission is validated once for every project before the transaction is opened, then only adjustments of
+    permitted projects are updated. Adjustments which don't exist or belong to a project which fails validation
+    are reported as errors and are not updated.
+
+    Args:
+        engine: Instance which provides a source of database connectivity and behavior.
+        items: List of dicts with id of adjustment and the same values as `data` of `update_adjustment`.
+        user_obj: Instance which provide an information about the user.
+        headers: Store information about `X-Client`, `Authorization` and `x-timezone`.
+        validate_project: Coroutine function which gets uuid of adjustment project. Adjustments of project are
+                          not updated if it raises. Defaults set to None.
+        atomic: If True the first error is raised and nothing is updated. Defaults set to False.
+
+    Returns:
+        tuple: List of updated adjustments in the same order as `items` and list of errors, every error contains
+            id of adjustment, HTTP status code and message.
+
+    Raises:
+        ApplicationError: The first error of adjustment, if `atomic` is True.
+
+    """
+    user_data = await user_obj.get_user_data()
+    ids = [item['id'] for item in items]
+
+    # projects are validated before transaction, so no row locks are held during requests to other services
+    projects = await _adjustments_projects(engine, ids)
+    errors = {
+        adjustment_id: NotFoundException(message="Adjustment not found.")
+        for adjustment_id in ids if adjustment_id not in projects
+    }
+    if validate_project:
+        project_uuids = list(set(projects.values()))
+        results = await asyncio.gather(*map(validate_project, project_uuids), return_exceptions=True)
+        denied = {
+            project_uuid: error for project_uuid, error in zip(project_uuids, results) if isinstance(error, Exception)
+        }
+        for adjustment_id, project_uuid in projects.items():
+            if project_uuid in denied:
+                errors[adjustment_id] = denied[project_uuid]
+
+    for error in errors.values():
+        if not isinstance(error, ApplicationError) or atomic:
+            raise error
+
+    permitted = [item for item in items if item['id'] not in errors]
+    permitted_projects = {projects[item['id']] for item in permitted}
+
+    async def update(conn):
+        updated = {}
+        if permitted:
+            updated = await _update_adjustments_values(conn, permitted, user_data, permitted_projects)
+            await refresh_latest_adjustments(conn, list(updated.values()))
+        # adjustments deleted after validation
+        deleted = {
+            item['id']: NotFoundException(message="Adjustment not found.")
+            for item in permitted if item['id'] not in updated
+        }
+        if deleted and atomic:
+            raise next(iter(deleted.values()))
+        return [item for item in permitted if item['id'] in updated], updated, {**errors, **deleted}
+
+    changes, updated, errors = await run_in_transaction(engine, update, "update_adjustments")
+    await _invalidate_cached_responses(engine, [adjustment['project_uuid'] for adjustment in updated.values()])
+    events = {
+        (updated[item['id']]['project_uuid'],
+         SYSTEM_EVENT_AMOUNT_OVERRIDE if item.get('adjustment_value') else SYSTEM_EVENT_TIER_OVERRIDE)
+        for item in changes
+    }
+    await asyncio.gather(*(
+        _send_system_event(headers.get('X-Client'), project_uuid, event) for project_uuid, event in events
+    ))
+
+    return [updated[item['id']] for item in changes], [
+        {'id': adjustment_id, 'status': error.status_code, 'message': str(error)}
+        for adjustment_id, error in errors.items()
+    ]
+
+
+async def _adjustment_project(engine: Engine, adjustment_id: str):
+    """Returns uuid of project of adjustment.
+
+    Raises:
+        NotFoundException: If adjustment with `adjustment_id` doesn't exist.
+
+    """
+    query = select([Adjustments.c.project_uuid]).where(Adjustments.c.id == adjustment_id)
     async with engine.acquire() as conn:
-        async with Transaction(conn, IsolationLevel.serializable, readonly=False, deferrable=False) as tr:
-            async with tr.point():
-                await conn.execute(
-                    Adjustments.update(
-                    ).where(
-                        Adjustments.c.id == adjustment_id
-                    ).values(
-                        adjustment_value=data['adjustment_value'],
-                        tier_override=data['tier_override'],
-                        comment=data['comment'],
-                        user=user_data['profile'].get('login'),
-                        user_full_name=f"{user_data['profile'].get('firstName')} {user_data['profile'].get('lastName')}"
-                    )
-                )
-        adjustment = await get_adjustment_by_id(engine, adjustment_id)
-        # Send warning
-        event = SYSTEM_EVENT_AMOUNT_OVERRIDE if data.get('adjustment_value') else SYSTEM_EVENT_TIER_OVERRIDE
-        await _send_system_event(headers.get('X-Client'), adjustment.get('project_uuid'), event)
-        return dict(adjustment)
+        project_uuid = await conn.scalar(query)
+    if project_uuid is None:
+        raise NotFoundException(message="Adjustment not found.")
+    return project_uuid
+
+
+async def _adjustments_projects(engine: Engine, ids: list) -> dict:
+    """Returns uuids of projects of existing adjustments by their ids."""
+    query = select([Adjustments.c.id, Adjustments.c.project_uuid]).where(Adjustments.c.id.in_(ids))
+    async with engine.acquire() as conn:
+        return {row['id']: row['project_uuid'] async for row in await conn.execute(query)}
+
+
+async def _update_adjustments_values(conn, items: list, user_data: dict, project_uuids: set) -> dict:
+    """Updates adjustments of `project_uuids` with UPDATE ... FROM (VALUES ...) and returns them by id."""
+    changes = Values(
+        "changes",
+        [
+            column("id", Adjustments.c.id.type),
+            column("adjustment_value", Adjustments.c.adjustment_value.type),
+            column("tier_override", Adjustments.c.tier_override.type),
+            column("comment", Adjustments.c.comment.type),
+        ],
+        [(item['id'], item.get('adjustment_value'), item.get('tier_override'), item['comment']) for item in items]
+    )
+    update_query = Adjustments.update(
+    ).where(
+        and_(Adjustments.c.id == changes.c.id, Adjustments.c.project_uuid.in_(project_uuids))
+    ).values(
+        adjustment_value=changes.c.adjustment_value,
+        tier_override=changes.c.tier_override,
+        comment=changes.c.comment,
+        user=user_data['profile'].get('login'),
+        user_full_name=f"{user_data['profile'].get('firstName')} {user_data['profile'].get('lastName')}"
+    ).returning(*Adjustments.c)
+
+    updated = {}
+    async for row in await conn.execute(update_query):
+        updated[row['id']] = dict(row)
+    return updated
 
 
 async def delete_not_applied_adjustments(engine: Engine, data: dict):
@@ -134,20 +408,26 @@ async def delete_not_applied_adjustments(engine: Engine, data: dict):
         data: Dict which contains value of uuid of project.
 
     """
-    async with engine.acquire() as conn:
-        async with Transaction(conn, IsolationLevel.serializable, readonly=False, deferrable=False) as tr:
-            async with tr.point():
-                await conn.execute(
-                    Adjustments.delete(
-                    ).where(and_(
-                        Adjustments.c.project_uuid == data["project_uuid"],
-                        Adjustments.c.status == AdjustmentStatuses.not_applied.value
-                    )
-                    )
-                )
-
-
-async def apply_adjustments(engine: Engine, data: dict):
+    await run_in_transaction(
+        engine, partial(_delete_not_applied_adjustments, project_uuid=data['project_uuid']),
+        "delete_not_applied_adjustments"
+    )
+    await _invalidate_cached_responses(engine, [data['project_uuid']])
+
+
+async def _delete_not_applied_adjustments(conn, project_uuid):
+    await conn.execute(
+        Adjustments.delete(
+        ).where(and_(
+            Adjustments.c.project_uuid == project_uuid,
+            Adjustments.c.status == AdjustmentStatuses.not_applied.value
+        )
+        )
+    )
+    await refresh_project_latest_adjustments(conn, project_uuid)
+
+
+async def apply_adjustments(engine: Engine, data: dict) -> int:
     """Applies adjustments.
 
     This function applies adjustments with status 'Not Applied' for some project which has the same uuid as
@@ -157,61 +437,168 @@ async def apply_adjustments(engine: Engine, data: dict):
         engine: Instance which provide a source of database connectivity and behavior.
         data: Dict which contains value of uuid of project.
 
+    Returns:
+        Count of applied adjustments.
+
     """
-    async with engine.acquire() as conn:
-        async with Transaction(conn, IsolationLevel.serializable, readonly=False, deferrable=False) as tr:
-            async with tr.point():
-                await conn.execute(
-                    Adjustments.update(
-                    ).where(and_(
-                        Adjustments.c.project_uuid == data["project_uuid"],
-                        Adjustments.c.status != AdjustmentStatuses.applied.value
-                    )
-                    ).values(
-                        status=AdjustmentStatuses.applied.value
-                    )
-                )
-
-
-async def get_adjustments(engine: Engine, params, paging):
+    applied = await run_in_transaction(
+        engine, partial(_apply_adjustments, project_uuid=data['project_uuid']), "apply_adjustments"
+    )
+    await _invalidate_cached_responses(engine, [data['project_uuid']])
+    return applied
+
+
+async def _apply_adjustments(conn, project_uuid) -> int:
+    result = await conn.execute(
+        Adjustments.update(
+        ).where(and_(
+            Adjustments.c.project_uuid == project_uuid,
+            Adjustments.c.status == AdjustmentStatuses.not_applied.value
+        )
+        ).values(
+            status=AdjustmentStatuses.applied.value
+        )
+    )
+    # Applied adjustments get the same `updated_at`, so the latest adjustment of key may change
+    await refresh_project_latest_adjustments(conn, project_uuid)
+    return result.rowcount
+
+
+def _selected_columns(columns: list = None) -> list:
+    """Returns columns of adjustments with names `columns` or all columns if it is empty."""
+    return [Adjustments.c[name] for name in columns] if columns else list(Adjustments.c)
+
+
+def _filter_adjustments(query, params):
+    """Applies filters, sorting and logic of `params` to `query` which selects adjustments."""
+    return query_manager.apply_filter(
+        table=Adjustments,
+        query=query,
+        filters=params.get("filter"),
+        sorting=params.get("sort"),
+        logic=params.get("logic")
+    )
+
+
+async def _count_adjustments(conn, query, count_mode: str, filtered: bool):
+    """Counts adjustments selected by `query` in specified mode.
+
+    Args:
+        conn: Connection to database.
+        query: Select query without paging.
+        count_mode: One of `CountModes` values.
+        filtered: Flag which is True if filters were applied to query.
+
+    Returns:
+        Total count of adjustments or None in `none` mode.
+
+    """
+    if count_mode == CountModes.exact.value:
+        cur = await conn.execute(query_manager.apply_counts(query))
+        return await cur.scalar()
+    if count_mode == CountModes.estimate.value:
+        if filtered:
+            return await estimate_count(conn, query)
+        return await estimate_table_count(conn, Adjustments)
+    return None
+
+
+async def get_adjustments(engine: Engine, params, paging, count_mode: str = CountModes.exact.value,
+                          columns: list = None):
     """Gets all adjustments.
 
     This function gets all adjustments which satisfy filter. Maximum total count of adjustments which function can
     return is equal to `per_page` parameter.
 
+    In `exact` count mode total count is selected in the same query as the page with `count(*) OVER ()`, in
+    `estimate` mode it is taken from the planner's estimate and in `none` mode it is not calculated.
+
     Args:
         engine: Instance which provides a source of database connectivity and behavior.
         params (dict): Dict which can contains parameters for filtering or sorting or logic.
         paging (dict): Dict which contains two keys: `page` and `per_page`.
+        count_mode: One of `CountModes` values.
+        columns: Names of selected columns, all columns are selected if it is empty. Defaults set to None.
 
     Returns:
-        tuple: List of adjustments info and total count of adjustments.
+        tuple: List of adjustments info and total count of adjustments or None in `none` count mode.
 
     """
-    query = select([Adjustments])
-    query = query_manager.apply_filter(
-        table=Adjustments,
-        query=query,
-        filters=params.get("filter"),
-        sorting=params.get("sort"),
-        logic=params.get("logic")
-    )
-    count_query = query_manager.apply_counts(query)
-    if paging.get("page"):
-        query = query_manager.apply_paging(query, paging)
+    exact = count_mode == CountModes.exact.value
+    selected = _selected_columns(columns)
+    if exact:
+        selected.append(func.count().over().label("total_count"))
+    query = _filter_adjustments(select(selected), params)
+    page_query = query_manager.apply_paging(query, paging) if paging.get("page") else query
 
     async with engine.acquire() as conn:
         adjustments = []
-        async for row in await conn.execute(query):
+        async for row in await conn.execute(page_query):
             adjustments.append(dict(row))
 
-        cur = await conn.execute(count_query)
-        total_count = await cur.scalar()
+        if exact and adjustments:
+            total_count = adjustments[0]["total_count"]
+            for adjustment in adjustments:
+                del adjustment["total_count"]
+        elif exact and paging.get("page", 1) == 1:
+            total_count = 0
+        else:
+            total_count = await _count_adjustments(conn, query, count_mode, bool(params.get("filter")))
 
     return adjustments, total_count
 
 
-async def remove_deprecated_adjustments(engine: Engine, data: dict):
+async def get_adjustments_by_cursor(engine: Engine, params, per_page: int, cursor: str = None,
+                                    count_mode: str = CountModes.none.value, columns: list = None):
+    """Gets page of adjustments which follow cursor.
+
+    This function gets adjustments which satisfy filter using keyset pagination: the page is selected by values of
+    sort keys of the last row of the previous page, so no rows are skipped with OFFSET. Total count is not counted
+    unless other count mode is requested.
+
+    Args:
+        engine: Instance which provides a source of database connectivity and behavior.
+        params (dict): Dict which can contains parameters for filtering or sorting or logic.
+        per_page: Maximum count of adjustments on page.
+        cursor: Cursor returned with the previous page, the first page is returned if it is empty.
+        count_mode: One of `CountModes` values.
+        columns: Names of selected columns, all columns are selected if it is empty. Defaults set to None.
+
+    Returns:
+        tuple: List of adjustments info, cursor of the next page or None if there is no next page and total count
+            of adjustments or None in `none` count mode.
+
+    """
+    selected = _selected_columns(columns)
+    query = _filter_adjustments(select(selected), params)
+    keys = sort_keys(query, tie_breaker=Adjustments.c.id)
+    page_query = order_by_keys(query, keys)
+    # Values of sort keys of the last row are needed for cursor even if they are not requested
+    names = [column.name for column in selected]
+    missing_keys = [key for key, _ in keys if key.name not in names]
+    for key in missing_keys:
+        page_query = page_query.column(key)
+    if cursor:
+        page_query = page_query.where(after_cursor(keys, decode_cursor(keys, cursor)))
+    page_query = page_query.limit(per_page + 1)
+
+    async with engine.acquire() as conn:
+        adjustments = []
+        async for row in await conn.execute(page_query):
+            adjustments.append(dict(row))
+
+        total_count = await _count_adjustments(conn, query, count_mode, bool(params.get("filter")))
+
+    next_cursor = None
+    if len(adjustments) > per_page:
+        adjustments = adjustments[:per_page]
+        next_cursor = encode_cursor(keys, adjustments[-1])
+    if missing_keys:
+        adjustments = [{name: adjustment[name] for name in names} for adjustment in adjustments]
+    return adjustments, next_cursor, total_count
+
+
+async def remove_deprecated_adjustments(engine: Engine, data: dict) -> int:
     """Removes deprecated adjustments.
 
     This function deletes applied adjustment if for the same combination of
@@ -221,39 +608,183 @@ async def remove_deprecated_adjustments(engine: Engine, data: dict):
         engine: Instance which provide a source of database connectivity and behavior.
         data: Dict which contains value of uuid of project.
 
+    Returns:
+        Count of removed adjustments.
+
     """
-    adjustments1 = Adjustments.alias('adjustments1')
+    removed = await run_in_transaction(
+        engine, partial(_remove_deprecated_adjustments, project_uuid=data['project_uuid']),
+        "remove_deprecated_adjustments"
+    )
+    await _invalidate_cached_responses(engine, [data['project_uuid']])
+    return removed
 
-    delete_query = Adjustments.delete(
-    ).where(
-        and_(
-            Adjustments.c.project_uuid == data['project_uuid'],
-            Adjustments.c.status == AdjustmentStatuses.applied.value,
-            exists(select([adjustments1.c.id]).where(
-                and_(
-                    Adjustments.c.project_uuid == adjustments1.c.project_uuid,
-                    Adjustments.c.price_group_uuid == adjustments1.c.price_group_uuid,
-                    or_(
-                        Adjustments.c.bu_uuid == adjustments1.c.bu_uuid,
-                        Adjustments.c.bu_uuid.is_(None)
-                    ),
-                    or_(
-                        Adjustments.c.product_uuid == adjustments1.c.product_uuid,
-                        Adjustments.c.product_uuid.is_(None)
-                    ),
-                    adjustments1.c.status == AdjustmentStatuses.not_applied.value
-                )
-            ))
-        )
+
+async def _remove_deprecated_adjustments(conn, project_uuid) -> int:
+    delete_query = Adjustments.delete().where(deprecated_adjustments_filter(project_uuid))
+    result = await conn.execute(delete_query)
+    await refresh_project_latest_adjustments(conn, project_uuid)
+    return result.rowcount
+
+
+def deprecated_adjustments_filter(project_uuid):
+    """Returns condition of applied adjustments of project which are replaced by not applied adjustments.
+
+    Applied adjustment is deprecated if not applied adjustment exists for the same price group, bu and product,
+    where NULL bu or product of applied adjustment matches any value. Instead of one correlated subquery with
+    `OR ... IS NULL`, which can't use an index, every combination of NULL columns of applied adjustment gets
+    own subquery with plain equalities, so each of them is an index scan of the not applied adjustments.
+
+    Args:
+        project_uuid: Project id.
+
+    Returns:
+        Condition for where clause of query on `Adjustments` table.
+
+    """
+    branches = []
+    for wildcards in itertools.product((False, True), repeat=2):
+        not_applied = Adjustments.alias('not_applied')
+        guards = []
+        conditions = [
+            not_applied.c.project_uuid == Adjustments.c.project_uuid,
+            not_applied.c.price_group_uuid == Adjustments.c.price_group_uuid,
+            not_applied.c.status == AdjustmentStatuses.not_applied.value,
+        ]
+        for name, wildcard in zip(('bu_uuid', 'product_uuid'), wildcards):
+            if wildcard:
+                guards.append(Adjustments.c[name].is_(None))
+            else:
+                guards.append(Adjustments.c[name].isnot(None))
+                conditions.append(not_applied.c[name] == Adjustments.c[name])
+        branches.append(and_(*guards, exists(select([not_applied.c.id]).where(and_(*conditions)))))
+
+    return and_(
+        Adjustments.c.project_uuid == project_uuid,
+        Adjustments.c.status == AdjustmentStatuses.applied.value,
+        or_(*branches)
     )
 
-    async with engine.acquire() as conn:
-        async with Transaction(conn, IsolationLevel.serializable, readonly=False, deferrable=False) as tr:
-            async with tr.point():
-                await conn.execute(delete_query)
 
+async def finalize_project_adjustments(engine: Engine, data: dict) -> dict:
+    """Removes deprecated adjustments and applies not applied adjustments of project in one transaction.
+
+    Transaction is retried on serialization failure.
+
+    Args:
+        engine: Instance which provide a source of database connectivity and behavior.
+        data: Dict which contains value of uuid of project.
+
+    Returns:
+        Dict with counts of `removed` and `applied` adjustments.
+
+    """
+    async def finalize(conn):
+        return {
+            'removed': await _remove_deprecated_adjustments(conn, data['project_uuid']),
+            'applied': await _apply_adjustments(conn, data['project_uuid']),
+        }
+
+    counts = await run_in_transaction(engine, finalize, "finalize_project_adjustments")
+    await _invalidate_cached_responses(engine, [data['project_uuid']])
+    return counts
+
+
+async def replace_project_adjustments(engine: Engine, project_uuid: str, items: list, user_obj: UserObject,
+                                      headers: dict) -> tuple:
+    """Replaces not applied adjustments of project with desired set in one transaction.
 
-async def get_project_adjustments(engine: Engine, project_uuid: str) -> list:
+    Desired adjustments are matched with current not applied adjustments by price_group_uuid, bu_uuid and
+    product_uuid in SQL: missing ones are inserted, changed ones are updated and not desired ones are deleted.
+    Unchanged adjustments are not touched.
+
+    Args:
+        engine: Instance which provides a source of database connectivity and behavior.
+        project_uuid: Project id.
+        items: List of dicts with the same values as `data` of `create_adjustment` except uuid of project,
+               combination of price_group_uuid, bu_uuid and product_uuid must be unique.
+        user_obj: Instance which provide an information about the user.
+        headers: Store information about `X-Client`, `Authorization` and `x-timezone`.
+
+    Returns:
+        tuple: Dict with counts of `inserted`, `updated` and `deleted` adjustments and list of inserted and
+            updated adjustments.
+
+    """
+    user_data = await user_obj.get_user_data()
+    desired = Values(
+        "desired",
+        [column(name, Adjustments.c[name].type) for name in _REPLACED_COLUMNS],
+        [tuple(item.get(name) for name in _REPLACED_COLUMNS) for item in items] or [(None,) * len(_REPLACED_COLUMNS)]
+    )
+    pending = and_(
+        Adjustments.c.project_uuid == project_uuid,
+        Adjustments.c.status == AdjustmentStatuses.not_applied.value
+    )
+    same_key = and_(
+        Adjustments.c.price_group_uuid == desired.c.price_group_uuid,
+        Adjustments.c.bu_uuid.isnot_distinct_from(desired.c.bu_uuid),
+        Adjustments.c.product_uuid.isnot_distinct_from(desired.c.product_uuid)
+    )
+    author = {
+        'user': user_data['profile'].get('login'),
+        'user_full_name': f"{user_data['profile'].get('firstName')} {user_data['profile'].get('lastName')}",
+    }
+
+    delete_query = Adjustments.delete().where(and_(pending, ~exists(select([desired.c.id]).where(same_key))))
+    update_query = Adjustments.update().where(and_(
+        pending,
+        same_key,
+        or_(
+            Adjustments.c.adjustment_value.is_distinct_from(desired.c.adjustment_value),
+            Adjustments.c.tier_override.is_distinct_from(desired.c.tier_override),
+            Adjustments.c.comment.is_distinct_from(desired.c.comment)
+        )
+    )).values(
+        adjustment_value=desired.c.adjustment_value,
+        tier_override=desired.c.tier_override,
+        comment=desired.c.comment,
+        **author
+    ).returning(*Adjustments.c)
+    inserted_values = {
+        'project_uuid': project_uuid,
+        'status': AdjustmentStatuses.not_applied.value,
+        'updated_at': datetime.utcnow(),
+        **author,
+    }
+    inserted_columns = {
+        **{name: desired.c[name] for name in _REPLACED_COLUMNS},
+        **{
+            name: cast(literal(value, Adjustments.c[name].type), Adjustments.c[name].type)
+            for name, value in inserted_values.items()
+        },
+    }
+    insert_query = Adjustments.insert().from_select(
+        list(inserted_columns),
+        select(list(inserted_columns.values())).where(and_(
+            desired.c.id.isnot(None),
+            ~exists(select([Adjustments.c.id]).where(and_(pending, same_key)))
+        ))
+    ).returning(*Adjustments.c)
+
+    async def replace(conn):
+        deleted = (await conn.execute(delete_query)).rowcount
+        changed = [dict(row) async for row in await conn.execute(update_query)]
+        updated = len(changed)
+        changed.extend([dict(row) async for row in await conn.execute(insert_query)])
+        await refresh_project_latest_adjustments(conn, project_uuid)
+        return deleted, updated, changed
+
+    deleted, updated, changed = await run_in_transaction(engine, replace, "replace_project_adjustments")
+    await _invalidate_cached_responses(engine, [project_uuid])
+
+    events = {_override_event(adjustment) for adjustment in changed}
+    await asyncio.gather(*(_send_system_event(headers.get('X-Client'), project_uuid, event) for event in events))
+    counts = {'inserted': len(changed) - updated, 'updated': updated, 'deleted': deleted}
+    return counts, changed
+
+
+async def get_project_adjustments(engine: Engine, project_uuid: str, columns: list = None) -> list:
     """Gives data of the latest adjustments.
 
     This function gives data of the latest adjustments for each combination
@@ -262,39 +793,79 @@ async def get_project_adjustments(engine: Engine, project_uuid: str) -> list:
     Args:
         engine: Instance which provide a source of database connectivity and behavior.
         project_uuid: Project id.
+        columns: Names of selected columns, all columns are selected if it is empty. Defaults set to None.
 
     Returns:
         The latest adjustment for each combination of price_group_uuid, bu_uuid and product_uuid for particular project.
 
     """
-    partitions_ordered_by_date = select(
-        [
-            Adjustments,
-            func.row_number().over(
-                partition_by=(
-                    Adjustments.c.price_group_uuid,
-                    Adjustments.c.bu_uuid,
-                    Adjustments.c.product_uuid,
-                    Adjustments.c.project_uuid
-                ),
-                order_by=Adjustments.c.updated_at.desc()).label('row_numb')
-        ]
-    ).alias('partitions_ordered_by_date')
-
-    query = select([Adjustments]).where(
-        and_(
-            partitions_ordered_by_date.c.row_numb == 1,
-            Adjustments.c.id == partitions_ordered_by_date.c.id,
-            Adjustments.c.project_uuid == project_uuid
-        )
-    )
     async with engine.acquire() as conn:
         adjustments = []
-        async for row in await conn.execute(query):
+        async for row in await conn.execute(_project_adjustments_query(project_uuid, columns)):
             adjustments.append(dict(row))
     return adjustments
 
 
+def stream_project_adjustments(engine: Engine, project_uuid: str, columns: list = None):
+    """Same as `get_project_adjustments`, but adjustments are read from server-side cursor in batches.
+
+    Args:
+        engine: Engine which connection is held until all batches are read.
+        project_uuid: Project id.
+        columns: Names of selected columns, all columns are selected if it is empty. Defaults set to None.
+
+    Returns:
+        Async iterator of batches of adjustments.
+
+    """
+    return fetch_batches(engine, _project_adjustments_query(project_uuid, columns))
+
+
+def stream_adjustments(engine: Engine, params, columns: list = None):
+    """Same as `get_adjustments` without paging, but adjustments are read from server-side cursor in batches.
+
+    Args:
+        engine: Engine which connection is held until all batches are read.
+        params (dict): Dict which can contains parameters for filtering or sorting or logic.
+        columns: Names of selected columns, all columns are selected if it is empty. Defaults set to None.
+
+    Returns:
+        Async iterator of batches of adjustments.
+
+    """
+    return fetch_batches(engine, _filter_adjustments(select(_selected_columns(columns)), params))
+
+
+def _project_adjustments_query(project_uuid: str, columns: list = None):
+    # The latest adjustment of every key is maintained in `latest_adjustments` on write, so read is an index scan
+    # of keys of the requested project joined with adjustments by primary key.
+    return select(_selected_columns(columns)).select_from(
+        LatestAdjustments.join(Adjustments, Adjustments.c.id == LatestAdjustments.c.adjustment_id)
+    ).where(
+        LatestAdjustments.c.project_uuid == project_uuid
+    ).order_by(
+        LatestAdjustments.c.price_group_uuid,
+        LatestAdjustments.c.bu_uuid,
+        LatestAdjustments.c.product_uuid
+    )
+
+
+async def _invalidate_cached_responses(engine, project_uuids):
+    """Invalidates cached responses about adjustments of projects after the change is committed.
+
+    Write is registered before the versions of projects are replaced, so reads of the client which see a new version
+    are sent to primary by this worker right away.
+
+    Args:
+        engine: Unit of work of request, which knows client of request, or Engine which responses are not cached for.
+        project_uuids: Ids of changed projects.
+
+    """
+    if isinstance(engine, UnitOfWork):
+        register_write(engine.client)
+        await invalidate_projects(engine.client, project_uuids)
+
+
 async def _send_system_event(client, project_uuid, event):
     """This private method used for sending warnings about some event.
 
@@ -323,6 +894,34 @@ async def _send_system_event(client, project_uuid, event):
 
 @asyncio_task
 async def log_audit_overrides(request_payload, new_adjustment, headers):
+    """This function used for creating information about adjustment changes in background.
+
+    Args:
+        request_payload (dict): Payload of request, see `_log_audit_override`.
+        new_adjustment (dict): Created or updated adjustment.
+        headers (CIMultiDict): Headers of request.
+
+    """
+    await _log_audit_override(request_payload, new_adjustment, headers)
+
+
+@asyncio_task
+async def log_audit_overrides_batch(request_payloads, new_adjustments, headers):
+    """This function used for creating information about changes of several adjustments in one background task.
+
+    Args:
+        request_payloads (list): Payloads of adjustments in request, see `_log_audit_override`.
+        new_adjustments (list): Created or updated adjustments in the same order as `request_payloads`.
+        headers (CIMultiDict): Headers of request.
+
+    """
+    await asyncio.gather(*(
+        _log_audit_override(request_payload, new_adjustment, headers)
+        for request_payload, new_adjustment in zip(request_payloads, new_adjustments)
+    ))
+
+
+async def _log_audit_override(request_payload, new_adjustment, headers):
     """This function used for creating information about adjustment changes.
 
     Args:
@@ -0,0 +1,131 @@
+"""Provide maintenance of the projection of the latest adjustments.
+
+`latest_adjustments` table points at the latest adjustment of every combination of project_uuid, price_group_uuid,
+bu_uuid and product_uuid, so project adjustments are read with an index lookup instead of choosing the latest rows
+of all versions at read time. Every function which changes `adjustments` refreshes the projection with the same
+connection, so it is changed in the same transaction.
+
+"""
+
+from aiopg.sa import Engine
+from sqlalchemy.sql import select, and_, exists, column, func
+
+from service_api.models import Adjustments, LatestAdjustments
+from service_api.services.sql import Values
+from service_api.services.unit_of_work import run_in_transaction
+
+KEY_COLUMNS = ('project_uuid', 'price_group_uuid', 'bu_uuid', 'product_uuid')
+LATEST_COLUMNS = ('adjustment_id',) + KEY_COLUMNS
+
+
+def latest_adjustments_query(condition=None):
+    """Returns query which selects id and key of the latest adjustment of every key from `adjustments` table.
+
+    Args:
+        condition: Condition on `Adjustments` table which limits recalculated keys. Defaults set to None.
+
+    Returns:
+        Select query with `LATEST_COLUMNS` columns.
+
+    """
+    keys = [Adjustments.c[name] for name in KEY_COLUMNS]
+    query = select(
+        [Adjustments.c.id.label('adjustment_id')] + keys
+    ).distinct(
+        *keys
+    ).order_by(
+        *keys, Adjustments.c.updated_at.desc(), Adjustments.c.id.desc()
+    )
+    return query if condition is None else query.where(condition)
+
+
+async def refresh_latest_adjustments(conn, adjustments: list):
+    """Recalculates the latest adjustments of keys of `adjustments`.
+
+    Args:
+        conn: Connection with transaction which changed `adjustments`.
+        adjustments: List of created or updated adjustments as dicts with `KEY_COLUMNS`.
+
+    """
+    keys = {tuple(adjustment[name] for name in KEY_COLUMNS) for adjustment in adjustments}
+    if not keys:
+        return
+    changed = Values("changed_keys", [column(name, Adjustments.c[name].type) for name in KEY_COLUMNS], list(keys))
+    await conn.execute(LatestAdjustments.delete().where(
+        exists(select([changed.c.project_uuid]).where(_same_key(LatestAdjustments, changed)))
+    ))
+    await conn.execute(LatestAdjustments.insert().from_select(LATEST_COLUMNS, latest_adjustments_query(
+        exists(select([changed.c.project_uuid]).where(_same_key(Adjustments, changed)))
+    )))
+
+
+async def refresh_project_latest_adjustments(conn, project_uuid):
+    """Recalculates the latest adjustments of all keys of project.
+
+    Args:
+        conn: Connection with transaction which changed adjustments of project.
+        project_uuid: Project id.
+
+    """
+    await conn.execute(LatestAdjustments.delete().where(LatestAdjustments.c.project_uuid == project_uuid))
+    await conn.execute(LatestAdjustments.insert().from_select(
+        LATEST_COLUMNS, latest_adjustments_query(Adjustments.c.project_uuid == project_uuid)
+    ))
+
+
+async def rebuild_latest_adjustments(engine: Engine) -> int:
+    """Recalculates the whole projection from `adjustments` table in one transaction.
+
+    Args:
+        engine: Instance which provides a source of database connectivity and behavior.
+
+    Returns:
+        Count of keys in the projection.
+
+    """
+    async def rebuild(conn):
+        await conn.execute(LatestAdjustments.delete())
+        result = await conn.execute(LatestAdjustments.insert().from_select(LATEST_COLUMNS, latest_adjustments_query()))
+        return result.rowcount
+
+    return await run_in_transaction(engine, rebuild, "rebuild_latest_adjustments")
+
+
+async def check_latest_adjustments(engine: Engine) -> list:
+    """Compares the projection with the latest adjustments calculated from `adjustments` table.
+
+    Args:
+        engine: Instance which provides a source of database connectivity and behavior.
+
+    Returns:
+        List of inconsistencies as dicts with `project_uuid`, `expected_id` of the latest adjustment which is
+        missing in the projection and `actual_id` of adjustment which is in the projection but is not the latest,
+        one of ids is None. Empty list if projection is consistent.
+
+    """
+    expected = latest_adjustments_query().alias('expected')
+    query = select([
+        func.coalesce(expected.c.project_uuid, LatestAdjustments.c.project_uuid).label('project_uuid'),
+        expected.c.adjustment_id.label('expected_id'),
+        LatestAdjustments.c.adjustment_id.label('actual_id'),
+    ]).select_from(
+        expected.outerjoin(LatestAdjustments, expected.c.adjustment_id == LatestAdjustments.c.adjustment_id, full=True)
+    ).where(
+        expected.c.adjustment_id.is_(None) | LatestAdjustments.c.adjustment_id.is_(None)
+    )
+
+    async with engine.acquire() as conn:
+        inconsistencies = []
+        async for row in await conn.execute(query):
+            inconsistencies.append(dict(row))
+    return inconsistencies
+
+
+def _same_key(table, keys):
+    """Returns condition that row of `table` has key of row of `keys`, NULL bu or product matches NULL only."""
+    return and_(
+        table.c.project_uuid == keys.c.project_uuid,
+        table.c.price_group_uuid == keys.c.price_group_uuid,
+        table.c.bu_uuid.isnot_distinct_from(keys.c.bu_uuid),
+        table.c.product_uuid.isnot_distinct_from(keys.c.product_uuid)
+    )
@@ -8,7 +8,9 @@ from sqlalchemy import (
     String,
     Table,
     DECIMAL,
-    DateTime
+    DateTime,
+    ForeignKey,
+    Index
 )
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 
@@ -30,4 +32,43 @@ Adjustments = Table(
     Column("updated_at", DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False),
 )
 
-models = (Adjustments,)
+# Keep in sync with `migrations/changesets/addAdjustmentsIndexes.xml`, which creates the same indexes for existing
+# client databases. Status literal is duplicated from `AdjustmentStatuses` to avoid circular import with forms.
+Index(
+    "ix_adjustments_project_key_updated_at",
+    Adjustments.c.project_uuid,
+    Adjustments.c.price_group_uuid,
+    Adjustments.c.bu_uuid,
+    Adjustments.c.product_uuid,
+    Adjustments.c.updated_at.desc(),
+)
+Index(
+    "ix_adjustments_not_applied_project_key",
+    Adjustments.c.project_uuid,
+    Adjustments.c.price_group_uuid,
+    Adjustments.c.bu_uuid,
+    Adjustments.c.product_uuid,
+    postgresql_where=Adjustments.c.status == "Not Applied",
+)
+
+# Projection of `adjustments` which points at the latest adjustment of every (project, price group, bu, product)
+# key. It is maintained by write functions of `service_api.domain.latest_adjustments` in the same transaction as
+# the change of `adjustments`, keep in sync with `migrations/changesets/addLatestAdjustments.xml`.
+LatestAdjustments = Table(
+    "latest_adjustments",
+    metadata,
+    Column("adjustment_id", UUID(as_uuid=True), ForeignKey("adjustments.id", ondelete="CASCADE"), primary_key=True),
+    Column("project_uuid", UUID(as_uuid=True), nullable=False),
+    Column("price_group_uuid", UUID(as_uuid=True), nullable=False),
+    Column("bu_uuid", UUID(as_uuid=True), nullable=True),
+    Column("product_uuid", UUID(as_uuid=True), nullable=True),
+)
+Index(
+    "ix_latest_adjustments_project_key",
+    LatestAdjustments.c.project_uuid,
+    LatestAdjustments.c.price_group_uuid,
+    LatestAdjustments.c.bu_uuid,
+    LatestAdjustments.c.product_uuid,
+)
+
+models = (Adjustments, LatestAdjustments)
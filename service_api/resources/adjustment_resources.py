@@ -1,30 +1,56 @@
 """This module contains endpoints for adjustments."""
 
+import asyncio
+import re
+from functools import partial
+
 from rfcommon_api.common.domain.user import UserObject
 from rfcommon_api.common.exceptions import PermissionDenied, UnprocessibleEntity
 from rfcommon_api.common.paginators import PaginationSchema, Pagination
 from rfcommon_api.common.reqresp import map_response
-from sanic.response import json
+from sanic.response import json, HTTPResponse
 
 from service_api.constants import (
     WORKFLOW_STEP_ANALYST_REVIEW, WORKFLOW_SUBSTEP_ADJUSTMENTS, ADJUSTMENT_UPDATED_TOPIC
 )
 from service_api.domain.adjustment import (
     create_adjustment,
+    create_adjustments,
     get_adjustment_by_id,
+    get_adjustment_version,
     update_adjustment,
+    update_adjustments,
     delete_not_applied_adjustments,
     apply_adjustments,
     get_adjustments,
+    get_adjustments_by_cursor,
+    get_adjustments_version,
     remove_deprecated_adjustments,
+    finalize_project_adjustments,
+    replace_project_adjustments,
     get_project_adjustments,
-    log_audit_overrides
+    get_project_adjustments_version,
+    stream_adjustments,
+    stream_project_adjustments,
+    log_audit_overrides,
+    log_audit_overrides_batch
 )
 from service_api.resources import BaseResource
+from service_api.services.etag import conditional_response
 from service_api.services.forms import (
-    CreateAdjustmentForm, UpdateAdjustmentForm, AppliedAdjustmentsForm, AdjustmentFilteringSchema
+    CreateAdjustmentForm, BulkCreateAdjustmentsForm, UpdateAdjustmentForm, BulkUpdateAdjustmentsForm,
+    AppliedAdjustmentsForm, ReplaceProjectAdjustmentsForm, AdjustmentFilteringSchema, CountForm, CountModes,
+    FieldsForm
+)
+from service_api.services.pagination import (
+    COUNT_MODE_HEADER, cursor_pagination_headers, uncounted_pagination_headers
 )
+from service_api.services.response_cache import cached_response, project_version
 from service_api.services.rest_client import RESTClientRegistry
+from service_api.services.serialization import serialize_adjustments
+from service_api.services.streaming import accepts_ndjson, ndjson_response
+
+PROJECT_FILTER = re.compile(r"^project_uuid eq ([0-9a-fA-F-]{36})$")
 
 
 class AdjustmentsResource(BaseResource):
@@ -36,23 +62,89 @@ class AdjustmentsResource(BaseResource):
         Args:
             request: Instance of sanic.request.Request class.
 
+        If `pagination=cursor` or `cursor` parameter is passed adjustments are paginated by cursor: the first page
+        is returned without cursor, `Link` header contains url of the next page and total count is not calculated
+        by default.
+
+        `count` parameter selects how `X-Pagination-Total-Count` is calculated: `exact` (default of offset
+        pagination), `estimate` (the planner's estimate) or `none` (default of cursor pagination, header is not set).
+        Count mode is returned in `X-Pagination-Count-Mode` header.
+
+        `fields` parameter contains comma separated names of returned columns, e.g. `fields=id,adjustment_value`,
+        all columns are returned by default.
+
+        If `Accept` header contains `application/x-ndjson` all adjustments which satisfy filter are streamed as
+        newline delimited JSON without pagination. `application/x-columnar+json` returns names of columns once and
+        an array of values of every column, `application/msgpack` returns names of columns and rows as arrays in
+        MessagePack.
+
+        Response of request filtered by one project is cached until adjustments of the project are changed, its weak
+        `ETag` is derived from version of the project. ETag of other responses (or of every response if cache is
+        disabled) is derived from count and the last update time of adjustments which satisfy filter. Request with
+        `If-None-Match` which contains current ETag gets HTTP status code 304 before adjustments are selected.
+
         Returns:
             List with information about adjustments, HTTP status code 200 and headers with such parameters as
-            `X-Pagination-Current-Page`, `X-Pagination-Per-Page`, `X-Pagination-Total-Count`.
+            `X-Pagination-Current-Page`, `X-Pagination-Per-Page`, `X-Pagination-Total-Count`,
+            `X-Pagination-Count-Mode`.
 
         Example:
             .. include:: /endpoints_examples/adjustments_resource_get.txt
 
         """
         params, _ = AdjustmentFilteringSchema().load(dict(request.args))
-        paging, _ = PaginationSchema().load(request.args)
-        adjustments, count = await get_adjustments(request["db_engine"], params, paging)
-        paginator = Pagination(total_count=count,
-                               url=request.url,
-                               page=paging['page'],
-                               per_page=paging['per_page'])
+        columns = _requested_columns(request)
+        if accepts_ndjson(request):
+            return ndjson_response(
+                request, stream_adjustments(await request["db_read_engine"].engine(), params, columns)
+            )
 
-        return json(map_response(request, adjustments), status=200, headers=paginator.pagination_headers())
+        paging, _ = PaginationSchema().load(request.args)
+        counting, _ = CountForm().load({"count": request.args.get("count")} if "count" in request.args else {})
+
+        async def build():
+            if "cursor" in request.args or request.args.get("pagination") == "cursor":
+                count_mode = counting.get("count", CountModes.none.value)
+                adjustments, next_cursor, count = await get_adjustments_by_cursor(
+                    request["db_read_engine"], params, paging['per_page'], request.args.get("cursor"), count_mode,
+                    columns
+                )
+                headers = cursor_pagination_headers(request.url, paging['per_page'], next_cursor)
+                if count is not None:
+                    headers["X-Pagination-Total-Count"] = count
+            else:
+                count_mode = counting.get("count", CountModes.exact.value)
+                adjustments, count = await get_adjustments(
+                    request["db_read_engine"], params, paging, count_mode, columns
+                )
+                if count is None:
+                    headers = uncounted_pagination_headers(request.url, paging['page'], paging['per_page'],
+                                                           has_next=len(adjustments) == paging['per_page'])
+                else:
+                    headers = Pagination(total_count=count,
+                                         url=request.url,
+                                         page=paging['page'],
+                                         per_page=paging['per_page']).pagination_headers()
+            headers[COUNT_MODE_HEADER] = count_mode
+            headers["Vary"] = "Accept"
+            payload, content_type = serialize_adjustments(request, adjustments)
+            return payload, headers, content_type
+
+        project_uuid = _filtered_project(request)
+        if project_uuid:
+            version = await project_version(request, project_uuid)
+            if version is not None:
+                return await conditional_response(
+                    request, "adjustments",
+                    partial(cached_response, request, project_uuid, "adjustments", build, version), version
+                )
+
+        async def respond():
+            payload, headers, content_type = await build()
+            return HTTPResponse(payload, status=200, headers=headers, content_type=content_type)
+
+        version = await get_adjustments_version(request["db_read_engine"], params)
+        return await conditional_response(request, "adjustments", respond, version)
 
     async def post(self, request):
         """Creates new adjustment.
@@ -88,6 +180,74 @@ class AdjustmentsResource(BaseResource):
         return json(map_response(request, new_adjustment), 201)
 
 
+class BulkAdjustmentsResource(BaseResource):
+    """This class contains methods which are endpoints for changing several adjustments at once."""
+
+    async def post(self, request):
+        """Creates several adjustments.
+
+        Permissions are checked once for every project, adjustments are inserted with one statement.
+
+        Args:
+            request: Instance of sanic.request.Request class.
+
+        Returns:
+            List with information about new adjustments in the same order as in request and HTTP status code 201.
+
+        """
+        data, _ = BulkCreateAdjustmentsForm().load(request.json)
+        items = data['adjustments']
+        await _validate_projects_permission(
+            {item['project_uuid'] for item in items}, request['req_headers'], request['current_user']
+        )
+        record_hashes = [item.pop('record_hash', None) for item in items]
+
+        new_adjustments = await create_adjustments(
+            request['db_engine'], request['current_user'], items, request['req_headers']
+        )
+
+        await log_audit_overrides_batch(items, new_adjustments, request.headers)
+        await _send_adjustments_notifications(request, record_hashes, new_adjustments)
+        return json(map_response(request, new_adjustments), 201)
+
+    async def put(self, request):
+        """Updates several adjustments.
+
+        Adjustments are updated with one statement in one transaction, permissions are checked once for every
+        project. Adjustments which can't be updated are returned as errors, unless `atomic` is True: then nothing
+        is updated and the first error is raised.
+
+        Args:
+            request: Instance of sanic.request.Request class.
+
+        Returns:
+            HTTP status code 200 and dict with list of updated adjustments and list of errors with id of adjustment,
+            status code and message.
+
+        """
+        data, _ = BulkUpdateAdjustmentsForm().load(request.json)
+        items = data['adjustments']
+        record_hashes = {item['id']: item.pop('record_hash', None) for item in items}
+
+        new_adjustments, errors = await update_adjustments(
+            request['db_engine'], items, request['current_user'], request['req_headers'],
+            validate_project=partial(
+                _validate_user_permission, headers=request['req_headers'], user_obj=request['current_user']
+            ),
+            atomic=data['atomic']
+        )
+
+        updated_items = {item['id']: item for item in items}
+        await log_audit_overrides_batch(
+            [updated_items[adjustment['id']] for adjustment in new_adjustments], new_adjustments, request.headers
+        )
+        await _send_adjustments_notifications(
+            request, [record_hashes[adjustment['id']] for adjustment in new_adjustments], new_adjustments
+        )
+        return json({"adjustments": map_response(request, new_adjustments), "errors": map_response(request, errors)},
+                    200)
+
+
 class AdjustmentResource(BaseResource):
     """This class contains methods which are endpoints for getting and creating adjustment with specified id."""
 
@@ -98,6 +258,9 @@ class AdjustmentResource(BaseResource):
             request: Instance of sanic.request.Request class.
             adjustment_id: id of adjustment.
 
+        Response has weak `ETag` derived from the last update time of adjustment, request with `If-None-Match` which
+        contains it gets HTTP status code 304 before adjustment is selected.
+
         Returns:
             HTTP status code 200 and dict with information about adjustment with specified id.
 
@@ -105,8 +268,12 @@ class AdjustmentResource(BaseResource):
             .. include:: /endpoints_examples/adjustment_resource_get.txt
 
         """
-        adjustment = await get_adjustment_by_id(request.get('db_engine'), adjustment_id)
-        return json(map_response(request, dict(adjustment)), 200)
+        async def respond():
+            adjustment = await get_adjustment_by_id(request.get('db_read_engine'), adjustment_id)
+            return json(map_response(request, dict(adjustment)), 200)
+
+        version = await get_adjustment_version(request.get('db_read_engine'), adjustment_id)
+        return await conditional_response(request, "adjustment", respond, version)
 
     async def put(self, request, adjustment_id):
         """Updates adjustment with specified id.
@@ -125,11 +292,12 @@ class AdjustmentResource(BaseResource):
         """
         data, _ = UpdateAdjustmentForm().load(request.json)
         record_hash = data.pop('record_hash', None)
-        project_id = dict(await get_adjustment_by_id(request.get('db_engine'), adjustment_id)).get('project_uuid')
-        await _validate_user_permission(project_id, request.get('req_headers'), request['current_user'])
 
         new_adjustment = await update_adjustment(
-            request.get('db_engine'), adjustment_id, data, request['current_user'], request['req_headers']
+            request.get('db_engine'), adjustment_id, data, request['current_user'], request['req_headers'],
+            validate_project=partial(
+                _validate_user_permission, headers=request.get('req_headers'), user_obj=request['current_user']
+            )
         )
 
         await log_audit_overrides(data, new_adjustment, request.headers)
@@ -215,6 +383,62 @@ class RemoveDeprecatedAdjustments(BaseResource):
         return json({"message": "Deprecated adjustments have been removed"}, 200)
 
 
+class FinalizeProjectAdjustments(BaseResource):
+    """This class contains method which is endpoint for finalizing adjustments of project."""
+
+    async def post(self, request):
+        """Removes deprecated adjustments and applies not applied adjustments of project.
+
+        Both steps are made in one transaction, which is retried on serialization failure.
+
+        Args:
+            request: Instance of sanic.request.Request class.
+
+        Returns:
+            Counts of removed and applied adjustments and HTTP status code 200.
+
+        """
+        data, _ = AppliedAdjustmentsForm().load(request.json)
+        counts = await finalize_project_adjustments(request['db_engine'], data)
+        return json(counts, 200)
+
+
+class ReplaceProjectAdjustments(BaseResource):
+    """This class contains method which is endpoint for replacing not applied adjustments of project."""
+
+    async def post(self, request):
+        """Replaces not applied adjustments of project with desired set.
+
+        Only changed adjustments are inserted, updated or deleted, all changes are made in one transaction.
+
+        Args:
+            request: Instance of sanic.request.Request class.
+
+        Returns:
+            Counts of inserted, updated and deleted adjustments and HTTP status code 200.
+
+        """
+        data, _ = ReplaceProjectAdjustmentsForm().load(request.json)
+        await _validate_user_permission(data['project_uuid'], request['req_headers'], request['current_user'])
+        items = data['adjustments']
+        record_hashes = {item['id']: item.pop('record_hash', None) for item in items}
+
+        counts, changed = await replace_project_adjustments(
+            request['db_engine'], data['project_uuid'], items, request['current_user'], request['req_headers']
+        )
+
+        keys = {(item['price_group_uuid'], item['bu_uuid'], item['product_uuid']): item for item in items}
+        changed_items = [
+            keys[(adjustment['price_group_uuid'], adjustment['bu_uuid'], adjustment['product_uuid'])]
+            for adjustment in changed
+        ]
+        await log_audit_overrides_batch(changed_items, changed, request.headers)
+        await _send_adjustments_notifications(
+            request, [record_hashes[item['id']] for item in changed_items], changed
+        )
+        return json(counts, 200)
+
+
 class GetProjectAdjustments(BaseResource):
     """This class contains method which is endpoint for getting project adjustments."""
 
@@ -225,6 +449,15 @@ class GetProjectAdjustments(BaseResource):
             request: Instance of sanic.request.Request class.
             project_id: id of project.
 
+        `fields` parameter contains comma separated names of returned columns, all columns are returned by default.
+
+        If `Accept` header contains `application/x-ndjson` adjustments are streamed as newline delimited JSON,
+        otherwise response is cached until adjustments of the project are changed. `application/x-columnar+json`
+        and `application/msgpack` formats are negotiated as in `AdjustmentsResource.get`. Response has weak `ETag`
+        derived from version of the project (or from count and the last update time of its adjustments if cache is
+        disabled), request with `If-None-Match` which contains it gets HTTP status code 304 before adjustments are
+        selected.
+
         Returns:
             All information about adjustments for specified project and HTTP status code 200.
 
@@ -232,8 +465,85 @@ class GetProjectAdjustments(BaseResource):
             .. include:: /endpoints_examples/get_project_adjustments_get.txt
 
         """
-        project_adjustments = await get_project_adjustments(request.get('db_engine'), project_id)
-        return json(map_response(request, project_adjustments), 200)
+        columns = _requested_columns(request)
+        if accepts_ndjson(request):
+            engine = await request["db_read_engine"].engine()
+            return ndjson_response(request, stream_project_adjustments(engine, project_id, columns))
+
+        async def build():
+            project_adjustments = await get_project_adjustments(request.get('db_read_engine'), project_id, columns)
+            payload, content_type = serialize_adjustments(request, project_adjustments)
+            return payload, {"Vary": "Accept"}, content_type
+
+        version = await project_version(request, project_id)
+        if version is None:
+            version = await get_project_adjustments_version(request.get('db_read_engine'), project_id)
+        return await conditional_response(
+            request, "project_adjustments",
+            partial(cached_response, request, project_id, "project_adjustments", build, version), version
+        )
+
+
+def _requested_columns(request):
+    """Returns names of columns requested by `fields` parameter or None if all columns are requested.
+
+    Args:
+        request: Instance of sanic.request.Request class.
+
+    """
+    data, _ = FieldsForm().load({"fields": request.args.get("fields")} if "fields" in request.args else {})
+    return data.get("columns")
+
+
+def _filtered_project(request):
+    """Returns id of project if request selects adjustments of one project only, otherwise None.
+
+    Args:
+        request: Instance of sanic.request.Request class.
+
+    """
+    if request.args.get("logic", "and").lower() != "and":
+        return None
+    projects = {
+        match.group(1).lower()
+        for match in map(PROJECT_FILTER.match, request.args.getlist("filter", [])) if match
+    }
+    return projects.pop() if len(projects) == 1 else None
+
+
+async def _validate_projects_permission(project_ids, headers: dict, user_obj: UserObject):
+    """Validates user permission for every project once.
+
+    Args:
+        project_ids: Set of ids of projects.
+        headers: Store information about `X-Client`, `Authorization` and `x-timezone`.
+        user_obj: user object.
+
+    """
+    await asyncio.gather(*(_validate_user_permission(project_id, headers, user_obj) for project_id in project_ids))
+
+
+async def _send_adjustments_notifications(request, record_hashes: list, adjustments: list):
+    """Notifies that adjustments were changed, adjustments without record hash are skipped.
+
+    Args:
+        request: Instance of sanic.request.Request class.
+        record_hashes: Record hashes sent with adjustments.
+        adjustments: Changed adjustments in the same order as `record_hashes`.
+
+    """
+    notifications = [
+        {'record_hash': record_hash, 'adjustment_id': adjustment.get('id')}
+        for record_hash, adjustment in zip(record_hashes, adjustments) if record_hash
+    ]
+    if not notifications:
+        return
+    notification_cli = RESTClientRegistry.get('notifications')
+    context = {'headers': request.headers}
+    await asyncio.gather(*(
+        notification_cli.send_notification(context=context, topic=ADJUSTMENT_UPDATED_TOPIC, data=data)
+        for data in notifications
+    ))
 
 
 async def _validate_user_permission(project_id: str, headers: dict, user_obj: UserObject):
@@ -0,0 +1,22 @@
+"""This module contains endpoint for service metrics."""
+
+from sanic.response import json
+from sanic.views import HTTPMethodView
+
+from service_api.services import metrics
+
+
+class MetricsResource(HTTPMethodView):
+    """This class contains method which is endpoint for getting metrics of the worker which handles request."""
+
+    async def get(self, request):
+        """Returns current values of worker counters and gauges.
+
+        Args:
+            request: Instance of sanic.request.Request class.
+
+        Returns:
+            Dict with counters and gauges and HTTP status code 200.
+
+        """
+        return json(metrics.snapshot(), 200)
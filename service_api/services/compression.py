@@ -0,0 +1,120 @@
+"""This module contains compression of responses negotiated by `Accept-Encoding` header.
+
+Responses with body of at least `COMPRESSION_MIN_SIZE` bytes are compressed by gzip or by brotli if `brotli` or
+`brotlicffi` is installed and client prefers it. Bodies of at least `COMPRESSION_THREAD_MIN_SIZE` bytes are
+compressed in the default thread pool of the loop, so compression of multi-megabyte lists doesn't block other
+requests. Streamed responses are sent as they are.
+
+"""
+
+import asyncio
+import gzip
+import os
+import time
+from functools import partial
+
+from sanic.app import Sanic
+from sanic.response import HTTPResponse
+
+from service_api.services import metrics
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", 1024))
+COMPRESSION_THREAD_MIN_SIZE = int(os.environ.get("COMPRESSION_THREAD_MIN_SIZE", 256 * 1024))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# supported encodings in order of preference when client accepts several of them with the same quality
+COMPRESSORS = {"gzip": partial(gzip.compress, compresslevel=GZIP_LEVEL)}
+if brotli is not None:
+    COMPRESSORS = {"br": partial(brotli.compress, quality=BROTLI_QUALITY), **COMPRESSORS}
+
+
+def accepted_encoding(accept_encoding: str):
+    """Returns supported encoding with the highest quality in `Accept-Encoding` header or None.
+
+    Args:
+        accept_encoding: Value of `Accept-Encoding` header, e.g. `br;q=1.0, gzip;q=0.8, *;q=0.1`.
+
+    """
+    qualities = {}
+    for item in (accept_encoding or "").split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[name.strip().lower()] = quality
+
+    candidates = [
+        (qualities.get(encoding, qualities.get("*", 0.0)), -preference, encoding)
+        for preference, encoding in enumerate(COMPRESSORS)
+    ]
+    quality, _, encoding = max(candidates)
+    return encoding if quality > 0 else None
+
+
+async def compress(encoding: str, body: bytes) -> bytes:
+    """Returns `body` compressed by `encoding`, large bodies are compressed in thread pool.
+
+    Compression ratio and time are collected in `compression_*` metrics labeled by encoding.
+
+    """
+    compressor = COMPRESSORS[encoding]
+    started = time.perf_counter()
+    if len(body) >= COMPRESSION_THREAD_MIN_SIZE:
+        compressed = await asyncio.get_event_loop().run_in_executor(None, compressor, body)
+    else:
+        compressed = compressor(body)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    metrics.increment("compressed_responses", encoding=encoding)
+    metrics.increment("compression_input_bytes", len(body), encoding=encoding)
+    metrics.increment("compression_output_bytes", len(compressed), encoding=encoding)
+    metrics.increment("compression_time_ms", elapsed_ms, encoding=encoding)
+    metrics.set_gauge("compression_ratio", round(len(compressed) / len(body), 3), encoding=encoding)
+    return compressed
+
+
+async def compress_response(request, response):
+    """Compresses body of `response` if client accepts encoding and body is large enough.
+
+    Args:
+        request: Instance of sanic.request.Request class.
+        response: Response of endpoint, streamed and already encoded responses are skipped.
+
+    """
+    if not isinstance(response, HTTPResponse) or not response.body or len(response.body) < COMPRESSION_MIN_SIZE:
+        return
+    if "Content-Encoding" in response.headers:
+        return
+    encoding = accepted_encoding(request.headers.get("Accept-Encoding"))
+    if encoding is None:
+        return
+
+    compressed = await compress(encoding, response.body)
+    if len(compressed) >= len(response.body):
+        return
+    response.body = compressed
+    response.headers["Content-Encoding"] = encoding
+    vary = response.headers.get("Vary")
+    response.headers["Vary"] = f"{vary}, Accept-Encoding" if vary else "Accept-Encoding"
+
+
+def register_server(app: Sanic):
+    """Registers compression of responses of application.
+
+    Args:
+        app: Instance of Sanic application.
+
+    """
+    app.register_middleware(compress_response, "response")
@@ -1,39 +1,114 @@
 """This module contains all needed functions to work with database."""
 
+from collections import OrderedDict
 from typing import Tuple, Optional
 import asyncio
+import random
+import time
 
 import psycopg2
 from aiopg.sa import create_engine, Engine
-from psycopg2 import DatabaseError, InterfaceError
+from psycopg2 import DatabaseError, InterfaceError, OperationalError
+from psycopg2.extensions import TransactionRollbackError, QueryCanceledError
 from sanic.app import Sanic
-from sqlalchemy.sql.ddl import CreateTable
+from sqlalchemy.sql.ddl import CreateTable, CreateIndex
 
 from service_api.constants import KEYSPACE_PREFIX, COMMON_DB, DEFAULT_ENGINE_NAME
 from service_api.models import models
-from service_api.services.discovery import discover_pg_source, discover_pg_clients_database, DataBaseNotFoundException
+from service_api.services import metrics
+from service_api.services.discovery import (
+    discover_pg_source, discover_pg_clients_database, discover_pg_replicas, DataBaseNotFoundException
+)
+from rfcommon_api.common.exceptions import ApplicationError
 from rfcommon_api.common.services.logger import logger
 
 # http://aiopg.readthedocs.io/en/stable/core.html?highlight=create_pool#aiopg.create_pool
 POOL_SIZE = 5
 POOL_RECYCLE = 120
 CONNECTION_TIMEOUT = 600
+# engines health is checked in background instead of probing engine on every request
+HEALTH_CHECK_INTERVAL = 30
+HEALTH_CHECK_TIMEOUT = 5
+# worker-wide cap of connections of primary engines, every engine may open up to POOL_SIZE connections
+MAX_CONNECTIONS = 50
+# worker-wide cap of connections of engines of read replicas, they never evict primary engines
+MAX_READ_CONNECTIONS = 50
+# engine without requests during this amount of seconds is closed
+ENGINE_IDLE_TTL = 600
+# creation of engine, including discovery of database host, is cancelled after this amount of seconds
+ENGINE_CREATION_TIMEOUT = 30
+# reads of client are sent to primary during this amount of seconds after its last write, so replication lag
+# doesn't hide just written data
+REPLICA_LAG_WINDOW = 5
+# reads of client are sent to primary during this amount of seconds after engine of read replica failed to connect
+REPLICA_RETRY_DELAY = 30
+READ_ENGINE_SUFFIX = ":read"
+# SQLSTATE classes of lost connection: connection exception and operator intervention (shutdown of server)
+CONNECTION_ERROR_CLASSES = ("08", "57P")
 # parameter for logging executed SQL commands
 ECHO = False
-CONNECTION_LOCK = None
 
-_engines = {}
+# engines are ordered from least to most recently used
+_engines = OrderedDict()
+_engine_hosts = {}
+_engine_last_used = {}
+_unhealthy_engines = set()
+_evicted_engines = set()
+_last_writes = {}
+_replica_retry_at = {}
+# count of units of work and streams which use engine, pinned engine is not evicted even before it acquires connection
+_engine_pins = {}
+# in-flight creations and reconnections of engines, awaited by all concurrent callers of the same engine
+_pending_engines = {}
+_health_monitor = None
 
 __server_instance = None
 
 
-def lock() -> asyncio.Lock:
-    """This function returns instance of connection lock."""
-    global CONNECTION_LOCK
+class EngineUnavailableException(ApplicationError):
+    """Raised when engine for client can't be created in time."""
 
-    if not CONNECTION_LOCK:
-        CONNECTION_LOCK = asyncio.Lock()
-    return CONNECTION_LOCK
+    def __init__(self, msg):
+        """Sends msg and status code of exception to parent class.
+
+        Args:
+            msg (str): message of exception.
+
+        """
+        super().__init__(msg, status_code=503)
+
+
+class PoolExhaustedException(Exception):
+    """Raised by health check which didn't get connection because all connections of pool are in use."""
+
+
+async def _single_flight(engine_name: str, create) -> Engine:
+    """Runs `create` once for all concurrent callers of the same engine.
+
+    Callers of other engines are not blocked. Creation is cancelled after `ENGINE_CREATION_TIMEOUT` seconds, so
+    unreachable database or discovery service of one client can't stall the worker.
+
+    Args:
+        engine_name: Client short name or default engine name.
+        create: Coroutine function which creates engine.
+
+    Returns:
+        sqlalchemy.engine.Engine: Created engine.
+
+    Raises:
+        EngineUnavailableException: Raised if engine was not created in time.
+
+    """
+    task = _pending_engines.get(engine_name)
+    if task is None:
+        task = asyncio.ensure_future(asyncio.wait_for(create(), ENGINE_CREATION_TIMEOUT))
+        _pending_engines[engine_name] = task
+        task.add_done_callback(lambda _: _pending_engines.pop(engine_name, None))
+    try:
+        # shield prevents cancelled caller from cancelling creation awaited by other callers
+        return await asyncio.shield(task)
+    except asyncio.TimeoutError:
+        raise EngineUnavailableException(f"Engine {engine_name} was not created in {ENGINE_CREATION_TIMEOUT} seconds")
 
 
 async def release_engines():
@@ -45,6 +120,14 @@ async def release_engines():
     for key in tuple(_engines.keys()):
         await close_engine(key)
         del _engines[key]
+    _engine_hosts.clear()
+    _engine_last_used.clear()
+    _unhealthy_engines.clear()
+    _evicted_engines.clear()
+    _last_writes.clear()
+    _replica_retry_at.clear()
+    _engine_pins.clear()
+    _update_engine_gauges()
 
 
 async def close_engine(client_name: str):
@@ -56,7 +139,10 @@ async def close_engine(client_name: str):
         client_name: Client short name.
 
     """
-    engine = _engines[client_name]
+    await _close(client_name, _engines[client_name])
+
+
+async def _close(client_name: str, engine: Engine):
     try:
         engine.close()
         await engine.wait_closed()
@@ -76,6 +162,15 @@ def register_server(app: Sanic):
     __server_instance = app
 
 
+def _db_name(client_name: Optional[str] = None) -> str:
+    """Returns name of database of client or default database name if no client passed."""
+    if not client_name:
+        return __server_instance.config["DEFAULT_DB"]
+    if client_name == COMMON_DB:
+        return COMMON_DB
+    return f"{KEYSPACE_PREFIX}_{client_name}"
+
+
 async def db_uri(client_name: Optional[str] = None, host: Optional[str] = None) -> str:
     """Returns a URI describing a database connection.
 
@@ -87,13 +182,7 @@ async def db_uri(client_name: Optional[str] = None, host: Optional[str] = None)
         URI describing a database connection.
 
     """
-    db_name = __server_instance.config["DEFAULT_DB"]
-
-    if client_name:
-        if client_name == COMMON_DB:
-            db_name = COMMON_DB
-        else:
-            db_name = f"{KEYSPACE_PREFIX}_{client_name}"
+    db_name = _db_name(client_name)
 
     if not host:
         _host, _port = await discover_pg_source(db_name)
@@ -130,44 +219,431 @@ def _create_engine(connection_url: str):
     )
 
 
-async def get_engine(client: Optional[str] = None, host: Optional[str] = None) -> Engine:
-    """Returns Engine instance. If no client passed return default engine.
+async def _connect_engine(engine_name: str, host: Optional[str] = None) -> Engine:
+    """Creates engine for `engine_name` and marks it as healthy.
 
     Args:
-        client: Client short name from X-client. Default set to None.
+        engine_name: Client short name or default engine name.
         host: Link to a host. Default set to None.
 
-    Returns:
-        sqlalchemy.engine.Engine: Instance which provide a source of database connectivity and behavior.
+    """
+    connection_url = await db_uri(client_name=_client_name(engine_name), host=host)
+    await _ensure_connection_budget(engine_name)
+    _engines[engine_name] = await _create_engine(connection_url)
+    _engine_hosts[engine_name] = host
+    _engine_last_used[engine_name] = time.monotonic()
+    _unhealthy_engines.discard(engine_name)
+    if engine_name in _evicted_engines:
+        _evicted_engines.discard(engine_name)
+        metrics.increment("engine_recreations")
+    _update_engine_gauges()
+    return _engines[engine_name]
+
+
+def _update_engine_gauges():
+    metrics.set_gauge("engines", len(_engines))
+    metrics.set_gauge("engines_connections_limit", len(_engines) * POOL_SIZE)
+
+
+def pin_engine(engine: Engine):
+    """Protects engine from eviction until `unpin_engine` is called, engine may be pinned several times.
+
+    Args:
+        engine: Engine which is going to be used by unit of work or stream.
+
+    """
+    _engine_pins[engine] = _engine_pins.get(engine, 0) + 1
+
+
+def unpin_engine(engine: Engine):
+    """Releases one pin of engine taken by `pin_engine`.
+
+    Args:
+        engine: Pinned engine.
 
     """
-    global _engines
-    if client:
-        engine_name = client
+    pins = _engine_pins.get(engine, 0) - 1
+    if pins > 0:
+        _engine_pins[engine] = pins
     else:
-        engine_name = DEFAULT_ENGINE_NAME
+        _engine_pins.pop(engine, None)
 
-    if engine_name not in _engines:
-        async with lock():
-            connection_url = await db_uri(client_name=engine_name if engine_name != DEFAULT_ENGINE_NAME else None,
-                                          host=host)
-            _engines[engine_name] = await _create_engine(connection_url)
 
-    try:
-        async with _engines[engine_name].acquire() as conn:
-            await conn.execute("select 1 a")
-    except (DatabaseError, InterfaceError) as error:
-        logger.debug(f"Connection error: {error} \n Trying to reconnect...")
-        async with lock():
+def _is_idle(engine: Engine) -> bool:
+    """Returns True if engine is not pinned and no connection of engine is acquired at the moment."""
+    return engine not in _engine_pins and engine.size == engine.freesize
+
+
+def _is_read_engine(engine_name: str) -> bool:
+    return engine_name.endswith(READ_ENGINE_SUFFIX)
+
+
+async def evict_engine(engine_name: str):
+    """Closes engine and forgets it, so it is created again on the next request of the client.
+
+    Args:
+        engine_name: Client short name or default engine name.
+
+    """
+    engine = _engines.pop(engine_name)
+    _engine_last_used.pop(engine_name, None)
+    _unhealthy_engines.discard(engine_name)
+    _evicted_engines.add(engine_name)
+    metrics.increment("engine_evictions")
+    _update_engine_gauges()
+    await _close(engine_name, engine)
+
+
+async def _ensure_connection_budget(engine_name: str):
+    """Evicts least recently used idle engines until engine `engine_name` fits into the budget of its kind.
+
+    Primary engines are limited by `MAX_CONNECTIONS` and engines of read replicas by `MAX_READ_CONNECTIONS`, so
+    read engines never evict primary engines. Pinned engines and engines with acquired connections are never
+    evicted, so the budget may be exceeded temporarily when all engines are busy. Such engines are evicted by the
+    health monitor once they become idle and expire.
+
+    Args:
+        engine_name: Name of engine which is about to be created.
+
+    """
+    is_read = _is_read_engine(engine_name)
+    limit = MAX_READ_CONNECTIONS if is_read else MAX_CONNECTIONS
+
+    def same_kind(names):
+        return [name for name in names if _is_read_engine(name) == is_read]
+
+    # pending creations include the engine which is about to be created
+    while (len(same_kind(_engines)) + len(same_kind(_pending_engines))) * POOL_SIZE > limit:
+        idle_engine_name = next((name for name in same_kind(_engines) if _is_idle(_engines[name])), None)
+        if idle_engine_name is None:
+            logger.warning(f"Connection budget {limit} exceeded, all engines of the same kind are busy")
+            metrics.increment("engine_budget_exceeded")
+            return
+        await evict_engine(idle_engine_name)
+
+
+async def _evict_expired_engines():
+    """Evicts idle engines which were not used for `ENGINE_IDLE_TTL` seconds."""
+    expired_after = time.monotonic() - ENGINE_IDLE_TTL
+    for engine_name, last_used in tuple(_engine_last_used.items()):
+        engine = _engines.get(engine_name)
+        if engine is None:
+            _engine_last_used.pop(engine_name, None)
+            continue
+        if last_used < expired_after and _is_idle(engine):
+            logger.info(f"Engine {engine_name} is idle for more than {ENGINE_IDLE_TTL} seconds")
+            await evict_engine(engine_name)
+
+
+async def reconnect_engine(engine_name: str) -> Engine:
+    """Closes engine and creates new one with the same connection parameters.
+
+    Concurrent reconnections of the same engine are merged into one. Engine of read replica is connected to another
+    replica of the database if there is one.
+
+    Args:
+        engine_name: Client short name or default engine name.
+
+    Returns:
+        sqlalchemy.engine.Engine: Reconnected engine.
+
+    """
+    async def _reconnect():
+        if engine_name in _engines and engine_name not in _unhealthy_engines:
+            return _engines[engine_name]
+        logger.debug(f"Reconnecting engine {engine_name}...")
+        if engine_name in _engines:
             await close_engine(engine_name)
             _engines.pop(engine_name)
+            _engine_last_used.pop(engine_name, None)
+        metrics.increment("engine_reconnects")
+        host = _engine_hosts.get(engine_name)
+        if _is_read_engine(engine_name):
+            host = await _replica_host(engine_name, failed_host=host)
+            if host is None:
+                raise EngineUnavailableException(f"Database of engine {engine_name} has no read replicas")
+        return await _connect_engine(engine_name, host)
+
+    return await _single_flight(engine_name, _reconnect)
+
+
+def _client_name(engine_name: str) -> Optional[str]:
+    """Returns client short name of engine, None for default engine."""
+    if _is_read_engine(engine_name):
+        engine_name = engine_name[:-len(READ_ENGINE_SUFFIX)]
+    return engine_name if engine_name != DEFAULT_ENGINE_NAME else None
+
+
+def engine_name_for(client: Optional[str] = None) -> str:
+    """Returns name under which engine of `client` is registered.
+
+    Args:
+        client: Client short name from X-client. Default set to None.
+
+    """
+    return client or DEFAULT_ENGINE_NAME
+
+
+def is_connection_error(error: Exception) -> bool:
+    """Returns True if `error` means that connection to database was lost.
+
+    Serialization failures, deadlocks and cancelled statements are operational errors too, but connection is
+    still usable after them, so they don't make engine unhealthy.
 
-            connection_url = await db_uri(client_name=engine_name if engine_name != DEFAULT_ENGINE_NAME else None,
-                                          host=host)
-            _engines[engine_name] = await _create_engine(connection_url)
+    Args:
+        error: Error raised by query.
+
+    """
+    if isinstance(error, InterfaceError):
+        return True
+    if not isinstance(error, OperationalError) or isinstance(error, (TransactionRollbackError, QueryCanceledError)):
+        return False
+    return error.pgcode is None or error.pgcode.startswith(CONNECTION_ERROR_CLASSES)
+
+
+def report_connection_error(engine: Engine, error: Exception):
+    """Marks engine as unhealthy and reconnects it in background.
+
+    Used when connection error is raised during real query, so following requests get working engine. Errors which
+    don't mean loss of connection are ignored.
+
+    Args:
+        engine: Engine which connection raised the error.
+        error: Error raised by the query.
+
+    """
+    if not is_connection_error(error):
+        return
+    engine_name = next((name for name, registered in _engines.items() if registered is engine), None)
+    if engine_name is None or engine_name in _unhealthy_engines:
+        return
+    logger.debug(f"Connection error: {error} \n Engine {engine_name} will be reconnected")
+    _unhealthy_engines.add(engine_name)
+    asyncio.ensure_future(_safe_reconnect(engine_name))
+
+
+async def _safe_reconnect(engine_name: str):
+    try:
+        await reconnect_engine(engine_name)
+    except Exception as exc:  # engine stays unhealthy and will be reconnected on next check
+        logger.error(f"Engine {engine_name} failed to reconnect. Error: {exc}")
+        if _is_read_engine(engine_name):
+            _postpone_replica(engine_name)
+
+
+def _postpone_replica(read_engine_name: str):
+    """Sends reads to primary for `REPLICA_RETRY_DELAY` seconds, then engine of read replica is created again."""
+    _unhealthy_engines.discard(read_engine_name)
+    _replica_retry_at[read_engine_name] = time.monotonic() + REPLICA_RETRY_DELAY
+    metrics.increment("replica_connect_failures")
+
+
+def _is_exhausted(engine: Engine) -> bool:
+    """Returns True if all connections of engine are acquired and pool can't open more of them."""
+    return engine.freesize == 0 and engine.size >= engine.maxsize
+
+
+async def _probe_engine(engine: Engine):
+    """Runs trivial query on a connection of engine.
+
+    Raises:
+        PoolExhaustedException: Raised if no connection was returned to exhausted pool in `HEALTH_CHECK_TIMEOUT`.
+        asyncio.TimeoutError: Raised if connection was not opened or query was not answered in time.
+
+    """
+    try:
+        conn = await asyncio.wait_for(engine.acquire(), HEALTH_CHECK_TIMEOUT)
+    except asyncio.TimeoutError:
+        if _is_exhausted(engine):
+            raise PoolExhaustedException()
+        raise
+    try:
+        await asyncio.wait_for(conn.execute("select 1 a"), HEALTH_CHECK_TIMEOUT)
+    finally:
+        await conn.close()
+
+
+async def check_engine(engine_name: str) -> bool:
+    """Checks that engine is able to run queries and marks it as healthy or unhealthy.
+
+    Engine is unhealthy if connection can't be opened in time or is lost. Probe which waited for a connection of
+    exhausted pool means that engine is busy, not broken, so its state is kept and `engine_pool_exhausted` metric
+    is incremented. Other database errors don't mean loss of connection and keep the state as well.
+
+    Args:
+        engine_name: Client short name or default engine name.
+
+    Returns:
+        False if engine has to be reconnected.
+
+    """
+    try:
+        await _probe_engine(_engines[engine_name])
+    except PoolExhaustedException:
+        logger.warning(f"Health check of engine {engine_name} skipped, all connections of pool are in use")
+        metrics.increment("engine_pool_exhausted")
+        return engine_name not in _unhealthy_engines
+    except (DatabaseError, InterfaceError, asyncio.TimeoutError) as error:
+        logger.debug(f"Health check of engine {engine_name} failed: {error}")
+        if isinstance(error, asyncio.TimeoutError) or is_connection_error(error):
+            _unhealthy_engines.add(engine_name)
+            return False
+        return engine_name not in _unhealthy_engines
+    _unhealthy_engines.discard(engine_name)
+    return True
+
+
+async def _check_engines():
+    await _evict_expired_engines()
+    for engine_name in tuple(_engines):
+        if engine_name not in _engines or await check_engine(engine_name):
+            continue
+        await _safe_reconnect(engine_name)
+
+
+async def _monitor_engines_health():
+    while True:
+        await asyncio.sleep(HEALTH_CHECK_INTERVAL)
+        try:
+            await _check_engines()
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:  # monitor keeps running, failed check is repeated on the next iteration
+            logger.error(f"Engines health check failed. Error: {exc}")
+
+
+def start_health_monitor():
+    """Starts background task which checks all engines and evicts expired ones every `HEALTH_CHECK_INTERVAL` seconds."""
+    global _health_monitor
+
+    if _health_monitor is None or _health_monitor.done():
+        _health_monitor = asyncio.ensure_future(_monitor_engines_health())
+
+
+async def stop_health_monitor():
+    """Stops background engines health monitor."""
+    global _health_monitor
+
+    if _health_monitor is not None:
+        _health_monitor.cancel()
+        try:
+            await _health_monitor
+        except asyncio.CancelledError:
+            pass
+        _health_monitor = None
+
+
+def register_write(client: Optional[str] = None):
+    """Remembers time of client write, following reads of the client are sent to primary for a while.
+
+    Args:
+        client: Client short name from X-client. Default set to None.
+
+    """
+    _last_writes[engine_name_for(client)] = time.monotonic()
+
+
+async def replica_hosts(client: Optional[str] = None) -> list:
+    """Returns hosts of read replicas of client database from config or SDA.
+
+    Args:
+        client: Client short name from X-client. Default set to None.
+
+    Returns:
+        list: Hosts of read replicas, empty if database has no replicas.
+
+    """
+    db_name = _db_name(client)
+    configured_hosts = __server_instance.config.get("DB_REPLICA_HOSTS") or {}
+    if db_name in configured_hosts:
+        return configured_hosts[db_name]
+    try:
+        return await discover_pg_replicas(db_name)
+    except DataBaseNotFoundException:
+        return []
+
+
+async def _replica_host(read_engine_name: str, failed_host: Optional[str] = None) -> Optional[str]:
+    """Returns random read replica of database of engine, other than `failed_host` if possible, or None."""
+    hosts = await replica_hosts(_client_name(read_engine_name))
+    candidates = [host for host in hosts if host != failed_host] or hosts
+    return random.choice(candidates) if candidates else None
+
+
+async def _get_read_engine(engine_name: str) -> Optional[Engine]:
+    """Returns engine connected to read replica of client.
+
+    Args:
+        engine_name: Client short name or default engine name.
+
+    Returns:
+        sqlalchemy.engine.Engine: Read engine or None if reads have to be sent to primary: client has written during
+                                  `REPLICA_LAG_WINDOW`, database has no replicas, read engine is reconnected or
+                                  failed to connect during `REPLICA_RETRY_DELAY`.
+
+    """
+    if time.monotonic() - _last_writes.get(engine_name, -REPLICA_LAG_WINDOW) < REPLICA_LAG_WINDOW:
+        metrics.increment("replica_lag_guard_reads")
+        return None
+
+    read_engine_name = engine_name + READ_ENGINE_SUFFIX
+    if read_engine_name in _unhealthy_engines:
+        return None
+    if read_engine_name in _engines:
+        _engines.move_to_end(read_engine_name)
+        _engine_last_used[read_engine_name] = time.monotonic()
+        return _engines[read_engine_name]
+    if time.monotonic() < _replica_retry_at.get(read_engine_name, 0):
+        return None
+
+    host = await _replica_host(read_engine_name)
+    if host is None:
+        return None
+    try:
+        return await _single_flight(read_engine_name, lambda: _connect_engine(read_engine_name, host))
+    except (EngineUnavailableException, DatabaseError, InterfaceError, OSError) as exc:
+        # reads fall back to primary, replica is tried again after REPLICA_RETRY_DELAY
+        logger.error(f"Engine {read_engine_name} failed to connect to {host}. Error: {exc}")
+        _postpone_replica(read_engine_name)
+        return None
+
+
+async def get_engine(client: Optional[str] = None, host: Optional[str] = None, readonly: bool = False) -> Engine:
+    """Returns Engine instance. If no client passed return default engine.
+
+    Engine health is checked by background monitor, so in the common case it is a dictionary lookup. Engine which
+    is missing or known to be unhealthy is created once for all concurrent callers of the same client.
+
+    Readonly engine is connected to one of the read replicas. Primary engine is returned instead if database has no
+    replicas or client has written recently.
+
+    Args:
+        client: Client short name from X-client. Default set to None.
+        host: Link to a host. Default set to None.
+        readonly: If True engine for read-only queries is returned. Default set to False.
+
+    Returns:
+        sqlalchemy.engine.Engine: Instance which provide a source of database connectivity and behavior.
+
+    """
+    engine_name = engine_name_for(client)
+
+    if readonly and not host:
+        read_engine = await _get_read_engine(engine_name)
+        if read_engine is not None:
+            return read_engine
+
+    if engine_name in _unhealthy_engines:
+        engine = await reconnect_engine(engine_name)
+    elif engine_name not in _engines:
+        engine = await _single_flight(engine_name, lambda: _connect_engine(engine_name, host))
+    else:
+        engine = _engines[engine_name]
+        _engines.move_to_end(engine_name)
+        _engine_last_used[engine_name] = time.monotonic()
 
     logger.debug(">>>> returning engine: %s" % engine_name)
-    return _engines[engine_name]
+    return engine
 
 
 async def create_db(client_name: Optional[str] = None, host: Optional[str] = None) -> Tuple[str, int]:
@@ -204,6 +680,8 @@ async def create_db(client_name: Optional[str] = None, host: Optional[str] = Non
                 for model in models:
                     create_expr = CreateTable(model)
                     await connection.execute(create_expr)
+                    for index in model.indexes:
+                        await connection.execute(CreateIndex(index))
         return f"Database '{KEYSPACE_PREFIX}_{KEYSPACE_PREFIX}' created"
     except (DatabaseError, InterfaceError) as err:
         logger.error(err)
@@ -218,7 +696,7 @@ async def drop_all_service_keyspaces():
 
     """
     try:
-        discovered_databases = await discover_pg_clients_database(service_name=KEYSPACE_PREFIX)
+        discovered_databases = await discover_pg_clients_database(service_name=KEYSPACE_PREFIX, cached=False)
         for postgres_ip, db_name in discovered_databases:
             engine = await get_engine(host=postgres_ip)
             async with engine.acquire() as conn:
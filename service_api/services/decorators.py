@@ -8,18 +8,25 @@ information sent back to the browser.
 
 from functools import wraps
 
-from service_api.services.database import get_engine
+from psycopg2 import OperationalError, InterfaceError
+
+from service_api.services.database import report_connection_error, register_write
+from service_api.services.unit_of_work import UnitOfWork
 from service_api.constants import COMMON_DB
 from rfcommon_api.common.domain.user import UserObject
 
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+
 
 def register_engine(func):
     @wraps(func)
     async def wrapper(request, *args, **kwargs):
         """Wrapper for creating in request new key: `db_engine`.
 
-        This wrapper is used for creating in request new key: `db_engine`,
-        which contains information about instance of Engine which used.
+        This wrapper is used for creating in request new keys: `db_engine` and `db_read_engine`,
+        which contain unit of work of the request. Unit of work of GET request uses engine for read-only queries.
+        Connection is acquired on the first query and released after `func` execution.
+        Connection errors raised by `func` schedule reconnection of the engine which unit of work used.
 
         Args:
             request (Request): request.
@@ -30,8 +37,21 @@ def register_engine(func):
             Result of `func` execution.
 
         """
-        request["db_engine"] = await get_engine(client=request.headers.get("X-Client", COMMON_DB))
-        response = await func(request, *args, **kwargs)
+        client = request.headers.get("X-Client", COMMON_DB)
+        is_read = request.method in READ_METHODS
+        unit_of_work = UnitOfWork(client=client, readonly=is_read)
+        request["db_engine"] = request["db_read_engine"] = unit_of_work
+        try:
+            response = await func(request, *args, **kwargs)
+        except (OperationalError, InterfaceError) as error:
+            if unit_of_work.acquired_engine is not None:
+                report_connection_error(unit_of_work.acquired_engine, error)
+            raise
+        finally:
+            used = unit_of_work.used
+            await unit_of_work.close()
+            if used and not is_read:
+                register_write(client)
         return response
 
     return wrapper
@@ -1,9 +1,24 @@
-"""This module is used for discovering database."""
+"""This module is used for discovering database.
 
+Results of discovery are cached for `DISCOVERY_CACHE_TTL` seconds. Expired result is still returned while it is
+refreshed in background, so unavailability of SDA doesn't fail requests to healthy databases.
+
+"""
+
+import asyncio
+import os
+import time
 from typing import List, Tuple
 
 from rfcommon_api.common.sda import discover_data_source
 from rfcommon_api.common.exceptions import ApplicationError
+from rfcommon_api.common.services.logger import logger
+from service_api.services import metrics
+
+DISCOVERY_CACHE_TTL = int(os.environ.get("DISCOVERY_CACHE_TTL", 60))
+
+_discovery_cache = {}
+_discovery_refreshes = {}
 
 
 class DataBaseNotFoundException(ApplicationError):
@@ -19,12 +34,71 @@ class DataBaseNotFoundException(ApplicationError):
         super().__init__(msg, status_code=503)
 
 
-async def discover_pg_clients_database(service_name: str, run_locally=False) -> List[Tuple[str, str]]:
+def clear_discovery_cache():
+    """Drops all cached discovery results."""
+    _discovery_cache.clear()
+
+
+async def _refresh(key: tuple, discover):
+    """Replaces cached result of `discover` with the new one.
+
+    Result is dropped if SDA reports that source is gone and kept if SDA is unreachable.
+
+    Args:
+        key: Key of cached result.
+        discover: Coroutine function which discovers source.
+
+    """
+    try:
+        value = await discover()
+    except DataBaseNotFoundException:
+        _discovery_cache.pop(key, None)
+        logger.info(f"SDA did not find '{key[1]}' anymore, cached result dropped")
+    except Exception as exc:  # SDA is unreachable, last known result is served
+        metrics.increment("discovery_refresh_failures", source=key[1])
+        logger.warning(f"Failed to refresh discovery of '{key[1]}', serving last known result. Error: {exc}")
+    else:
+        _discovery_cache[key] = value, time.monotonic()
+        metrics.set_gauge("discovery_cache_staleness_seconds", 0, source=key[1])
+
+
+async def _cached(key: tuple, discover, cached: bool):
+    """Returns cached result of `discover` and refreshes it in background when it is expired.
+
+    Args:
+        key: Key of cached result, starts with function name and source name.
+        discover: Coroutine function which discovers source.
+        cached: If False cached result is ignored and replaced.
+
+    Returns:
+        Result of `discover`.
+
+    """
+    entry = _discovery_cache.get(key)
+    if not cached or entry is None:
+        metrics.increment("discovery_cache_misses")
+        value = await discover()
+        _discovery_cache[key] = value, time.monotonic()
+        return value
+
+    value, discovered_at = entry
+    staleness = time.monotonic() - discovered_at
+    if staleness > DISCOVERY_CACHE_TTL:
+        metrics.set_gauge("discovery_cache_staleness_seconds", int(staleness), source=key[1])
+        if key not in _discovery_refreshes:
+            _discovery_refreshes[key] = asyncio.ensure_future(_refresh(key, discover))
+            _discovery_refreshes[key].add_done_callback(lambda _: _discovery_refreshes.pop(key, None))
+    metrics.increment("discovery_cache_hits")
+    return value
+
+
+async def discover_pg_clients_database(service_name: str, run_locally=False, cached=True) -> List[Tuple[str, str]]:
     """Discovers postgres clients database.
 
     Args:
         service_name: Name of service.
         run_locally (bool): A parameter that determines whether to run locally.
+        cached (bool): A parameter that determines whether cached result can be returned.
 
     Returns:
         Ip and name of db.
@@ -33,19 +107,25 @@ async def discover_pg_clients_database(service_name: str, run_locally=False) ->
         DatabaseNotFound: If database does not exist, will raise this exception.
 
     """
-    res = await discover_data_source(service_name, "datasearch", run_locally)
-    if not res:
-        raise DataBaseNotFoundException("SDA did not find '{}'".format(service_name))
+    async def discover():
+        res = await discover_data_source(service_name, "datasearch", run_locally)
+        if not res:
+            raise DataBaseNotFoundException("SDA did not find '{}'".format(service_name))
+
+        return [
+            (r["ip"], r["name"]) for r in res if r["type"] == "postgresql" and r["name"].split("_")[0] == service_name
+        ]
 
-    return [(r["ip"], r["name"]) for r in res if r["type"] == "postgresql" and r["name"].split("_")[0] == service_name]
+    return await _cached(("datasearch", service_name, run_locally), discover, cached)
 
 
-async def discover_pg_source(db_name: str, run_locally=False):
+async def discover_pg_source(db_name: str, run_locally=False, cached=True):
     """Discovers Postgres DB.
 
     Args:
         db_name: Name of db.
         run_locally (bool): A parameter that determines whether to run locally.
+        cached (bool): A parameter that determines whether cached result can be returned.
 
     Returns:
         tuple: Ip and port of db.
@@ -54,8 +134,38 @@ async def discover_pg_source(db_name: str, run_locally=False):
         DatabaseNotFound: If database does not exist, will raise this exception.
 
     """
-    res = await discover_data_source(db_name, "dataget", run_locally)
-    if not res:
-        raise DataBaseNotFoundException("SDA did not find source db '{}'".format(db_name))
+    async def discover():
+        res = await discover_data_source(db_name, "dataget", run_locally)
+        if not res:
+            raise DataBaseNotFoundException("SDA did not find source db '{}'".format(db_name))
+
+        return res[0]["ip"], 5432
+
+    return await _cached(("dataget", db_name, run_locally), discover, cached)
+
+
+async def discover_pg_replicas(db_name: str, run_locally=False, cached=True) -> List[str]:
+    """Discovers read replicas of Postgres DB.
+
+    The first source returned by SDA is used as primary by `discover_pg_source`, all others are treated as replicas.
+
+    Args:
+        db_name: Name of db.
+        run_locally (bool): A parameter that determines whether to run locally.
+        cached (bool): A parameter that determines whether cached result can be returned.
+
+    Returns:
+        list: Ips of replicas, empty if db has no replicas.
+
+    Raises:
+        DatabaseNotFound: If database does not exist, will raise this exception.
+
+    """
+    async def discover():
+        res = await discover_data_source(db_name, "dataget", run_locally)
+        if not res:
+            raise DataBaseNotFoundException("SDA did not find source db '{}'".format(db_name))
+
+        return [r["ip"] for r in res[1:]]
 
-    return res[0]["ip"], 5432
+    return await _cached(("replicas", db_name, run_locally), discover, cached)
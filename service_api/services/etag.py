@@ -0,0 +1,85 @@
+"""This module contains helpers for conditional GET requests with weak ETags.
+
+ETag of response is calculated from a version of its data which is known before the response is built: version of
+the project kept by the response cache or a cheap validator selected without rows, e.g. count and the last update
+time of adjustments. Unchanged representation is answered with 304 before adjustments are selected and serialized.
+
+"""
+
+import hashlib
+
+from sanic.response import HTTPResponse
+
+from service_api.services import metrics
+from service_api.services.serialization import response_format
+
+
+def request_variant(request) -> str:
+    """Returns string which identifies representation requested by `request`.
+
+    Representation depends on path, query, format negotiated by `Accept` header and timezone which dates are
+    converted to by `map_response`.
+
+    Args:
+        request: Instance of sanic.request.Request class.
+
+    """
+    return (
+        f"{request.path}?{request.query_string}|{response_format(request)}|{request.headers.get('x-timezone', 'UTC')}"
+    )
+
+
+def weak_etag(request, fingerprint) -> str:
+    """Returns weak ETag of representation with `fingerprint` requested by `request`."""
+    digest = hashlib.sha1(f"{request_variant(request)}|{fingerprint}".encode()).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Returns True if `If-None-Match` header contains `etag`, tags are compared with weak comparison.
+
+    Args:
+        if_none_match: Value of `If-None-Match` header.
+        etag: Current ETag of representation.
+
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return _opaque_tag(etag) in {_opaque_tag(tag) for tag in if_none_match.split(",")}
+
+
+def _opaque_tag(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def _not_modified(etag: str, endpoint: str) -> HTTPResponse:
+    metrics.increment("etag_not_modified", endpoint=endpoint)
+    return HTTPResponse(status=304, headers={"ETag": etag})
+
+
+async def conditional_response(request, endpoint: str, respond, version=None):
+    """Returns 304 if client has current representation, otherwise response of `respond` with ETag.
+
+    Args:
+        request: Instance of sanic.request.Request class.
+        endpoint: Name of endpoint in `etag_not_modified` metric.
+        respond: Coroutine function which returns response.
+        version: Value which changes with every change of data of response, e.g. version of project in response
+            cache. Response of `respond` is returned without ETag if it is None. Defaults set to None.
+
+    Returns:
+        sanic.response.HTTPResponse: Response with HTTP status code 304 without body or response of `respond`.
+
+    """
+    if version is None:
+        return await respond()
+    etag = weak_etag(request, version)
+    if etag_matches(request.headers.get("If-None-Match"), etag):
+        return _not_modified(etag, endpoint)
+    response = await respond()
+    if response.status == 200:
+        response.headers["ETag"] = etag
+    return response
@@ -1,11 +1,12 @@
 """Contains data for creating forms and methods for serializing data."""
 
 from uuid import uuid4
-from marshmallow import fields, post_load, pre_load
-from marshmallow.validate import OneOf
+from marshmallow import fields, post_load, pre_load, validates_schema
+from marshmallow.validate import OneOf, Length
 from sqlalchemy.dialects.postgresql import JSON, JSONB, ARRAY
 from enum import Enum, unique
 
+from service_api.constants import BULK_MAX_SIZE
 from service_api.models import Adjustments
 
 from rfcommon_api.common.services.form import RequestFilteringSchema, BaseForm
@@ -68,6 +69,25 @@ class TierFilterOptions(Enum):
         return list(map(lambda a: a.value, TierFilterOptions))
 
 
+@unique
+class CountModes(Enum):
+    """Contains all possible modes of counting total count of listed items."""
+
+    exact = 'exact'
+    estimate = 'estimate'
+    none = 'none'
+
+    @staticmethod  # noqa A003
+    def list():
+        """Sends a list of all possible count modes.
+
+        Returns:
+            list: List of all count modes.
+
+        """
+        return list(map(lambda a: a.value, CountModes))
+
+
 class AdjustmentFilteringSchema(RequestFilteringSchema):
     """Check that the name of column is valid for sorting and filtering."""
 
@@ -94,6 +114,56 @@ class AdjustmentFilteringSchema(RequestFilteringSchema):
             )
 
 
+class CountForm(BaseForm):
+    """Contains parameter which selects how total count of listed items is calculated."""
+
+    count = fields.String(validate=OneOf(CountModes.list()), required=False)
+
+
+def _split_names(value: str) -> list:
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+class FieldsForm(BaseForm):
+    """Contains comma separated names of columns of adjustments which are returned, all columns by default."""
+
+    columns = fields.String(load_from='fields', required=False)
+
+    @validates_schema
+    def validate_columns(self, data):
+        """Check that every name is a name of column of adjustments.
+
+        Args:
+            data (dict): Deserialized data of form.
+
+        Raises:
+            ValidationError: Raise exception when column is not found.
+
+        """
+        for column_name in _split_names(data.get('columns', '')):
+            if column_name not in Adjustments.c:
+                raise self._validation_error(
+                    message=f"Specified column [{column_name}] was not found among possible ones."
+                )
+
+    @post_load
+    def split_columns(self, data):
+        """Splits names of columns into list without duplicates.
+
+        Args:
+            data (dict): Deserialized data of form.
+
+        Returns:
+            dict: Data with list of names of columns in `columns`, if they were specified.
+
+        """
+        if data.get('columns'):
+            data['columns'] = list(dict.fromkeys(_split_names(data['columns'])))
+        else:
+            data.pop('columns', None)
+        return data
+
+
 class TierFiltersForm(BaseForm):
     """Contains all possible parameters for tier filters form."""
 
@@ -204,6 +274,12 @@ class CreateAdjustmentForm(BaseForm):
         return data
 
 
+class BulkCreateAdjustmentsForm(BaseForm):
+    """Contains list of adjustments which are created at once."""
+
+    adjustments = fields.Nested(CreateAdjustmentForm, many=True, required=True, validate=Length(1, BULK_MAX_SIZE))
+
+
 class UpdateAdjustmentForm(BaseForm):
     """Contains all possible parameters for update adjustment form."""
 
@@ -215,6 +291,67 @@ class UpdateAdjustmentForm(BaseForm):
     tier_id = fields.Integer(allow_none=True, required=False)
 
 
+class BulkUpdateAdjustmentForm(UpdateAdjustmentForm):
+    """Contains all possible parameters for update of adjustment with specified id in bulk update form."""
+
+    id = fields.UUID(required=True)  # noqa A003
+
+
+class BulkUpdateAdjustmentsForm(BaseForm):
+    """Contains list of adjustments which are updated at once.
+
+    If `atomic` is True nothing is updated when any of adjustments can't be updated.
+
+    """
+
+    adjustments = fields.Nested(BulkUpdateAdjustmentForm, many=True, required=True, validate=Length(1, BULK_MAX_SIZE))
+    atomic = fields.Boolean(missing=False)
+
+    @validates_schema
+    def validate_unique_ids(self, data):
+        """Check that every adjustment is updated once.
+
+        Args:
+            data (dict): Deserialized data of form.
+
+        Raises:
+            ValidationError: Raise exception when the same id is specified several times.
+
+        """
+        ids = [item['id'] for item in data.get('adjustments', [])]
+        if len(ids) != len(set(ids)):
+            raise self._validation_error("Validation error, every adjustment can be updated only once")
+
+
+class ReplaceProjectAdjustmentsForm(BaseForm):
+    """Contains desired set of not applied adjustments of project."""
+
+    project_uuid = fields.UUID(required=True)
+    adjustments = fields.Nested(
+        CreateAdjustmentForm, many=True, required=True, exclude=('project_uuid',), validate=Length(0, BULK_MAX_SIZE)
+    )
+
+    @validates_schema
+    def validate_unique_keys(self, data):
+        """Check that project has one adjustment for every combination of price group, bu and product.
+
+        Args:
+            data (dict): Deserialized data of form.
+
+        Raises:
+            ValidationError: Raise exception when the same combination is specified several times.
+
+        """
+        keys = [
+            (item.get('price_group_uuid'), item.get('bu_uuid'), item.get('product_uuid'))
+            for item in data.get('adjustments', [])
+        ]
+        if len(keys) != len(set(keys)):
+            raise self._validation_error(
+                "Validation error, combination of price_group_uuid, bu_uuid and product_uuid must be unique"
+            )
+
+
 class AppliedAdjustmentsForm(BaseForm):
     """Contains all possible parameters for applied adjustment form."""
 
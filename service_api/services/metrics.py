@@ -0,0 +1,58 @@
+"""This module contains in-process counters and gauges of the service.
+
+Values are kept per worker and are exposed by `MetricsResource`.
+
+"""
+
+from collections import defaultdict
+
+_counters = defaultdict(int)
+_gauges = {}
+
+
+def _metric_key(name: str, labels: dict) -> str:
+    """Returns metric name with sorted labels, e.g. `transaction_retries{operation="apply_adjustments"}`."""
+    if not labels:
+        return name
+    formatted_labels = ",".join(f'{label}="{value}"' for label, value in sorted(labels.items()))
+    return f"{name}{{{formatted_labels}}}"
+
+
+def increment(name: str, value: int = 1, **labels):
+    """Increments counter.
+
+    Args:
+        name: Name of counter.
+        value: Value to add. Default set to 1.
+        labels: Labels which distinguish counters with the same name.
+
+    """
+    _counters[_metric_key(name, labels)] += value
+
+
+def set_gauge(name: str, value, **labels):
+    """Sets current value of gauge.
+
+    Args:
+        name: Name of gauge.
+        value: Current value.
+        labels: Labels which distinguish gauges with the same name.
+
+    """
+    _gauges[_metric_key(name, labels)] = value
+
+
+def snapshot() -> dict:
+    """Returns current values of all metrics.
+
+    Returns:
+        Dict with two keys: `counters` and `gauges`.
+
+    """
+    return {"counters": dict(_counters), "gauges": dict(_gauges)}
+
+
+def reset():
+    """Drops all collected values."""
+    _counters.clear()
+    _gauges.clear()
@@ -0,0 +1,236 @@
+"""This module contains helpers for keyset (cursor) pagination and for counting of listed items.
+
+Cursor is an opaque url-safe string which encodes sort keys and values of the last row of the page. The next page
+is selected with a predicate on these values instead of OFFSET, so deep pages are as fast as the first one.
+
+Total count can be estimated instead of counted: the planner's row estimate of the query or `pg_class.reltuples`
+of the whole table are returned without scanning the rows.
+
+"""
+
+import base64
+import json
+from typing import List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from sqlalchemy import Column, Table
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql import and_, or_, operators, text
+from sqlalchemy.sql.base import Executable
+from sqlalchemy.sql.elements import ClauseElement, UnaryExpression
+
+from rfcommon_api.common.exceptions import UnprocessibleEntity
+
+SortKeys = List[Tuple[Column, bool]]
+
+COUNT_MODE_HEADER = "X-Pagination-Count-Mode"
+
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN statement which returns plan of `query` in JSON format without executing it."""
+
+    def __init__(self, query):
+        self.query = query
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element, compiler, **kwargs):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.query, **kwargs)
+
+
+async def estimate_count(conn, query) -> int:
+    """Returns the planner's estimate of count of rows returned by `query`.
+
+    Args:
+        conn: Connection to database.
+        query: Select query without paging.
+
+    Returns:
+        Estimated count of rows.
+
+    """
+    cur = await conn.execute(Explain(query.order_by(None)))
+    plan = await cur.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def estimate_table_count(conn, table: Table) -> int:
+    """Returns count of rows of `table` which was estimated by the last VACUUM or ANALYZE.
+
+    Args:
+        conn: Connection to database.
+        table: Table to count rows of.
+
+    Returns:
+        Estimated count of rows, 0 if the table was never analyzed.
+
+    """
+    cur = await conn.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)"), table=table.name
+    )
+    return max(await cur.scalar() or 0, 0)
+
+
+def sort_keys(query, tie_breaker: Column) -> SortKeys:
+    """Returns columns and directions query is ordered by, followed by unique `tie_breaker` column.
+
+    If query is already ordered by `tie_breaker` it keeps its direction and columns after it are dropped, since
+    they don't change the order.
+
+    Args:
+        query: Select query with applied sorting.
+        tie_breaker: Unique not nullable column which makes order of rows total.
+
+    Returns:
+        List of pairs of column and flag which is True for descending order.
+
+    """
+    keys = []
+    for clause in query._order_by_clause.clauses:
+        descending = False
+        if isinstance(clause, UnaryExpression) and clause.modifier in (operators.asc_op, operators.desc_op):
+            descending = clause.modifier is operators.desc_op
+            clause = clause.element
+        keys.append((clause, descending))
+        if clause is tie_breaker:
+            return keys
+    keys.append((tie_breaker, False))
+    return keys
+
+
+def order_by_keys(query, keys: SortKeys):
+    """Returns `query` ordered by sort `keys` returned by `sort_keys`."""
+    return query.order_by(None).order_by(*(column.desc() if descending else column for column, descending in keys))
+
+
+def _signature(keys: SortKeys) -> List[str]:
+    return [f"-{column.name}" if descending else column.name for column, descending in keys]
+
+
+def encode_cursor(keys: SortKeys, row) -> str:
+    """Encodes values of sort keys of `row` into cursor.
+
+    Args:
+        keys: Sort keys returned by `sort_keys`.
+        row: The last row of the page.
+
+    Returns:
+        Opaque cursor of the next page.
+
+    """
+    payload = {"k": _signature(keys), "v": [row[column.name] for column, _ in keys]}
+    return base64.urlsafe_b64encode(json.dumps(payload, default=str).encode()).decode()
+
+
+def decode_cursor(keys: SortKeys, cursor: str) -> list:
+    """Decodes values of sort keys from cursor.
+
+    Args:
+        keys: Sort keys returned by `sort_keys`.
+        cursor: Cursor returned with the previous page.
+
+    Returns:
+        Values of sort keys of the last row of the previous page.
+
+    Raises:
+        UnprocessibleEntity: Raised if cursor is malformed or was issued for different sorting.
+
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        signature, values = payload["k"], payload["v"]
+    except (ValueError, TypeError, KeyError):
+        raise UnprocessibleEntity("Specified cursor is not valid.")
+    if signature != _signature(keys) or len(values) != len(keys):
+        raise UnprocessibleEntity("Specified cursor was issued for different sorting.")
+    return values
+
+
+def _after(column: Column, descending: bool, value):
+    """Returns condition of rows which follow `value` in the order of `column`.
+
+    Postgres puts NULL values last in ascending order and first in descending order.
+
+    """
+    if value is None:
+        return column.isnot(None) if descending else None
+    condition = column < value if descending else column > value
+    if column.nullable and not descending:
+        condition = or_(condition, column.is_(None))
+    return condition
+
+
+def after_cursor(keys: SortKeys, values: list):
+    """Returns condition of rows which follow the row with `values` of sort keys.
+
+    Args:
+        keys: Sort keys returned by `sort_keys`.
+        values: Values decoded from cursor by `decode_cursor`.
+
+    Returns:
+        Condition for where clause of the next page query.
+
+    """
+    conditions = []
+    for position, (column, descending) in enumerate(keys):
+        after = _after(column, descending, values[position])
+        if after is None:
+            continue
+        equal = [
+            previous.is_(None) if value is None else previous == value
+            for (previous, _), value in zip(keys[:position], values[:position])
+        ]
+        conditions.append(and_(*equal, after))
+    return or_(*conditions)
+
+
+def cursor_pagination_headers(url: str, per_page: int, next_cursor: Optional[str]) -> dict:
+    """Returns pagination headers of cursor mode.
+
+    Args:
+        url: Url of the current request.
+        per_page: Maximum count of items on page.
+        next_cursor: Cursor of the next page, None if the current page is the last one.
+
+    Returns:
+        Dict with `X-Pagination-Per-Page` header and `Link` header with url of the next page if it exists.
+
+    """
+    headers = {"X-Pagination-Per-Page": per_page}
+    if next_cursor:
+        headers["Link"] = f'<{_replace_args(url, cursor=next_cursor)}>; rel="next"'
+    return headers
+
+
+def uncounted_pagination_headers(url: str, page: int, per_page: int, has_next: bool) -> dict:
+    """Returns pagination headers of page which was selected without counting of total count.
+
+    Args:
+        url: Url of the current request.
+        page: Number of the current page.
+        per_page: Maximum count of items on page.
+        has_next: Flag which is True if the next page may exist.
+
+    Returns:
+        Dict with `X-Pagination-Current-Page`, `X-Pagination-Per-Page` headers and `Link` header with urls of
+        the previous and the next pages if they exist.
+
+    """
+    headers = {"X-Pagination-Current-Page": page, "X-Pagination-Per-Page": per_page}
+    links = []
+    if page > 1:
+        links.append(f'<{_replace_args(url, page=page - 1, per_page=per_page)}>; rel="prev"')
+    if has_next:
+        links.append(f'<{_replace_args(url, page=page + 1, per_page=per_page)}>; rel="next"')
+    if links:
+        headers["Link"] = ", ".join(links)
+    return headers
+
+
+def _replace_args(url: str, **replaced) -> str:
+    scheme, netloc, path, query, fragment = urlsplit(url)
+    args = [(name, value) for name, value in parse_qsl(query, keep_blank_values=True) if name not in replaced]
+    args.extend(replaced.items())
+    return urlunsplit((scheme, netloc, path, urlencode(args), fragment))
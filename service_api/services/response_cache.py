@@ -0,0 +1,134 @@
+"""This module contains Redis-backed cache of serialized responses about adjustments of a project.
+
+Responses are cached per client and project under the current version of the project, which is a random token kept
+in Redis. Every write to adjustments of the project replaces the token by `invalidate_projects`, so responses cached
+for the previous version are never read again and expire after `RESPONSE_CACHE_TTL` seconds. Cached responses are
+built from primary database: response read from a lagging replica after the token was replaced would be cached and
+answered with 304 under the new version until the next write.
+
+Cache is an optimization only: errors of Redis are logged and the response is built from database.
+
+"""
+
+import asyncio
+import hashlib
+import os
+import uuid
+
+import msgpack
+from rfcommon_api.common import cache_manager
+from rfcommon_api.common.services.logger import logger
+from sanic.response import HTTPResponse
+
+from service_api.constants import DEFAULT_SERVICE_NAME, COMMON_DB
+from service_api.services import metrics
+from service_api.services.etag import request_variant
+from service_api.services.unit_of_work import UnitOfWork
+
+RESPONSE_CACHE_TTL = int(os.environ.get("RESPONSE_CACHE_TTL", 300))
+RESPONSE_CACHE_VERSION_TTL = int(os.environ.get("RESPONSE_CACHE_VERSION_TTL", 24 * 60 * 60))
+
+
+def _version_key(client: str, project_uuid) -> str:
+    return f"{DEFAULT_SERVICE_NAME}:project_version:{client}:{str(project_uuid).lower()}"
+
+
+def _response_key(request, client: str, project_uuid, version: str) -> str:
+    request_hash = hashlib.sha1(request_variant(request).encode()).hexdigest()
+    return f"{DEFAULT_SERVICE_NAME}:response:{client}:{str(project_uuid).lower()}:{version}:{request_hash}"
+
+
+async def _safely(operation: str, coro):
+    """Returns result of Redis call `coro` or None if it failed."""
+    try:
+        return await coro
+    except Exception as error:
+        metrics.increment("response_cache_errors", operation=operation)
+        logger.warning(f"Response cache {operation} failed: {error}")
+        return None
+
+
+async def _project_version(client: str, project_uuid) -> str:
+    """Returns current version of cached responses of project, new version is started if there is no one."""
+    version = await _safely("get", cache_manager.RedisCacheManager.get(_version_key(client, project_uuid)))
+    if version is None:
+        version = uuid.uuid4().hex
+        await _safely("set", cache_manager.RedisCacheManager.set(
+            _version_key(client, project_uuid), version, RESPONSE_CACHE_VERSION_TTL
+        ))
+    return version.decode() if isinstance(version, bytes) else version
+
+
+async def project_version(request, project_uuid):
+    """Returns current version of cached responses of project or None if response cache is disabled.
+
+    Version is changed by every write to adjustments of the project, so it identifies their state.
+
+    Args:
+        request: Instance of sanic.request.Request class.
+        project_uuid: Project id.
+
+    """
+    if not RESPONSE_CACHE_TTL:
+        return None
+    return await _project_version(request.headers.get("X-Client", COMMON_DB), project_uuid)
+
+
+async def cached_response(request, project_uuid, endpoint: str, build, version: str = None) -> HTTPResponse:
+    """Returns cached response of request about project or builds it and caches.
+
+    Response is built with read unit of work of request switched to primary database, so it is not older than the
+    version it is cached under.
+
+    Args:
+        request: Instance of sanic.request.Request class.
+        project_uuid: Project id which all adjustments of response belong to.
+        endpoint: Name of endpoint in `response_cache_hits` and `response_cache_misses` metrics.
+        build: Coroutine function which returns serialized body, headers and content type of response.
+        version: Version of project returned by `project_version`, it is read from Redis if it is not passed.
+            Defaults set to None.
+
+    Returns:
+        sanic.response.HTTPResponse: Response with HTTP status code 200.
+
+    """
+    if not RESPONSE_CACHE_TTL:
+        payload, headers, content_type = await build()
+        return HTTPResponse(payload, status=200, headers=headers, content_type=content_type)
+
+    client = request.headers.get("X-Client", COMMON_DB)
+    version = version or await _project_version(client, project_uuid)
+    key = _response_key(request, client, project_uuid, version)
+    cached = await _safely("get", cache_manager.RedisCacheManager.get(key))
+    if cached is not None:
+        metrics.increment("response_cache_hits", endpoint=endpoint)
+        entry = msgpack.unpackb(cached, raw=False)
+        return HTTPResponse(entry["body"], status=200, headers=entry["headers"], content_type=entry["content_type"])
+
+    metrics.increment("response_cache_misses", endpoint=endpoint)
+    if isinstance(request.get("db_read_engine"), UnitOfWork):
+        await request["db_read_engine"].use_primary()
+    payload, headers, content_type = await build()
+    await _safely("set", cache_manager.RedisCacheManager.set(
+        key, msgpack.packb({"body": payload, "headers": headers, "content_type": content_type}, use_bin_type=True),
+        RESPONSE_CACHE_TTL
+    ))
+    return HTTPResponse(payload, status=200, headers=headers, content_type=content_type)
+
+
+async def invalidate_projects(client: str, project_uuids):
+    """Starts new version of cached responses of every project, so responses cached before are not returned.
+
+    Args:
+        client: Client short name from X-client.
+        project_uuids: Ids of projects which adjustments were changed.
+
+    """
+    if not RESPONSE_CACHE_TTL:
+        return
+    await asyncio.gather(*(
+        _safely("invalidate", cache_manager.RedisCacheManager.set(
+            _version_key(client, project_uuid), uuid.uuid4().hex, RESPONSE_CACHE_VERSION_TTL
+        ))
+        for project_uuid in {str(project_uuid).lower() for project_uuid in project_uuids}
+    ))
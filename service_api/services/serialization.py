@@ -0,0 +1,191 @@
+"""This module contains serializers of lists of adjustments: JSON, columnar JSON and MessagePack.
+
+Rows of adjustments have a fixed shape, so every column is written with an encoder chosen by the type of the column
+instead of copying every row by `map_response` and walking it by generic `json_dumps`: UUIDs, decimals and dates
+are formatted directly and only strings and JSONB values are escaped by `json_dumps`. Payloads of other shape and
+requests which need conversion of dates to a non-UTC timezone are serialized by `map_response` as before.
+
+Columnar JSON and MessagePack formats are negotiated by `Accept` header, they don't repeat names of columns for
+every row.
+
+"""
+
+from datetime import datetime
+from decimal import Decimal
+from uuid import UUID
+
+import msgpack
+from rfcommon_api.common.reqresp import map_response
+from sanic.response import json_dumps
+from sqlalchemy import DECIMAL, DateTime
+from sqlalchemy.dialects.postgresql import UUID as UUIDType
+
+from service_api.models import Adjustments
+
+UTC = "UTC"
+JSON_CONTENT_TYPE = "application/json"
+COLUMNAR_JSON_CONTENT_TYPE = "application/x-columnar+json"
+MSGPACK_CONTENT_TYPE = "application/msgpack"
+
+
+def _encode_uuid(value: UUID) -> str:
+    return "null" if value is None else f'"{value}"'
+
+
+def _encode_decimal(value: Decimal) -> str:
+    return format(value, "f") if isinstance(value, Decimal) else json_dumps(value)
+
+
+def _encode_datetime(value: datetime) -> str:
+    return "null" if value is None else f'"{value.isoformat()}"'
+
+
+def _column_encoder(column):
+    """Returns function which encodes value of `column` to JSON, strings and JSONB are encoded by `json_dumps`."""
+    if isinstance(column.type, UUIDType):
+        return _encode_uuid
+    if isinstance(column.type, DECIMAL):
+        return _encode_decimal
+    if isinstance(column.type, DateTime):
+        return _encode_datetime
+    return json_dumps
+
+
+ADJUSTMENT_ENCODERS = {
+    column.name: (json_dumps(column.name) + ":", _column_encoder(column)) for column in Adjustments.c
+}
+
+
+def response_format(request) -> str:
+    """Returns content type of list of adjustments requested in `Accept` header, JSON by default."""
+    accept = request.headers.get("Accept", "")
+    for content_type in (MSGPACK_CONTENT_TYPE, COLUMNAR_JSON_CONTENT_TYPE):
+        if content_type in accept:
+            return content_type
+    return JSON_CONTENT_TYPE
+
+
+def is_utc_request(request) -> bool:
+    """Returns True if dates of response are returned in UTC which they are stored in."""
+    return request.headers.get("x-timezone", UTC).upper() == UTC
+
+
+def _adjustment_fields(request, adjustments: list):
+    """Returns name, JSON key and encoder of every column of `adjustments` or None if they can't be encoded."""
+    if not adjustments or not isinstance(adjustments[0], dict) or not is_utc_request(request):
+        return None
+    if not all(name in ADJUSTMENT_ENCODERS for name in adjustments[0]):
+        return None
+    return [(name,) + ADJUSTMENT_ENCODERS[name] for name in adjustments[0]]
+
+
+def adjustment_encoder(request, adjustments: list):
+    """Returns function which encodes one row of `adjustments` to JSON or None if rows can't be encoded directly.
+
+    Rows are encoded directly if they are dicts with columns of `Adjustments` table only and dates don't need
+    conversion. All rows are expected to have keys of the first row, since they are selected by one query.
+
+    Args:
+        request: Instance of sanic.request.Request class.
+        adjustments: List of adjustments as dicts.
+
+    """
+    fields = _adjustment_fields(request, adjustments)
+    if fields is None:
+        return None
+
+    def encode(row: dict) -> str:
+        return "{" + ",".join(key + encoder(row[name]) for name, key, encoder in fields) + "}"
+
+    return encode
+
+
+def dumps_adjustments(request, adjustments: list) -> str:
+    """Returns JSON array of `adjustments` in the same format as `map_response` and `json_dumps` do.
+
+    Args:
+        request: Instance of sanic.request.Request class.
+        adjustments: List of adjustments as dicts, other payloads are serialized by `map_response`.
+
+    """
+    encode = adjustment_encoder(request, adjustments)
+    if encode is None:
+        return json_dumps(map_response(request, adjustments))
+    return "[" + ",".join(map(encode, adjustments)) + "]"
+
+
+def dumps_adjustments_lines(request, adjustments: list) -> str:
+    """Returns `adjustments` as newline delimited JSON, every row is followed by a newline."""
+    encode = adjustment_encoder(request, adjustments)
+    if encode is None:
+        return "".join(json_dumps(row) + "\n" for row in map_response(request, adjustments))
+    return "".join(encode(row) + "\n" for row in adjustments)
+
+
+def dumps_adjustments_columnar(request, adjustments: list) -> str:
+    """Returns `adjustments` as columnar JSON: names of columns once and an array of values of every column.
+
+    Example:
+        {"columns": ["id", "adjustment_value"], "data": [["6a1c...", "d2f0..."], [10.5, null]]}
+
+    Args:
+        request: Instance of sanic.request.Request class.
+        adjustments: List of adjustments as dicts.
+
+    """
+    fields = _adjustment_fields(request, adjustments)
+    if fields is None:
+        rows = map_response(request, adjustments)
+        names = list(rows[0]) if rows else []
+        return json_dumps({"columns": names, "data": [[row[name] for row in rows] for name in names]})
+    data = ("[" + ",".join(encoder(row[name]) for row in adjustments) + "]" for name, _, encoder in fields)
+    return '{"columns":' + json_dumps([name for name, _, _ in fields]) + ',"data":[' + ",".join(data) + "]}"
+
+
+def _msgpack_default(value):
+    """Converts values which MessagePack doesn't support to strings, decimals are kept exact as in JSON."""
+    if isinstance(value, Decimal):
+        return format(value, "f")
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def packb_adjustments(request, adjustments: list) -> bytes:
+    """Returns `adjustments` as MessagePack map with names of columns and rows as arrays of values.
+
+    UUIDs and dates are strings, decimals are strings with exact value, e.g. "10.50".
+
+    Example:
+        {"columns": ["id", "adjustment_value"], "rows": [["6a1c...", "10.50"], ["d2f0...", None]]}
+
+    Args:
+        request: Instance of sanic.request.Request class.
+        adjustments: List of adjustments as dicts.
+
+    """
+    rows = adjustments if is_utc_request(request) else map_response(request, adjustments)
+    names = list(rows[0]) if rows else []
+    return msgpack.packb(
+        {"columns": names, "rows": [[row[name] for name in names] for row in rows]},
+        default=_msgpack_default, use_bin_type=True
+    )
+
+
+SERIALIZERS = {
+    JSON_CONTENT_TYPE: dumps_adjustments,
+    COLUMNAR_JSON_CONTENT_TYPE: dumps_adjustments_columnar,
+    MSGPACK_CONTENT_TYPE: packb_adjustments,
+}
+
+
+def serialize_adjustments(request, adjustments: list) -> tuple:
+    """Returns body and content type of list of `adjustments` in format requested in `Accept` header.
+
+    Args:
+        request: Instance of sanic.request.Request class.
+        adjustments: List of adjustments as dicts.
+
+    """
+    content_type = response_format(request)
+    return SERIALIZERS[content_type](request, adjustments), content_type
@@ -0,0 +1,52 @@
+"""This module contains SQL constructs which are missing in SQLAlchemy Core of used version."""
+
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql import cast, literal
+from sqlalchemy.sql.expression import FromClause
+
+
+class Values(FromClause):
+    """VALUES list which is used as named table in FROM clause, e.g. in UPDATE ... FROM (VALUES ...).
+
+    Every value is sent as bound parameter casted to type of its column, so Postgres doesn't infer types of
+    values as text.
+
+    """
+
+    named_with_column = True
+
+    def __init__(self, name: str, columns: list, rows: list):
+        """Sets name, columns and rows of table.
+
+        Args:
+            name: Name of table.
+            columns: List of `sqlalchemy.sql.column` instances with types.
+            rows: List of tuples of values in order of `columns`.
+
+        """
+        self.name = name
+        self._column_args = columns
+        self.rows = rows
+
+    def _populate_column_collection(self):
+        for column in self._column_args:
+            column._make_proxy(self)
+
+    @property
+    def _from_objects(self):
+        return [self]
+
+
+@compiles(Values, "postgresql")
+def _compile_values(element, compiler, asfrom=False, **kwargs):
+    columns = list(element.columns)
+    rows = ", ".join(
+        "(" + ", ".join(
+            compiler.process(cast(literal(value, column.type), column.type), **kwargs)
+            for value, column in zip(row, columns)
+        ) + ")"
+        for row in element.rows
+    )
+    names = ", ".join(compiler.preparer.quote(column.name) for column in columns)
+    sql = f"(VALUES {rows}) AS {compiler.preparer.quote(element.name)} ({names})"
+    return sql if asfrom else compiler.preparer.quote(element.name)
@@ -0,0 +1,101 @@
+"""This module contains helpers for streaming of large query results.
+
+Rows are read from a server-side cursor in fixed-size batches and are written to the client as soon as each batch
+is encoded, so memory used by request doesn't depend on count of selected rows.
+
+"""
+
+from typing import AsyncIterator, List
+
+from aiopg.sa import Engine
+from aiopg.transaction import IsolationLevel
+from sanic.response import stream
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql import text
+from sqlalchemy.sql.base import Executable
+from sqlalchemy.sql.elements import ClauseElement
+
+from service_api.services.database import pin_engine, unpin_engine
+from service_api.services.serialization import dumps_adjustments_lines
+from service_api.services.unit_of_work import transaction
+
+NDJSON_CONTENT_TYPE = "application/x-ndjson"
+STREAM_BATCH_SIZE = 1000
+STREAM_CURSOR_NAME = "stream_cursor"
+
+
+class DeclareCursor(Executable, ClauseElement):
+    """DECLARE statement which opens server-side cursor `name` for `query`."""
+
+    def __init__(self, name: str, query):
+        self.name = name
+        self.query = query
+
+
+@compiles(DeclareCursor, "postgresql")
+def _compile_declare_cursor(element, compiler, **kwargs):
+    return f"DECLARE {element.name} NO SCROLL CURSOR FOR " + compiler.process(element.query, **kwargs)
+
+
+def fetch_batches(engine: Engine, query, batch_size: int = STREAM_BATCH_SIZE) -> AsyncIterator[List[dict]]:
+    """Returns async iterator of rows selected by `query` in batches read from server-side cursor.
+
+    Cursor lives in its own transaction on a dedicated connection of `engine`, because stream is consumed after
+    request handler and its unit of work are finished. Engine is pinned until the iterator is exhausted or closed,
+    so it is not evicted before the stream starts.
+
+    Args:
+        engine: Instance which provides a source of database connectivity and behavior.
+        query: Select query.
+        batch_size: Count of rows fetched from cursor at once.
+
+    Returns:
+        Async iterator of lists of rows as dicts, the last batch may be shorter than `batch_size`.
+
+    """
+    pin_engine(engine)
+    return _fetch_batches(engine, query, batch_size)
+
+
+async def _fetch_batches(engine: Engine, query, batch_size: int) -> AsyncIterator[List[dict]]:
+    fetch = text(f"FETCH FORWARD {int(batch_size)} FROM {STREAM_CURSOR_NAME}").columns(
+        **{column.name: column.type for column in query.columns}
+    )
+    try:
+        async with transaction(engine, IsolationLevel.read_committed) as conn:
+            await conn.execute(DeclareCursor(STREAM_CURSOR_NAME, query))
+            while True:
+                batch = [dict(row) for row in await (await conn.execute(fetch)).fetchall()]
+                if batch:
+                    yield batch
+                if len(batch) < batch_size:
+                    break
+    finally:
+        unpin_engine(engine)
+
+
+def accepts_ndjson(request) -> bool:
+    """Returns True if client asked for newline delimited JSON in `Accept` header."""
+    return NDJSON_CONTENT_TYPE in request.headers.get("Accept", "")
+
+
+def ndjson_response(request, batches: AsyncIterator[List[dict]], headers: dict = None):
+    """Returns response which streams rows of `batches` as newline delimited JSON.
+
+    Args:
+        request: Instance of sanic.request.Request class.
+        batches: Batches returned by `fetch_batches`.
+        headers: Additional headers of response.
+
+    Returns:
+        sanic.response.StreamingHTTPResponse: Response with one JSON document per row.
+
+    """
+    async def streaming_fn(response):
+        try:
+            async for batch in batches:
+                await response.write(dumps_adjustments_lines(request, batch))
+        finally:
+            await batches.aclose()
+
+    return stream(streaming_fn, status=200, headers=headers, content_type=NDJSON_CONTENT_TYPE)
@@ -0,0 +1,196 @@
+"""This module contains request-scoped unit of work.
+
+Unit of work is created for every request by `register_engine` and is used by domain functions in place of Engine.
+It lazily acquires at most one pooled connection, which is shared by all domain calls of the request and released
+when the request is finished. Engine taken by unit of work is pinned until then, so it is not evicted before the
+connection is acquired.
+
+Serializable transactions which fail with serialization failure or deadlock are retried by `run_in_transaction`,
+the count of attempts and backoff between them can be configured with `TRANSACTION_*` environment variables.
+
+"""
+
+import asyncio
+import os
+import random
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from aiopg.sa import Engine, SAConnection
+from aiopg.transaction import Transaction, IsolationLevel
+from psycopg2.extensions import TransactionRollbackError
+
+from service_api.services import metrics
+from service_api.services.database import get_engine, pin_engine, unpin_engine
+
+SERIALIZATION_FAILURE = "40001"
+DEADLOCK_DETECTED = "40P01"
+RETRIED_ERRORS = (SERIALIZATION_FAILURE, DEADLOCK_DETECTED)
+
+TRANSACTION_MAX_ATTEMPTS = int(os.environ.get("TRANSACTION_MAX_ATTEMPTS", 5))
+TRANSACTION_RETRY_BASE_DELAY = float(os.environ.get("TRANSACTION_RETRY_BASE_DELAY", 0.05))
+TRANSACTION_RETRY_MAX_DELAY = float(os.environ.get("TRANSACTION_RETRY_MAX_DELAY", 2))
+
+
+class UnitOfWork:
+    """Shares one lazily acquired connection between all database calls of a request."""
+
+    def __init__(self, client: Optional[str] = None, readonly: bool = False):
+        """Sets client which engine is used, no engine or connection is taken until the first query.
+
+        Args:
+            client: Client short name from X-client. Default set to None.
+            readonly: If True engine for read-only queries is used. Default set to False.
+
+        """
+        self.client = client
+        self.readonly = readonly
+        self._engine = None
+        self._connection = None
+        self._transaction = None
+
+    @property
+    def used(self) -> bool:
+        """Returns True if connection was acquired."""
+        return self._connection is not None
+
+    @property
+    def acquired_engine(self) -> Optional[Engine]:
+        """Returns engine which unit of work got from `get_engine`, it is primary engine if reads fell back to it."""
+        return self._engine
+
+    @property
+    def in_transaction(self) -> bool:
+        """Returns True if transaction of unit of work is in progress."""
+        return self._transaction is not None
+
+    async def engine(self) -> Engine:
+        """Returns engine of client.
+
+        Returns:
+            sqlalchemy.engine.Engine: Instance which provide a source of database connectivity and behavior.
+
+        """
+        if self._engine is None:
+            self._engine = await get_engine(client=self.client, readonly=self.readonly)
+            pin_engine(self._engine)
+        return self._engine
+
+    async def use_primary(self):
+        """Sends following queries to primary engine, connection to read replica is released.
+
+        Used when result must not lag behind the latest commit. Must not be called in transaction.
+
+        """
+        if self.readonly:
+            self.readonly = False
+            await self.close()
+
+    async def connection(self) -> SAConnection:
+        """Returns connection of unit of work, acquires it on the first call.
+
+        Returns:
+            aiopg.sa.SAConnection: Connection shared by all database calls of the request.
+
+        """
+        if self._connection is None:
+            engine = await self.engine()
+            self._connection = await engine.acquire()
+        return self._connection
+
+    @asynccontextmanager
+    async def acquire(self):
+        """Same as `Engine.acquire`, but connection is not released on exit."""
+        yield await self.connection()
+
+    @asynccontextmanager
+    async def transaction(self, isolation_level=IsolationLevel.serializable):
+        """Runs the block in transaction, savepoint is used if unit of work is already in transaction.
+
+        Args:
+            isolation_level: Isolation level of transaction. Default set to serializable.
+
+        """
+        conn = await self.connection()
+        if self._transaction is not None:
+            async with self._transaction.point():
+                yield conn
+            return
+
+        self._transaction = Transaction(conn, isolation_level, readonly=False, deferrable=False)
+        try:
+            async with self._transaction:
+                yield conn
+        finally:
+            self._transaction = None
+
+    async def close(self):
+        """Returns connection to the pool and unpins engine."""
+        if self._connection is not None:
+            connection, self._connection = self._connection, None
+            await connection.close()
+        if self._engine is not None:
+            engine, self._engine = self._engine, None
+            unpin_engine(engine)
+
+
+@asynccontextmanager
+async def transaction(engine, isolation_level=IsolationLevel.serializable):
+    """Acquires connection and runs the block in transaction.
+
+    Args:
+        engine: Unit of work or Engine instance.
+        isolation_level: Isolation level of transaction. Default set to serializable.
+
+    """
+    if isinstance(engine, UnitOfWork):
+        async with engine.transaction(isolation_level) as conn:
+            yield conn
+    else:
+        async with engine.acquire() as conn:
+            async with Transaction(conn, isolation_level, readonly=False, deferrable=False):
+                yield conn
+
+
+async def run_in_transaction(engine, operation, name: str, isolation_level=IsolationLevel.serializable,
+                             attempts: int = TRANSACTION_MAX_ATTEMPTS):
+    """Runs `operation` in transaction and runs it again in new transaction on serialization failure or deadlock.
+
+    Attempts are separated by exponential backoff with full jitter. Only `operation` is retried, so it must not
+    have side effects outside of database. Operation is run once if unit of work is already in transaction,
+    because failed transaction can't be retried from the middle.
+
+    Args:
+        engine: Unit of work or Engine instance.
+        operation: Coroutine function which gets connection and returns result of transaction.
+        name: Name of operation in `transaction_conflicts` and `transaction_retries` metrics.
+        isolation_level: Isolation level of transaction. Default set to serializable.
+        attempts: Maximum count of attempts. Default set to TRANSACTION_MAX_ATTEMPTS.
+
+    Returns:
+        Result of `operation`.
+
+    Raises:
+        TransactionRollbackError: Raised if the last attempt failed.
+
+    """
+    if isinstance(engine, UnitOfWork) and engine.in_transaction:
+        attempts = 1
+    for attempt in range(1, attempts + 1):
+        try:
+            async with transaction(engine, isolation_level) as conn:
+                return await operation(conn)
+        except TransactionRollbackError as error:
+            if error.pgcode not in RETRIED_ERRORS:
+                raise
+            metrics.increment("transaction_conflicts", operation=name, sqlstate=error.pgcode)
+            if attempt == attempts:
+                metrics.increment("transaction_retries_exhausted", operation=name)
+                raise
+        metrics.increment("transaction_retries", operation=name)
+        await asyncio.sleep(_backoff(attempt))
+
+
+def _backoff(attempt: int) -> float:
+    """Returns delay before the next attempt: random value up to exponentially growing limit."""
+    return random.uniform(0, min(TRANSACTION_RETRY_MAX_DELAY, TRANSACTION_RETRY_BASE_DELAY * 2 ** (attempt - 1)))
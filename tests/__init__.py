@@ -2,7 +2,7 @@ import os
 import psycopg2
 import pytest
 
-from asynctest import TestCase
+from asynctest import TestCase, patch
 from sqlalchemy import text
 
 from tests.fixtures import FixtureLoader
@@ -28,11 +28,18 @@ class BaseTestCase(TestCase):
     fixture_file = "test_data.yaml"
     client_db_name = CLIENT_DB_NAME
     db_name = "postgres"
+    # responses cached in Redis would outlive fixtures reloaded for every test
+    response_cache_ttl = 0
 
     def create_app(self):
         return app
 
     async def setUp(self):
+        response_cache_patcher = patch(
+            "service_api.services.response_cache.RESPONSE_CACHE_TTL", self.response_cache_ttl
+        )
+        response_cache_patcher.start()
+        self.addCleanup(response_cache_patcher.stop)
         host, _ = await discover_pg_source(DB_NAME)
         await clear_tables(self.app_client, self.client_db_name, host)
         await FixtureLoader((self.app_client,), self.fixture_file, host).load_data()
@@ -1,11 +1,19 @@
+import asyncio
+
 import aiopg
 
-from asynctest import patch
+from asynctest import patch, CoroutineMock, MagicMock
+from psycopg2 import InterfaceError
+from psycopg2.extensions import TransactionRollbackError
 
 from tests import BaseTestCase
 
-from service_api.services.database import get_engine, release_engines
-from service_api.config import DevConfig
+from service_api.services import database, metrics
+from service_api.services.database import (
+    get_engine, release_engines, check_engine, register_write, report_connection_error, pin_engine, unpin_engine,
+    EngineUnavailableException
+)
+from service_api.config import DevConfig, parse_replica_hosts
 
 
 class TestDBConnection(BaseTestCase):
@@ -27,3 +35,208 @@ class TestDBConnection(BaseTestCase):
         await conn.close()
         self.assertEqual(result, (1, 2))
         await release_engines()
+
+    @patch("service_api.services.database.db_uri", CoroutineMock(return_value="postgresql://"))
+    @patch("service_api.services.database._create_engine")
+    async def test_engine_is_not_probed_on_get(self, create_engine_mock):
+        engine = MagicMock(wait_closed=CoroutineMock())
+        create_engine_mock.side_effect = CoroutineMock(return_value=engine)
+
+        self.assertIs(await get_engine("health_client"), engine)
+        self.assertIs(await get_engine("health_client"), engine)
+
+        create_engine_mock.assert_called_once()
+        engine.acquire.assert_not_called()
+
+    @patch("service_api.services.database.db_uri", CoroutineMock(return_value="postgresql://"))
+    @patch("service_api.services.database._probe_engine", CoroutineMock(side_effect=InterfaceError()))
+    @patch("service_api.services.database._create_engine")
+    async def test_unhealthy_engine_is_reconnected(self, create_engine_mock):
+        broken_engine = MagicMock(wait_closed=CoroutineMock())
+        new_engine = MagicMock(wait_closed=CoroutineMock())
+        create_engine_mock.side_effect = CoroutineMock(side_effect=[broken_engine, new_engine])
+
+        await get_engine("health_client")
+        self.assertFalse(await check_engine("health_client"))
+
+        self.assertIs(await get_engine("health_client"), new_engine)
+        broken_engine.close.assert_called_once()
+
+    @patch("service_api.services.database.MAX_CONNECTIONS", 2 * database.POOL_SIZE)
+    @patch("service_api.services.database.db_uri", CoroutineMock(return_value="postgresql://"))
+    @patch("service_api.services.database._create_engine")
+    async def test_least_recently_used_engine_is_evicted(self, create_engine_mock):
+        metrics.reset()
+        engines = [MagicMock(size=1, freesize=1, wait_closed=CoroutineMock()) for _ in range(4)]
+        create_engine_mock.side_effect = CoroutineMock(side_effect=engines)
+
+        await get_engine("first_client")
+        await get_engine("second_client")
+        await get_engine("first_client")
+        await get_engine("third_client")
+
+        engines[1].close.assert_called_once()
+        engines[0].close.assert_not_called()
+        self.assertIs(await get_engine("second_client"), engines[3])
+        self.assertEqual(metrics.snapshot()["counters"]["engine_recreations"], 1)
+
+    @patch("service_api.services.database.db_uri", CoroutineMock(return_value="postgresql://"))
+    @patch("service_api.services.database._create_engine")
+    async def test_concurrent_callers_share_engine_creation(self, create_engine_mock):
+        engine = MagicMock(wait_closed=CoroutineMock())
+        create_engine_mock.side_effect = CoroutineMock(return_value=engine)
+
+        engines = await asyncio.gather(*(get_engine("shared_client") for _ in range(5)))
+
+        self.assertTrue(all(e is engine for e in engines))
+        create_engine_mock.assert_called_once()
+
+    @patch("service_api.services.database.ENGINE_CREATION_TIMEOUT", 0.1)
+    @patch("service_api.services.database._create_engine")
+    async def test_slow_client_does_not_block_other_clients(self, create_engine_mock):
+        async def db_uri_mock(client_name=None, host=None):
+            if client_name == "slow_client":
+                await asyncio.sleep(10)
+            return "postgresql://"
+
+        engine = MagicMock(wait_closed=CoroutineMock())
+        create_engine_mock.side_effect = CoroutineMock(return_value=engine)
+
+        with patch("service_api.services.database.db_uri", db_uri_mock):
+            slow = asyncio.ensure_future(get_engine("slow_client"))
+            self.assertIs(await get_engine("fast_client"), engine)
+            with self.assertRaises(EngineUnavailableException):
+                await slow
+
+    @patch("service_api.services.database.replica_hosts", CoroutineMock(return_value=["10.2.2.120"]))
+    @patch("service_api.services.database.db_uri", CoroutineMock(return_value="postgresql://"))
+    @patch("service_api.services.database._create_engine")
+    async def test_reads_go_to_primary_after_write(self, create_engine_mock):
+        primary_engine = MagicMock(wait_closed=CoroutineMock())
+        read_engine = MagicMock(wait_closed=CoroutineMock())
+        create_engine_mock.side_effect = CoroutineMock(side_effect=[primary_engine, read_engine])
+
+        self.assertIs(await get_engine("replica_client"), primary_engine)
+        self.assertIs(await get_engine("replica_client", readonly=True), read_engine)
+
+        register_write("replica_client")
+        self.assertIs(await get_engine("replica_client", readonly=True), primary_engine)
+
+    @patch("service_api.services.database._safe_reconnect", CoroutineMock())
+    @patch("service_api.services.database.db_uri", CoroutineMock(return_value="postgresql://"))
+    @patch("service_api.services.database._create_engine")
+    async def test_only_lost_connection_makes_engine_unhealthy(self, create_engine_mock):
+        engine = MagicMock(wait_closed=CoroutineMock())
+        create_engine_mock.side_effect = CoroutineMock(return_value=engine)
+        await get_engine("conflict_client")
+
+        report_connection_error(engine, TransactionRollbackError())
+        self.assertNotIn("conflict_client", database._unhealthy_engines)
+
+        report_connection_error(engine, InterfaceError())
+        self.assertIn("conflict_client", database._unhealthy_engines)
+
+    @patch("service_api.services.database._probe_engine", CoroutineMock(side_effect=InterfaceError()))
+    @patch("service_api.services.database._create_engine")
+    async def test_failed_reconnect_does_not_break_eviction(self, create_engine_mock):
+        engine = MagicMock(size=1, freesize=1, wait_closed=CoroutineMock())
+        create_engine_mock.side_effect = CoroutineMock(side_effect=[engine, InterfaceError()])
+        await get_engine("down_client")
+
+        self.assertFalse(await check_engine("down_client"))
+        with self.assertRaises(InterfaceError):
+            await database.reconnect_engine("down_client")
+
+        with patch("service_api.services.database.ENGINE_IDLE_TTL", -1):
+            await database._evict_expired_engines()
+        self.assertNotIn("down_client", database._engine_last_used)
+
+    @patch("service_api.services.database.HEALTH_CHECK_TIMEOUT", 0.01)
+    @patch("service_api.services.database.db_uri", CoroutineMock(return_value="postgresql://"))
+    @patch("service_api.services.database._create_engine")
+    async def test_timeout_while_pool_is_exhausted_does_not_reconnect(self, create_engine_mock):
+        metrics.reset()
+        engine = MagicMock(size=database.POOL_SIZE, freesize=0, maxsize=database.POOL_SIZE,
+                           wait_closed=CoroutineMock())
+        engine.acquire.side_effect = lambda: asyncio.Event().wait()
+        create_engine_mock.side_effect = CoroutineMock(return_value=engine)
+        await get_engine("busy_client")
+
+        await database._check_engines()
+
+        engine.close.assert_not_called()
+        create_engine_mock.assert_called_once()
+        self.assertNotIn("busy_client", database._unhealthy_engines)
+        self.assertEqual(metrics.snapshot()["counters"]["engine_pool_exhausted"], 1)
+
+    @patch("service_api.services.database.db_uri", CoroutineMock(return_value="postgresql://"))
+    @patch("service_api.services.database._create_engine")
+    async def test_pinned_engine_is_not_evicted(self, create_engine_mock):
+        engine = MagicMock(size=0, freesize=0, wait_closed=CoroutineMock())
+        create_engine_mock.side_effect = CoroutineMock(return_value=engine)
+        pin_engine(await get_engine("pinned_client"))
+
+        with patch("service_api.services.database.ENGINE_IDLE_TTL", -1):
+            await database._evict_expired_engines()
+            engine.close.assert_not_called()
+
+            unpin_engine(engine)
+            await database._evict_expired_engines()
+        engine.close.assert_called_once()
+
+    @patch("service_api.services.database.MAX_CONNECTIONS", database.POOL_SIZE)
+    @patch("service_api.services.database.MAX_READ_CONNECTIONS", database.POOL_SIZE)
+    @patch("service_api.services.database.replica_hosts", CoroutineMock(return_value=["10.2.2.120"]))
+    @patch("service_api.services.database.db_uri", CoroutineMock(return_value="postgresql://"))
+    @patch("service_api.services.database._create_engine")
+    async def test_read_engines_do_not_evict_primary_engines(self, create_engine_mock):
+        engines = [MagicMock(size=1, freesize=1, wait_closed=CoroutineMock()) for _ in range(3)]
+        create_engine_mock.side_effect = CoroutineMock(side_effect=engines)
+
+        await get_engine("first_client")
+        await get_engine("first_client", readonly=True)
+        await get_engine("second_client", readonly=True)
+
+        engines[0].close.assert_not_called()
+        engines[1].close.assert_called_once()
+
+    @patch("service_api.services.database.replica_hosts", CoroutineMock(return_value=["10.2.2.120", "10.2.2.121"]))
+    @patch("service_api.services.database.db_uri", CoroutineMock(return_value="postgresql://"))
+    @patch("service_api.services.database._create_engine")
+    async def test_read_engine_is_reconnected_to_another_replica(self, create_engine_mock):
+        create_engine_mock.side_effect = CoroutineMock(side_effect=lambda url: MagicMock(wait_closed=CoroutineMock()))
+        await get_engine("failover_client", readonly=True)
+        failed_host = database._engine_hosts["failover_client:read"]
+
+        database._unhealthy_engines.add("failover_client:read")
+        await database.reconnect_engine("failover_client:read")
+
+        self.assertNotEqual(database._engine_hosts["failover_client:read"], failed_host)
+
+    @patch("service_api.services.database.REPLICA_RETRY_DELAY", 0.01)
+    @patch("service_api.services.database.replica_hosts", CoroutineMock(return_value=["10.2.2.120"]))
+    @patch("service_api.services.database.db_uri", CoroutineMock(return_value="postgresql://"))
+    @patch("service_api.services.database._create_engine")
+    async def test_read_engine_is_created_again_after_failed_reconnect(self, create_engine_mock):
+        read_engine, primary_engine, new_read_engine = (MagicMock(wait_closed=CoroutineMock()) for _ in range(3))
+        create_engine_mock.side_effect = CoroutineMock(
+            side_effect=[read_engine, InterfaceError(), primary_engine, new_read_engine]
+        )
+        await get_engine("replica_down_client", readonly=True)
+
+        database._unhealthy_engines.add("replica_down_client:read")
+        await database._safe_reconnect("replica_down_client:read")
+
+        self.assertIs(await get_engine("replica_down_client", readonly=True), primary_engine)
+        await asyncio.sleep(0.02)
+        self.assertIs(await get_engine("replica_down_client", readonly=True), new_read_engine)
+
+    @patch("service_api.services.database.discover_pg_replicas", CoroutineMock(return_value=["10.2.2.130"]))
+    @patch("service_api.services.database.__server_instance")
+    async def test_replica_hosts_are_configured_per_database(self, server_instance_mock):
+        server_instance_mock.config = {
+            "DB_REPLICA_HOSTS": parse_replica_hosts("rfadjustments_first=10.2.2.120, 10.2.2.121;rfadjustments_x=")
+        }
+
+        self.assertEqual(await database.replica_hosts("first"), ["10.2.2.120", "10.2.2.121"])
+        self.assertEqual(await database.replica_hosts("second"), ["10.2.2.130"])
@@ -0,0 +1,101 @@
+from asynctest import patch, CoroutineMock, MagicMock
+from psycopg2.extensions import TransactionRollbackError
+
+from tests import BaseTestCase
+
+from service_api.services import metrics
+from service_api.services.unit_of_work import UnitOfWork, run_in_transaction, SERIALIZATION_FAILURE, DEADLOCK_DETECTED
+
+
+class SerializationFailure(TransactionRollbackError):
+    pgcode = SERIALIZATION_FAILURE
+
+
+class DeadlockDetected(TransactionRollbackError):
+    pgcode = DEADLOCK_DETECTED
+
+
+class TestUnitOfWork(BaseTestCase):
+
+    @patch("service_api.services.unit_of_work.get_engine")
+    async def test_connection_is_not_acquired_without_queries(self, get_engine_mock):
+        unit_of_work = UnitOfWork("test")
+        await unit_of_work.close()
+
+        get_engine_mock.assert_not_called()
+        self.assertFalse(unit_of_work.used)
+
+    @patch("service_api.services.unit_of_work.get_engine")
+    async def test_connection_is_shared_between_calls(self, get_engine_mock):
+        connection = MagicMock(close=CoroutineMock())
+        engine = MagicMock(acquire=CoroutineMock(return_value=connection))
+        get_engine_mock.side_effect = CoroutineMock(return_value=engine)
+        unit_of_work = UnitOfWork("test")
+
+        async with unit_of_work.acquire() as first_conn:
+            async with unit_of_work.acquire() as second_conn:
+                self.assertIs(first_conn, second_conn)
+        await unit_of_work.close()
+
+        engine.acquire.assert_called_once()
+        connection.close.assert_awaited_once()
+
+    @patch("service_api.services.unit_of_work.get_engine")
+    async def test_use_primary_releases_connection_of_replica(self, get_engine_mock):
+        read_connection, primary_connection = MagicMock(close=CoroutineMock()), MagicMock(close=CoroutineMock())
+        read_engine = MagicMock(acquire=CoroutineMock(return_value=read_connection))
+        primary_engine = MagicMock(acquire=CoroutineMock(return_value=primary_connection))
+        get_engine_mock.side_effect = CoroutineMock(side_effect=[read_engine, primary_engine])
+        unit_of_work = UnitOfWork("test", readonly=True)
+
+        self.assertIs(await unit_of_work.connection(), read_connection)
+        await unit_of_work.use_primary()
+        self.assertIs(await unit_of_work.connection(), primary_connection)
+        await unit_of_work.close()
+
+        read_connection.close.assert_awaited_once()
+        get_engine_mock.assert_called_with(client="test", readonly=False)
+
+    async def test_nested_transaction_uses_savepoint(self):
+        unit_of_work = UnitOfWork(self.app_client)
+        async with unit_of_work.transaction() as conn:
+            async with unit_of_work.transaction() as nested_conn:
+                self.assertIs(conn, nested_conn)
+                self.assertTrue(unit_of_work.in_transaction)
+        self.assertFalse(unit_of_work.in_transaction)
+        await unit_of_work.close()
+
+    async def test_transaction_is_retried_on_conflicts(self):
+        metrics.reset()
+        operation = CoroutineMock(side_effect=[SerializationFailure(), DeadlockDetected(), "result"])
+        unit_of_work = UnitOfWork(self.app_client)
+
+        self.assertEqual(await run_in_transaction(unit_of_work, operation, "test"), "result")
+        self.assertEqual(operation.await_count, 3)
+        self.assertFalse(unit_of_work.in_transaction)
+        await unit_of_work.close()
+
+        counters = metrics.snapshot()["counters"]
+        self.assertEqual(counters['transaction_retries{operation="test"}'], 2)
+        self.assertEqual(counters['transaction_conflicts{operation="test",sqlstate="40001"}'], 1)
+        self.assertEqual(counters['transaction_conflicts{operation="test",sqlstate="40P01"}'], 1)
+
+    @patch("service_api.services.unit_of_work.TRANSACTION_RETRY_BASE_DELAY", 0)
+    async def test_transaction_retries_are_limited(self):
+        operation = CoroutineMock(side_effect=SerializationFailure())
+        unit_of_work = UnitOfWork(self.app_client)
+
+        with self.assertRaises(SerializationFailure):
+            await run_in_transaction(unit_of_work, operation, "test", attempts=3)
+        self.assertEqual(operation.await_count, 3)
+        await unit_of_work.close()
+
+    async def test_nested_transaction_is_not_retried(self):
+        operation = CoroutineMock(side_effect=SerializationFailure())
+        unit_of_work = UnitOfWork(self.app_client)
+
+        async with unit_of_work.transaction():
+            with self.assertRaises(SerializationFailure):
+                await run_in_transaction(unit_of_work, operation, "test")
+        operation.assert_awaited_once()
+        await unit_of_work.close()
@@ -4,6 +4,7 @@ import os
 import yaml
 from dateutil.parser import parse as dtparse
 
+from service_api.domain.latest_adjustments import rebuild_latest_adjustments
 from service_api.models import models
 from service_api.services.database import get_engine, release_engines
 
@@ -39,6 +40,7 @@ class FixtureLoader:
                     for model in models:
                         records = sample_data.get(model.name, [])
                         await self._load_data(conn, model, records)
+            await rebuild_latest_adjustments(engine)
         await release_engines()
 
     @staticmethod
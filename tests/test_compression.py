@@ -0,0 +1,17 @@
+from unittest import TestCase, mock
+
+from service_api.services.compression import accepted_encoding, COMPRESSORS
+
+
+class TestAcceptedEncoding(TestCase):
+
+    def test_encoding_with_the_highest_quality_is_chosen(self):
+        self.assertEqual(accepted_encoding("gzip"), "gzip")
+        self.assertEqual(accepted_encoding("deflate, gzip;q=0.5"), "gzip")
+        with mock.patch.dict(COMPRESSORS, {"br": COMPRESSORS["gzip"]}):
+            self.assertEqual(accepted_encoding("br;q=0.4, gzip;q=0.8"), "gzip")
+
+    def test_not_accepted_encodings_are_not_chosen(self):
+        self.assertIsNone(accepted_encoding(None))
+        self.assertIsNone(accepted_encoding("identity"))
+        self.assertIsNone(accepted_encoding("gzip;q=0, identity"))
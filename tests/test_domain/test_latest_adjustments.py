@@ -0,0 +1,38 @@
+from service_api.domain.adjustment import finalize_project_adjustments, delete_not_applied_adjustments
+from service_api.domain.latest_adjustments import check_latest_adjustments, rebuild_latest_adjustments
+from service_api.models import LatestAdjustments
+from service_api.services.database import get_engine
+from service_api.services.discovery import discover_pg_source
+from tests import BaseTestCase, DB_NAME
+
+PROJECT_UUID = 'aa2bd902-34ef-43ea-a13a-5e983ed72830'
+
+
+class TestLatestAdjustmentsDomain(BaseTestCase):
+
+    async def engine(self):
+        host, _ = await discover_pg_source(DB_NAME)
+        return await get_engine(self.app_client, host)
+
+    async def test_projection_is_consistent_after_finalize(self):
+        engine = await self.engine()
+        await finalize_project_adjustments(engine, {'project_uuid': PROJECT_UUID})
+        self.assertEqual(await check_latest_adjustments(engine), [])
+
+    async def test_projection_is_consistent_after_delete_not_applied(self):
+        engine = await self.engine()
+        await delete_not_applied_adjustments(engine, {'project_uuid': PROJECT_UUID})
+        self.assertEqual(await check_latest_adjustments(engine), [])
+
+    async def test_check_reports_missing_keys_until_rebuild(self):
+        engine = await self.engine()
+        async with engine.acquire() as conn:
+            await conn.execute(LatestAdjustments.delete().where(LatestAdjustments.c.project_uuid == PROJECT_UUID))
+
+        inconsistencies = await check_latest_adjustments(engine)
+        self.assertTrue(inconsistencies)
+        self.assertTrue(all(str(row['project_uuid']) == PROJECT_UUID for row in inconsistencies))
+        self.assertTrue(all(row['actual_id'] is None for row in inconsistencies))
+
+        await rebuild_latest_adjustments(engine)
+        self.assertEqual(await check_latest_adjustments(engine), [])
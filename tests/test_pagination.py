@@ -1,6 +1,10 @@
 from rfcommon_api.common.paginators import Pagination, PaginationException
+from sqlalchemy.sql import select
 from unittest import TestCase
 
+from service_api.models import Adjustments
+from service_api.services.pagination import sort_keys, order_by_keys
+
 
 class TestPaging(TestCase):
 
@@ -136,3 +140,17 @@ class TestPaging(TestCase):
         pager = Pagination(items_count, "/test_ur", page=1, per_page=3)
         test_results = [1, 2, 3, 4, 5]
         self.assertEqual(pager.slice(test_results), [1, 2, 3])
+
+
+class TestSortKeys(TestCase):
+
+    def test_tie_breaker_is_appended(self):
+        query = select([Adjustments.c.id]).order_by(Adjustments.c.updated_at.desc())
+        keys = sort_keys(query, Adjustments.c.id)
+        self.assertEqual(keys, [(Adjustments.c.updated_at, True), (Adjustments.c.id, False)])
+
+    def test_tie_breaker_keeps_requested_direction(self):
+        query = select([Adjustments.c.id]).order_by(Adjustments.c.id.desc(), Adjustments.c.comment)
+        keys = sort_keys(query, Adjustments.c.id)
+        self.assertEqual(keys, [(Adjustments.c.id, True)])
+        self.assertTrue(str(order_by_keys(query, keys)).endswith("ORDER BY adjustments.id DESC"))
@@ -1,5 +1,7 @@
 import json
 import uuid
+from types import SimpleNamespace
+from urllib.parse import urlsplit
 
 from asynctest import (
     CoroutineMock,
@@ -7,8 +9,12 @@ from asynctest import (
 )
 from copy import deepcopy
 
+import msgpack
+
 from service_api.constants import (RF_SYSTEM_EVENTS, SYSTEM_EVENT_AMOUNT_OVERRIDE, ADJUSTMENT_UPDATED_TOPIC,
                                    SYSTEM_EVENT_TIER_OVERRIDE)
+from service_api.services import metrics
+from service_api.services.database import get_engine
 from service_api.services.forms import AdjustmentStatuses
 
 from tests import BaseTestCase
@@ -80,6 +86,81 @@ class TestOverridesResources(BaseTestCase):
             f"{UserObjectMock.registry_data['profile']['lastName']}"
         )
 
+    def test_bulk_create_manual_overrides(self, kafka_mock, notification_mock):
+        items = []
+        for value in range(3):
+            item = deepcopy(AdjustmentMock.create_manual_override_data)
+            item["adjustment_value"] = value
+            items.append(item)
+        items[1].pop("record_hash")
+
+        resp = self.test_client.post(f"{self.resource_url}/bulk",
+                                     headers=self.headers,
+                                     data=json.dumps({"adjustments": items}),
+                                     gather_request=False)
+
+        self.assertEqual(resp.status, 201)
+        self.assertEqual([adjustment["adjustment_value"] for adjustment in resp.json], [0, 1, 2])
+        self.assertEqual(len({adjustment["id"] for adjustment in resp.json}), 3)
+        kafka_mock.assert_awaited_once()
+        self.assertEqual(notification_mock.await_count, 2)
+
+    def test_bulk_create_empty_batch(self, kafka_mock, notification_mock):
+        resp = self.test_client.post(f"{self.resource_url}/bulk",
+                                     headers=self.headers,
+                                     data=json.dumps({"adjustments": []}),
+                                     gather_request=False)
+
+        self.assertEqual(resp.status, 422)
+        kafka_mock.assert_not_awaited()
+
+    def test_replace_project_adjustments(self, kafka_mock, notification_mock):
+        url = f"{self.base_url}/replace_project_adjustments/"
+        project_uuid = "c5cd5ce6-4c46-4e6d-a67d-7df38fdd7d55"
+        first, second, third = (
+            {
+                **AdjustmentMock.create_manual_override_data,
+                "price_group_uuid": price_group_uuid,
+                "adjustment_value": 10,
+            }
+            for price_group_uuid in (str(uuid.uuid4()), str(uuid.uuid4()), str(uuid.uuid4()))
+        )
+        for item in (first, second, third):
+            item.pop("project_uuid")
+
+        resp = self.test_client.post(url,
+                                     headers=self.headers,
+                                     data=json.dumps({"project_uuid": project_uuid, "adjustments": [first, second]}),
+                                     gather_request=False)
+        self.assertEqual(resp.status, 200)
+        self.assertEqual(resp.json, {"inserted": 2, "updated": 0, "deleted": 0})
+
+        first["adjustment_value"] = 20
+        resp = self.test_client.post(url,
+                                     headers=self.headers,
+                                     data=json.dumps({"project_uuid": project_uuid, "adjustments": [first, third]}),
+                                     gather_request=False)
+        self.assertEqual(resp.status, 200)
+        self.assertEqual(resp.json, {"inserted": 1, "updated": 1, "deleted": 1})
+
+        resp = self.test_client.get(f"{self.base_url}/project_adjustments/{project_uuid}",
+                                    headers=self.headers,
+                                    gather_request=False)
+        self.assertEqual(
+            sorted((adjustment["price_group_uuid"], adjustment["adjustment_value"]) for adjustment in resp.json),
+            sorted([(first["price_group_uuid"], 20), (third["price_group_uuid"], 10)])
+        )
+
+    def test_replace_project_adjustments_with_duplicated_keys(self, kafka_mock, notification_mock):
+        item = deepcopy(AdjustmentMock.create_manual_override_data)
+        project_uuid = item.pop("project_uuid")
+        resp = self.test_client.post(f"{self.base_url}/replace_project_adjustments/",
+                                     headers=self.headers,
+                                     data=json.dumps({"project_uuid": project_uuid, "adjustments": [item, item]}),
+                                     gather_request=False)
+
+        self.assertEqual(resp.status, 422)
+
     def test_create_manual_override_with_adjustment_and_tier(self, kafka_mock, notification_mock):
         data = AdjustmentMock.create_manual_override_data_with_adjustment_and_tier_override_simultaneously
 
@@ -187,6 +268,39 @@ class TestOverridesResources(BaseTestCase):
             f"{UserObjectMock.registry_data['profile']['lastName']}"
         )
 
+    def test_bulk_update_manual_overrides(self, kafka_mock, notification_mock):
+        existing_id = "32d256ae-a704-4bd2-aa2a-085d34ae4df2"
+        missing_id = "32d256ae-a704-4bd2-aa2a-085d34ae4df1"
+        items = [
+            {**AdjustmentMock.update_manual_override_data, "id": existing_id},
+            {**AdjustmentMock.update_manual_override_data, "id": missing_id},
+        ]
+
+        resp = self.test_client.put(f"{self.resource_url}/bulk",
+                                    headers=self.headers,
+                                    data=json.dumps({"adjustments": items}),
+                                    gather_request=False)
+
+        self.assertEqual(resp.status, 200)
+        self.assertEqual([adjustment["id"] for adjustment in resp.json["adjustments"]], [existing_id])
+        self.assertEqual([(error["id"], error["status"]) for error in resp.json["errors"]], [(missing_id, 404)])
+        kafka_mock.assert_awaited_once()
+
+    def test_atomic_bulk_update_with_missing_adjustment(self, kafka_mock, notification_mock):
+        items = [
+            {**AdjustmentMock.update_manual_override_data, "id": "32d256ae-a704-4bd2-aa2a-085d34ae4df2"},
+            {**AdjustmentMock.update_manual_override_data, "id": "32d256ae-a704-4bd2-aa2a-085d34ae4df1"},
+        ]
+
+        resp = self.test_client.put(f"{self.resource_url}/bulk",
+                                    headers=self.headers,
+                                    data=json.dumps({"adjustments": items, "atomic": True}),
+                                    gather_request=False)
+
+        self.assertEqual(resp.status, 404)
+        kafka_mock.assert_not_awaited()
+        notification_mock.assert_not_awaited()
+
     def test_update_tier_override(self, kafka_mock, notification_mock):
         changes = [{"field": "tier_id", "oldvalue": "6786", "newvalue": "1234"}]
         data = AdjustmentMock.update_tier_override_data
@@ -309,6 +423,110 @@ class TestAdjustmentsResources(BaseTestCase):
 
         self.assertEqual(resp.status, 200)
 
+    def test_get_adjustments_by_cursor(self):
+        all_adjustments = self.test_client.get(f"{self.base_url}/adjustments",
+                                               headers=self.headers,
+                                               params={"page": 1, "per_page": 1000},
+                                               gather_request=False)
+        cursor_ids = []
+        url = f"{self.base_url}/adjustments?pagination=cursor&per_page=3"
+        while url:
+            resp = self.test_client.get(url, headers=self.headers, gather_request=False)
+            self.assertEqual(resp.status, 200)
+            self.assertNotIn("X-Pagination-Total-Count", resp.headers)
+            self.assertLessEqual(len(resp.json), 3)
+            cursor_ids.extend(adjustment["id"] for adjustment in resp.json)
+            next_url = resp.headers.get("Link", "")[1:].split(">")[0]
+            url = "?".join(urlsplit(next_url)[2:4]) if next_url else None
+
+        self.assertEqual(len(cursor_ids), len(set(cursor_ids)))
+        self.assertEqual(set(cursor_ids), {adjustment["id"] for adjustment in all_adjustments.json})
+
+    def test_get_adjustments_count_modes(self):
+        exact = self.test_client.get(f"{self.base_url}/adjustments",
+                                     headers=self.headers,
+                                     params={"page": 1, "per_page": 2},
+                                     gather_request=False)
+        self.assertEqual(exact.status, 200)
+        self.assertEqual(exact.headers["X-Pagination-Count-Mode"], "exact")
+        self.assertNotIn("total_count", exact.json[0])
+
+        all_adjustments = self.test_client.get(f"{self.base_url}/adjustments",
+                                               headers=self.headers,
+                                               params={"page": 1, "per_page": 1000},
+                                               gather_request=False)
+        self.assertEqual(int(exact.headers["X-Pagination-Total-Count"]), len(all_adjustments.json))
+
+        estimate = self.test_client.get(f"{self.base_url}/adjustments",
+                                        headers=self.headers,
+                                        params={"page": 1, "per_page": 2, "count": "estimate"},
+                                        gather_request=False)
+        self.assertEqual(estimate.status, 200)
+        self.assertEqual(estimate.headers["X-Pagination-Count-Mode"], "estimate")
+        self.assertIn("X-Pagination-Total-Count", estimate.headers)
+
+        none = self.test_client.get(f"{self.base_url}/adjustments",
+                                    headers=self.headers,
+                                    params={"page": 1, "per_page": 2, "count": "none"},
+                                    gather_request=False)
+        self.assertEqual(none.status, 200)
+        self.assertEqual(none.headers["X-Pagination-Count-Mode"], "none")
+        self.assertNotIn("X-Pagination-Total-Count", none.headers)
+        self.assertEqual(len(none.json), len(exact.json))
+
+    def test_get_adjustments_with_invalid_count_mode(self):
+        resp = self.test_client.get(f"{self.base_url}/adjustments",
+                                    headers=self.headers,
+                                    params={"count": "approximate"},
+                                    gather_request=False)
+
+        self.assertEqual(resp.status, 422)
+
+    def test_get_adjustments_with_fields(self):
+        resp = self.test_client.get(f"{self.base_url}/adjustments",
+                                    headers=self.headers,
+                                    params={"fields": "id,adjustment_value"},
+                                    gather_request=False)
+        by_cursor = self.test_client.get(f"{self.base_url}/adjustments",
+                                         headers=self.headers,
+                                         params={"fields": "adjustment_value", "pagination": "cursor", "per_page": 1},
+                                         gather_request=False)
+
+        self.assertEqual(resp.status, 200)
+        self.assertTrue(resp.json)
+        self.assertTrue(all(set(adjustment) == {"id", "adjustment_value"} for adjustment in resp.json))
+        self.assertEqual(by_cursor.status, 200)
+        self.assertEqual(set(by_cursor.json[0]), {"adjustment_value"})
+        self.assertIn("cursor=", by_cursor.headers["Link"])
+
+    def test_get_project_adjustments_with_fields(self):
+        resp = self.test_client.get(
+            f"{self.base_url}/project_adjustments/387bc469-2c73-4d48-9f1f-490ee8f915b9",
+            headers=self.headers,
+            params={"fields": "id,updated_at"},
+            gather_request=False
+        )
+
+        self.assertEqual(resp.status, 200)
+        self.assertEqual(resp.json[0]["updated_at"], "2018-07-26T11:11:43.231740")
+        self.assertTrue(all(set(adjustment) == {"id", "updated_at"} for adjustment in resp.json))
+
+    def test_get_adjustments_with_unknown_field(self):
+        resp = self.test_client.get(f"{self.base_url}/adjustments",
+                                    headers=self.headers,
+                                    params={"fields": "id,unknown"},
+                                    gather_request=False)
+
+        self.assertEqual(resp.status, 422)
+
+    def test_get_adjustments_with_invalid_cursor(self):
+        resp = self.test_client.get(f"{self.base_url}/adjustments",
+                                    headers=self.headers,
+                                    params={"cursor": "invalid"},
+                                    gather_request=False)
+
+        self.assertEqual(resp.status, 422)
+
     @patch("rfcommon_api.common.domain.user.UserObject.get_user_data",
            CoroutineMock(return_value=UserObjectMock.registry_data))
     def test_get_adjustment(self):
@@ -319,6 +537,91 @@ class TestAdjustmentsResources(BaseTestCase):
         self.assertEqual(resp.status, 200)
         self.assertEqual(resp.json["id"], "32d256ae-a704-4bd2-aa2a-085d34ae4df2")
 
+    def test_get_adjustment_not_modified(self):
+        url = f"{self.base_url}/adjustments/32d256ae-a704-4bd2-aa2a-085d34ae4df3"
+        resp = self.test_client.get(url, headers=self.headers, gather_request=False)
+        etag = resp.headers["ETag"]
+
+        not_modified = self.test_client.get(url, headers={**self.headers, "If-None-Match": etag},
+                                            gather_request=False)
+        modified = self.test_client.get(url, headers={**self.headers, "If-None-Match": 'W/"outdated"'},
+                                        gather_request=False)
+
+        self.assertTrue(etag.startswith('W/"'))
+        self.assertEqual(not_modified.status, 304)
+        self.assertEqual(not_modified.headers["ETag"], etag)
+        self.assertEqual(modified.status, 200)
+        self.assertEqual(modified.json, resp.json)
+
+    def test_get_adjustments_not_modified_before_adjustments_are_selected(self):
+        url = f"{self.base_url}/adjustments?per_page=2"
+        etag = self.test_client.get(url, headers=self.headers, gather_request=False).headers["ETag"]
+
+        with patch("service_api.resources.adjustment_resources.get_adjustments") as get_adjustments_mock:
+            not_modified = self.test_client.get(url, headers={**self.headers, "If-None-Match": etag},
+                                                gather_request=False)
+
+        self.assertEqual(not_modified.status, 304)
+        self.assertEqual(not_modified.headers["ETag"], etag)
+        get_adjustments_mock.assert_not_called()
+
+    def test_get_project_adjustments_not_modified_until_project_is_changed(self):
+        url = f"{self.base_url}/project_adjustments/aa2bd902-34ef-43ea-a13a-5e983ed72830"
+        etag = self.test_client.get(url, headers=self.headers, gather_request=False).headers["ETag"]
+        headers = {**self.headers, "If-None-Match": etag}
+
+        not_modified = self.test_client.get(url, headers=headers, gather_request=False)
+        self.test_client.post(f"{self.base_url}/finalize_project_adjustments",
+                              headers=self.headers,
+                              data=json.dumps({"project_uuid": "aa2bd902-34ef-43ea-a13a-5e983ed72830"}),
+                              gather_request=False)
+        modified = self.test_client.get(url, headers=headers, gather_request=False)
+
+        self.assertEqual(not_modified.status, 304)
+        self.assertEqual(modified.status, 200)
+        self.assertNotEqual(modified.headers["ETag"], etag)
+
+    def test_get_project_adjustments_in_columnar_formats(self):
+        url = f"{self.base_url}/project_adjustments/aa2bd902-34ef-43ea-a13a-5e983ed72830"
+        rows = self.test_client.get(url, headers=self.headers, gather_request=False).json
+
+        columnar = self.test_client.get(url, headers={**self.headers, "Accept": "application/x-columnar+json"},
+                                        gather_request=False)
+        packed = self.test_client.get(url, headers={**self.headers, "Accept": "application/msgpack"},
+                                      gather_request=False)
+
+        self.assertEqual(columnar.headers["Content-Type"], "application/x-columnar+json")
+        columnar_body = json.loads(columnar.text)
+        self.assertEqual(
+            [dict(zip(columnar_body["columns"], values)) for values in zip(*columnar_body["data"])], rows
+        )
+        self.assertEqual(packed.headers["Content-Type"], "application/msgpack")
+        packed_body = msgpack.unpackb(packed.body, raw=False)
+        packed_rows = [dict(zip(packed_body["columns"], values)) for values in packed_body["rows"]]
+        self.assertEqual(
+            [{**row, "adjustment_value": row["adjustment_value"] and float(row["adjustment_value"])}
+             for row in packed_rows],
+            rows
+        )
+        self.assertTrue(len(packed.body) < len(json.dumps(rows)))
+
+    def test_get_project_adjustments_compressed(self):
+        url = f"{self.base_url}/project_adjustments/aa2bd902-34ef-43ea-a13a-5e983ed72830"
+        metrics.reset()
+
+        with patch("service_api.services.compression.COMPRESSION_MIN_SIZE", 0):
+            plain = self.test_client.get(url, headers={**self.headers, "Accept-Encoding": "identity"},
+                                         gather_request=False)
+            compressed = self.test_client.get(url, headers={**self.headers, "Accept-Encoding": "gzip"},
+                                              gather_request=False)
+
+        self.assertNotIn("Content-Encoding", plain.headers)
+        self.assertEqual(compressed.headers["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", compressed.headers["Vary"])
+        self.assertEqual(compressed.json, plain.json)
+        gauges = metrics.snapshot()["gauges"]
+        self.assertTrue(0 < gauges['compression_ratio{encoding="gzip"}'] < 1)
+
     def test_get_not_existing_adjustment(self):
         resp = self.test_client.get(f"{self.base_url}/adjustments/32d256ae-a704-4bd2-aa2a-085d34ae4df1",
                                     headers=self.headers,
@@ -412,6 +715,32 @@ class TestAdjustmentsResources(BaseTestCase):
         self.assertEqual(not_applied_adjustment.status, 200)
         self.assertEqual(not_applied_adjustment.json["status"], AdjustmentStatuses.not_applied.value)
 
+    def test_finalize_project_adjustments(self):
+        data = {"project_uuid": "aa2bd902-34ef-43ea-a13a-5e983ed72830"}
+        resp = self.test_client.post(
+            f"{self.base_url}/finalize_project_adjustments",
+            headers=self.headers,
+            data=json.dumps(data),
+            gather_request=False
+        )
+        deprecated_adjustment = self.test_client.get(
+            f"{self.base_url}/adjustments/613197bd-0e33-4ff9-80a8-d4114a210b71",
+            headers=self.headers,
+            gather_request=False
+        )
+        applied_adjustment = self.test_client.get(
+            f"{self.base_url}/adjustments/613197bd-0e33-4ff9-80a8-d4114a210b74",
+            headers=self.headers,
+            gather_request=False
+        )
+
+        self.assertEqual(resp.status, 200)
+        self.assertEqual(set(resp.json), {"removed", "applied"})
+        self.assertGreaterEqual(resp.json["removed"], 3)
+        self.assertGreaterEqual(resp.json["applied"], 1)
+        self.assertEqual(deprecated_adjustment.status, 404)
+        self.assertEqual(applied_adjustment.json["status"], AdjustmentStatuses.applied.value)
+
     def test_remove_deprecated_adjustments_no_not_applied(self):
         actual_adjustment = self.test_client.get(f"{self.base_url}/adjustments/613197bd-0e33-4ff9-80a8-d4114a210b75",
                                                  headers=self.headers,
@@ -479,6 +808,30 @@ class TestAdjustmentsResources(BaseTestCase):
         self.assertEqual(latest_adjustments.json[0]["updated_at"], "2018-07-26T11:11:43.231740")
         self.assertEqual(latest_adjustments.json[1]["updated_at"], "2018-07-30T11:11:43.231740")
 
+    def test_stream_project_adjustments(self):
+        url = f"{self.base_url}/project_adjustments/387bc469-2c73-4d48-9f1f-490ee8f915b9"
+        expected = self.test_client.get(url, headers=self.headers, gather_request=False)
+
+        resp = self.test_client.get(url,
+                                    headers={**self.headers, "Accept": "application/x-ndjson"},
+                                    gather_request=False)
+        self.assertEqual(resp.status, 200)
+        self.assertEqual(resp.headers["Content-Type"], "application/x-ndjson")
+        self.assertEqual([json.loads(line) for line in resp.text.splitlines()], expected.json)
+
+    def test_stream_adjustments(self):
+        expected = self.test_client.get(f"{self.base_url}/adjustments",
+                                        headers=self.headers,
+                                        params={"page": 1, "per_page": 1000},
+                                        gather_request=False)
+
+        resp = self.test_client.get(f"{self.base_url}/adjustments",
+                                    headers={**self.headers, "Accept": "application/x-ndjson"},
+                                    gather_request=False)
+        self.assertEqual(resp.status, 200)
+        streamed = [json.loads(line) for line in resp.text.splitlines()]
+        self.assertCountEqual(streamed, expected.json)
+
     def test_get_project_adjustments_from_not_existing_project(self):
         no_existing_adjustments = self.test_client.get(
             f"{self.base_url}/project_adjustments/b5cd5ce6-4c46-4e6d-a67d-7df38fd4rt75",
@@ -570,6 +923,96 @@ class TestAdjustmentPermissions(BaseTestCase):
         )
 
 
+class RedisCacheMock:
+    """Keeps cached values in memory instead of Redis."""
+
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ttl):  # noqa A003
+        self.values[key] = value
+
+
+@patch("service_api.domain.adjustment.KafkaProducer.publish", CoroutineMock())
+@patch("rfcommon_api.common.services.rest_client.notification.NotificationRESTClient.send_notification",
+       CoroutineMock())
+@patch("rfcommon_api.common.services.rest_client.projects.ProjectsRESTClient.get_project",
+       CoroutineMock(return_value=AdjustmentMock.project_registry_data))
+@patch("rfcommon_api.common.domain.user.UserObject.get_user_data",
+       CoroutineMock(return_value=UserObjectMock.registry_data))
+class TestResponseCache(BaseTestCase):
+    response_cache_ttl = 300
+
+    @property
+    def test_client(self):
+        return self.create_app().test_client
+
+    def test_project_adjustments_are_cached_until_project_is_changed(self):
+        url = f"{self.base_url}/project_adjustments/aa2bd902-34ef-43ea-a13a-5e983ed72830"
+        metrics.reset()
+
+        with patch("service_api.services.response_cache.cache_manager",
+                   SimpleNamespace(RedisCacheManager=RedisCacheMock())):
+            first = self.test_client.get(url, headers=self.headers, gather_request=False)
+            second = self.test_client.get(url, headers=self.headers, gather_request=False)
+            self.test_client.post(f"{self.base_url}/finalize_project_adjustments",
+                                  headers=self.headers,
+                                  data=json.dumps({"project_uuid": "aa2bd902-34ef-43ea-a13a-5e983ed72830"}),
+                                  gather_request=False)
+            third = self.test_client.get(url, headers=self.headers, gather_request=False)
+
+        counters = metrics.snapshot()["counters"]
+        self.assertEqual(second.json, first.json)
+        self.assertNotEqual(third.json, first.json)
+        self.assertEqual(counters['response_cache_hits{endpoint="project_adjustments"}'], 1)
+        self.assertEqual(counters['response_cache_misses{endpoint="project_adjustments"}'], 2)
+
+    def test_project_adjustments_not_modified_before_cache_is_read(self):
+        url = f"{self.base_url}/project_adjustments/aa2bd902-34ef-43ea-a13a-5e983ed72830"
+
+        with patch("service_api.services.response_cache.cache_manager",
+                   SimpleNamespace(RedisCacheManager=RedisCacheMock())):
+            etag = self.test_client.get(url, headers=self.headers, gather_request=False).headers["ETag"]
+            metrics.reset()
+            not_modified = self.test_client.get(url, headers={**self.headers, "If-None-Match": etag},
+                                                gather_request=False)
+
+        counters = metrics.snapshot()["counters"]
+        self.assertEqual(not_modified.status, 304)
+        self.assertNotIn('response_cache_hits{endpoint="project_adjustments"}', counters)
+        self.assertEqual(counters['etag_not_modified{endpoint="project_adjustments"}'], 1)
+
+    def test_cached_responses_are_built_from_primary(self):
+        url = f"{self.base_url}/project_adjustments/aa2bd902-34ef-43ea-a13a-5e983ed72830"
+
+        with patch("service_api.services.response_cache.cache_manager",
+                   SimpleNamespace(RedisCacheManager=RedisCacheMock())), \
+                patch("service_api.services.unit_of_work.get_engine", CoroutineMock(side_effect=get_engine)) as engine:
+            response = self.test_client.get(url, headers=self.headers, gather_request=False)
+
+        self.assertEqual(response.status, 200)
+        engine.assert_called_once_with(client=self.app_client, readonly=False)
+
+    def test_adjustments_filtered_by_project_are_cached(self):
+        url = f"{self.base_url}/adjustments?filter=project_uuid eq b5cd5ce6-4c46-4e6d-a67d-7df38fdd7d54"
+        metrics.reset()
+
+        with patch("service_api.services.response_cache.cache_manager",
+                   SimpleNamespace(RedisCacheManager=RedisCacheMock())):
+            first = self.test_client.get(url, headers=self.headers, gather_request=False)
+            second = self.test_client.get(url, headers=self.headers, gather_request=False)
+            self.test_client.get(f"{self.base_url}/adjustments", headers=self.headers, gather_request=False)
+
+        counters = metrics.snapshot()["counters"]
+        self.assertEqual(second.json, first.json)
+        self.assertEqual(second.headers["X-Pagination-Total-Count"], first.headers["X-Pagination-Total-Count"])
+        self.assertEqual(counters['response_cache_hits{endpoint="adjustments"}'], 1)
+        self.assertEqual(counters['response_cache_misses{endpoint="adjustments"}'], 1)
+
+
 class TestAdjustmentResourceFilters(BaseTestCase):
 
     @classmethod
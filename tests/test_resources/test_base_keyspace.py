@@ -1,3 +1,4 @@
+import asyncio
 import json
 
 from asynctest import patch, CoroutineMock, Mock, MagicMock
@@ -5,7 +6,9 @@ from psycopg2 import DatabaseError, InterfaceError
 
 from service_api.services.database import _engines
 from service_api.services.database import close_engine
-from service_api.services.discovery import discover_pg_clients_database, DataBaseNotFoundException
+from service_api.services.discovery import (
+    discover_pg_clients_database, discover_pg_source, clear_discovery_cache, DataBaseNotFoundException
+)
 from service_api.services.database import create_db
 from tests import BaseTestCase, KEYSPACE_PREFIX
 
@@ -123,3 +126,26 @@ class TestKeyspaceResource(BaseTestCase):
             del _engines[new_client_short_name]
 
             logger_mock.error.assert_called_once_with(f'Engine {new_client_short_name} failed to close. Error: ')
+
+    @patch("service_api.services.discovery.DISCOVERY_CACHE_TTL", 0)
+    async def test_stale_pg_source_served_when_sda_unavailable(self):
+        sda_result = [{"ip": "10.2.2.112", "name": "cached_db", "type": "postgresql"}]
+        with patch("service_api.services.discovery.discover_data_source", CoroutineMock(return_value=sda_result)):
+            self.assertEqual(await discover_pg_source("cached_db"), ("10.2.2.112", 5432))
+
+        with patch("service_api.services.discovery.discover_data_source",
+                   CoroutineMock(side_effect=ConnectionError)) as sda_mock:
+            self.assertEqual(await discover_pg_source("cached_db"), ("10.2.2.112", 5432))
+            await asyncio.sleep(0)
+            sda_mock.assert_awaited_once()
+            self.assertEqual(await discover_pg_source("cached_db"), ("10.2.2.112", 5432))
+        clear_discovery_cache()
+
+    async def test_pg_source_cached(self):
+        sda_result = [{"ip": "10.2.2.113", "name": "cached_db", "type": "postgresql"}]
+        with patch("service_api.services.discovery.discover_data_source",
+                   CoroutineMock(return_value=sda_result)) as sda_mock:
+            await discover_pg_source("cached_db")
+            await discover_pg_source("cached_db")
+            sda_mock.assert_awaited_once()
+        clear_discovery_cache()
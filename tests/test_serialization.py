@@ -0,0 +1,92 @@
+from datetime import datetime
+from decimal import Decimal
+from unittest import TestCase, mock
+from uuid import UUID
+
+import msgpack
+from rfcommon_api.common.reqresp import map_response
+from sanic.response import json_dumps
+from ujson import loads
+
+from service_api.services.serialization import (
+    dumps_adjustments, dumps_adjustments_lines, dumps_adjustments_columnar, packb_adjustments, serialize_adjustments,
+    MSGPACK_CONTENT_TYPE, JSON_CONTENT_TYPE
+)
+
+
+class Request(dict):
+
+    def __init__(self, timezone):
+        super().__init__(headers={"x-timezone": timezone})
+        self.headers = self["headers"]
+
+
+ADJUSTMENT = {
+    "id": UUID("b5cd5ce6-4c46-4e6d-a67d-7df38fdd7d11"),
+    "project_uuid": UUID("b5cd5ce6-4c46-4e6d-a67d-7df38fdd7d55"),
+    "price_group_uuid": UUID("b5cd5ce6-4c46-1111-a67d-7df38fdd7d77"),
+    "bu_uuid": None,
+    "product_uuid": UUID("b5cd5ce6-4c46-1111-a67d-7df38fdd7d55"),
+    "adjustment_value": Decimal("199.34"),
+    "tier_override": {"tier_id": 6786, "tier_name": "Tier \"2\"", "values": [{"value": 10, "latest_date": None}]},
+    "comment": "Changed rebate\nto make more profit",
+    "user": "user",
+    "user_full_name": "Ünicode User",
+    "status": "Applied",
+    "updated_at": datetime(2018, 7, 26, 11, 11, 43, 231740),
+}
+
+
+class TestAdjustmentsSerialization(TestCase):
+
+    def test_encoder_returns_document_of_map_response(self):
+        request = Request("UTC")
+        adjustments = [ADJUSTMENT, {**ADJUSTMENT, "adjustment_value": None, "tier_override": None}]
+
+        self.assertEqual(
+            loads(dumps_adjustments(request, adjustments)),
+            loads(json_dumps(map_response(request, adjustments)))
+        )
+        self.assertEqual(
+            [loads(line) for line in dumps_adjustments_lines(request, adjustments).splitlines()],
+            loads(json_dumps(map_response(request, adjustments)))
+        )
+
+    def test_encoder_keeps_selected_columns(self):
+        adjustments = [{"id": ADJUSTMENT["id"], "updated_at": ADJUSTMENT["updated_at"]}]
+        self.assertEqual(
+            dumps_adjustments(Request("UTC"), adjustments),
+            '[{"id":"b5cd5ce6-4c46-4e6d-a67d-7df38fdd7d11","updated_at":"2018-07-26T11:11:43.231740"}]'
+        )
+
+    def test_other_payloads_are_serialized_by_map_response(self):
+        with mock.patch("service_api.services.serialization.map_response", side_effect=map_response) as mapper:
+            dumps_adjustments(Request("Europe/Kiev"), [ADJUSTMENT])
+            dumps_adjustments(Request("UTC"), [{**ADJUSTMENT, "total_count": 1}])
+        self.assertEqual(mapper.call_count, 2)
+
+    def test_columnar_json_contains_values_of_every_column(self):
+        request = Request("UTC")
+        adjustments = [ADJUSTMENT, {**ADJUSTMENT, "adjustment_value": None}]
+        rows = loads(dumps_adjustments(request, adjustments))
+
+        columnar = loads(dumps_adjustments_columnar(request, adjustments))
+        self.assertEqual(columnar["columns"], list(ADJUSTMENT))
+        self.assertEqual([dict(zip(columnar["columns"], values)) for values in zip(*columnar["data"])], rows)
+
+    def test_msgpack_contains_rows_as_arrays(self):
+        request = Request("UTC")
+        rows = loads(dumps_adjustments(request, [ADJUSTMENT]))
+
+        packed = msgpack.unpackb(packb_adjustments(request, [ADJUSTMENT]), raw=False)
+        self.assertEqual(packed["columns"], list(ADJUSTMENT))
+        packed_rows = [dict(zip(packed["columns"], values)) for values in packed["rows"]]
+        self.assertEqual(packed_rows[0]["adjustment_value"], "199.34")
+        self.assertEqual([{**row, "adjustment_value": float(row["adjustment_value"])} for row in packed_rows], rows)
+
+    def test_format_is_negotiated_by_accept_header(self):
+        request = Request("UTC")
+        request.headers["Accept"] = f"{MSGPACK_CONTENT_TYPE}, {JSON_CONTENT_TYPE};q=0.5"
+        self.assertEqual(serialize_adjustments(request, [])[1], MSGPACK_CONTENT_TYPE)
+        del request.headers["Accept"]
+        self.assertEqual(serialize_adjustments(request, []), ("[]", JSON_CONTENT_TYPE))